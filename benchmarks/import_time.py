@@ -0,0 +1,62 @@
+"""
+how long it takes a host to import the embedding api, and what it loads.
+
+  python3 benchmarks/import_time.py [runs]
+
+imports `language` in a fresh python process `runs` times (after one run that
+leaves the bytecode cached, like an installed package would have it) and
+prints the median and worst time python's -X importtime reports for it. exits
+with status 1 if the median is over the budget, if the import pulled in
+something that's meant to be loaded only once a program needs it, or if it
+added a module outside the package under a name a host's own could have.
+"""
+import os
+import subprocess
+import sys
+
+root = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+BUDGET = 0.06 # seconds
+LAZY = ("readline", "language.cache", "language.parallel", "language.benchmark", "asyncio", "threading", "multiprocessing", "numpy", "json", "hashlib", "pickle")
+
+def import_once():
+    """
+    the time the import took in seconds, and the modules it loaded.
+    """
+    env = {**os.environ, "PYTHONPATH": root}
+    env.pop("PYTHONDONTWRITEBYTECODE", None)
+    code = "import sys; before = set(sys.modules); import language; print(' '.join(sorted(set(sys.modules) - before)))"
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", code], env=env, capture_output=True, text=True, check=True)
+    for line in result.stderr.splitlines():
+        fields = line.split("|")
+        if len(fields) == 3 and fields[2].strip() == "language":
+            return int(fields[1]) / 1e6, result.stdout.split()
+    raise RuntimeError(f"no import time reported for language:\n{result.stderr}")
+
+def bench(runs):
+    import_once() # writes the bytecode
+    times = []
+    for _ in range(runs):
+        elapsed, modules = import_once()
+        times.append(elapsed)
+    times.sort()
+    median = times[len(times) // 2]
+    loaded = [name for name in LAZY if name in modules]
+    # everything of the interpreter's is under language., python's own modules aside
+    outside = [name for name in modules if name.split(".")[0] != "language" and name.split(".")[0] not in sys.stdlib_module_names]
+
+    print(f"import language: median {median * 1000:.2f} ms   max {times[-1] * 1000:.2f} ms   budget {BUDGET * 1000:.0f} ms")
+    failed = False
+    if median > BUDGET:
+        print(f"\x1b[31mover the budget by {(median - BUDGET) * 1000:.2f} ms\x1b[0m")
+        failed = True
+    if loaded:
+        print(f"\x1b[31mloaded on import: {', '.join(loaded)}\x1b[0m")
+        failed = True
+    if outside:
+        print(f"\x1b[31mloaded outside the package: {', '.join(outside)}\x1b[0m")
+        failed = True
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(bench(int(sys.argv[1]) if len(sys.argv) > 1 else 20))
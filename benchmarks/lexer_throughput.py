@@ -0,0 +1,61 @@
+"""
+lexer throughput on generated scripts.
+
+  python3 benchmarks/lexer_throughput.py [megabytes ...]
+
+prints how long tokenizing took and how many megabytes per second that is.
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from language.lexer import Lexer
+
+chunk = """// generated
+let total_{n} = 0;
+fn add_{n}(a, b):
+  return a + b * 2.5;
+end;
+let i = 0;
+while i <= 100:
+  if i != 50:
+    total_{n} = add_{n}(total_{n}, i);
+  else:
+    print "halfway there";
+  fi;
+  i++;
+end;
+class Point_{n}:
+  new(x, y):
+    self.x = x;
+    self.y = y;
+  end
+end;
+let p = Point_{n}(1, 2);
+print [p.x, p.y, 'done', true, false];
+"""
+
+def generate(size):
+    parts = []
+    length = 0
+    n = 0
+    while length < size:
+        part = chunk.format(n=n)
+        parts.append(part)
+        length += len(part)
+        n += 1
+    return "".join(parts)
+
+def bench(megabytes):
+    content = generate(int(megabytes * 1024 * 1024))
+    lexer = Lexer()
+    lexer.content = content
+    start = time.perf_counter()
+    tokens = list(lexer.tokenize())
+    elapsed = time.perf_counter() - start
+    print(f"{megabytes:>6} MB  {len(tokens):>9} tokens  {elapsed:8.3f}s  {megabytes / elapsed:6.2f} MB/s")
+
+if __name__ == "__main__":
+    for size in sys.argv[1:] or ["1", "4", "16"]:
+        bench(float(size))
@@ -0,0 +1,103 @@
+"""
+memory used by a large generated program.
+
+  python3 benchmarks/memory_footprint.py [chunks] [engine]
+
+prints how much memory its tokens and its resolved tree hold on to, then runs it
+with the interpreter and prints the peak resident size of that process. the program
+keeps a lot of instances, closures and lists alive, so the runtime objects show
+up in the peak too, not only the tree.
+"""
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import tracemalloc
+
+root = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, root)
+from language.lexer import Lexer
+from language.parser import Parser
+from language.semantic_analyzer import SemanticAnalyzer
+
+chunk = """// generated
+class Point_{n}:
+  new(x, y):
+    self.x = x;
+    self.y = y;
+  end
+  sum():
+    return self.x + self.y;
+  end
+end;
+fn adder_{n}(a):
+  fn add(b):
+    return a + b;
+  end;
+  return add;
+end;
+let points_{n} = [Point_{n}(1, 2), Point_{n}(3, 4), Point_{n}({n}, 0.5)];
+let add_{n} = adder_{n}({n});
+let i = 0;
+while (i < 20):
+  if (i != 10):
+    let p = Point_{n}(i, add_{n}(i));
+    p.sum();
+  fi else
+    print "halfway there";
+  fi;
+  i++;
+end;
+"""
+
+def generate(chunks):
+    return "".join(chunk.format(n=n) for n in range(chunks))
+
+def retained(build):
+    """
+    bytes still allocated once `build` returns, as long as its result is kept.
+    """
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = build()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, after - before
+
+def tokens(content):
+    lexer = Lexer()
+    lexer.content = content
+    return list(lexer.tokenize())
+
+def tree(content):
+    parser = Parser()
+    parser.setup(content)
+    program = parser.parse()
+    SemanticAnalyzer().resolve_program(program)
+    return program
+
+def peak_rss(content, engine):
+    """
+    the peak resident size of the interpreter running the program, in kilobytes.
+    """
+    with tempfile.NamedTemporaryFile("w", suffix=".language", delete=False) as f:
+        f.write(content)
+    try:
+        subprocess.run([sys.executable, "-m", "language", f"--engine={engine}", "--no-cache", f.name],
+                       stdout=subprocess.DEVNULL, check=True, cwd=root)
+    finally:
+        os.remove(f.name)
+    return resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+
+def bench(chunks, engine):
+    content = generate(chunks)
+    token_list, token_bytes = retained(lambda: tokens(content))
+    _, tree_bytes = retained(lambda: tree(content))
+    print(f"{len(content) / 1024 / 1024:.2f} MB of source, {len(token_list)} tokens")
+    print(f"tokens: {token_bytes / 1024 / 1024:8.2f} MB  ({token_bytes / len(token_list):.0f} bytes per token)")
+    print(f"tree:   {tree_bytes / 1024 / 1024:8.2f} MB")
+    print(f"run:    {peak_rss(content, engine) / 1024:8.2f} MB peak resident ({engine} engine)")
+
+if __name__ == "__main__":
+    bench(int(sys.argv[1]) if len(sys.argv) > 1 else 2000, sys.argv[2] if len(sys.argv) > 2 else "tree")
@@ -0,0 +1,10 @@
+"""
+the embedding api, for using the language from python:
+
+    import language
+    program = language.compile("print x * 2;")
+    program.run(globals={"x": 21})
+
+see embedding.py. `python3 -m language` is the command line (see main.py).
+"""
+from .embedding import Error, Interpreter, NativeError, Program, compile, register
@@ -0,0 +1,4 @@
+import sys
+from .main import main
+
+main(sys.argv[1:])
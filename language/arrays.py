@@ -0,0 +1,225 @@
+"""
+numeric arrays, backed by numpy.
+
+an `Array` wraps a numpy array and forwards python's operators to it, so the
+engines' arithmetic and comparisons (which are just `+`, `<`, ... on whatever
+values they get) work element-wise on arrays without knowing about them:
+`prices * 1.2 - fees` is a couple of numpy calls however long the arrays are.
+the builtins below do the rest: building arrays, reductions like `sum` that
+would otherwise be a loop in the program, and `map`, which calls a function on
+every element (or hands the whole array to numpy at once, for its own
+functions like `sqrt`).
+
+numpy is optional. it's only imported once a program makes its first array,
+since loading it takes longer than starting the interpreter; without it the
+array builtins report an error instead.
+"""
+import operator
+from .error import NativeError
+from .function_obj import Callable, Class, Instance, List, NativeMethod
+
+numpy = None
+
+def load_numpy():
+    global numpy
+    if numpy is None:
+        try:
+            import numpy as module
+        except ImportError:
+            raise NativeError("Numeric arrays need numpy, which isn't installed (pip install numpy).") from None
+        numpy = module
+    return numpy
+
+def data(value):
+    """
+    the numpy array behind an array, a list or a number.
+    """
+    if type(value) is Array:
+        return value.data
+    if type(value) is List:
+        try:
+            value = load_numpy().array(value.items)
+        except (ValueError, OverflowError):
+            raise NativeError("Arrays can only hold numbers.") from None # lists of lists of different lengths, or huge ints
+        if value.dtype.kind not in "biuf":
+            raise NativeError("Arrays can only hold numbers.")
+        return value
+    if type(value) in (int, float, bool):
+        return value
+    raise NativeError("Expected an array, a list or a number.")
+
+def scalar(value):
+    """
+    numpy hands back its own number types, the program should only ever see python's.
+    """
+    return value.item() if isinstance(value, numpy.generic) else value
+
+def wrap(value):
+    if isinstance(value, numpy.ndarray):
+        return Array(value) if value.ndim else value.item()
+    return scalar(value)
+
+def elementwise(operation):
+    def forward(self, other):
+        if type(other) is Array:
+            other = other.data
+        elif type(other) is List:
+            other = data(other)
+        try:
+            return Array(operation(self.data, other))
+        except ValueError:
+            raise NativeError(f"Arrays of different lengths ({len(self.data)} and {len(other)}) can't be combined.") from None
+        except TypeError: # numpy's UFuncTypeError is one
+            raise NativeError("Arrays can only be combined with numbers, lists of numbers and other arrays.") from None
+        except OverflowError: # an int that doesn't fit numpy's
+            raise NativeError("Number too large for an array.") from None
+    return forward
+
+def reflected(operation):
+    return elementwise(lambda left, right: operation(right, left))
+
+class Array(Instance):
+    """
+    a numeric array. like lists, every array shares one class for its methods.
+    """
+    __slots__ = ("data",)
+
+    def __init__(self, data):
+        self.clss = array_class
+        self.shape = array_class.shape
+        self.values = []
+        self.data = data
+
+    def __repr__(self):
+        return f"{self.data.tolist()}"
+
+    __add__ = elementwise(operator.add)
+    __sub__ = elementwise(operator.sub)
+    __mul__ = elementwise(operator.mul)
+    __truediv__ = elementwise(operator.truediv)
+    __radd__ = reflected(operator.add)
+    __rsub__ = reflected(operator.sub)
+    __rmul__ = reflected(operator.mul)
+    __rtruediv__ = reflected(operator.truediv)
+    __gt__ = elementwise(operator.gt)
+    __lt__ = elementwise(operator.lt)
+    __ge__ = elementwise(operator.ge)
+    __le__ = elementwise(operator.le)
+    __eq__ = elementwise(operator.eq)
+    __ne__ = elementwise(operator.ne)
+    __hash__ = None
+
+    def __neg__(self):
+        if self.data.dtype.kind == "b":
+            raise NativeError("Arrays of booleans can't be negated.")
+        return Array(-self.data)
+
+    def __pos__(self):
+        return self
+
+    def get_item(self, index):
+        if type(index) is not int:
+            raise NativeError("Array indices must be integers.")
+        try:
+            return wrap(self.data[index])
+        except IndexError:
+            raise NativeError("Array index out of range.") from None
+
+    def set_item(self, index, value):
+        if type(index) is not int:
+            raise NativeError("Array indices must be integers.")
+        if type(value) not in (int, float, bool):
+            raise NativeError("Arrays can only hold numbers.")
+        if not -len(self.data) <= index < len(self.data):
+            raise NativeError("Array index out of range.")
+        # numpy would cut 5.5 down to 5 in an array of ints: the array becomes one of floats instead
+        kind = self.data.dtype.kind
+        if type(value) is float and kind != "f" or type(value) is int and kind == "b":
+            self.data = self.data.astype(type(value))
+        try:
+            self.data[index] = value
+        except OverflowError:
+            raise NativeError("Number too large for an array.") from None
+
+    def length(self):
+        return len(self.data)
+
+    def elements(self):
+        return iter(self.data.tolist())
+
+    def to_list(self):
+        return List(self.data.tolist())
+
+array_class = Class(None, {
+    "length": NativeMethod("length", Array.length),
+    "to_list": NativeMethod("to_list", Array.to_list),
+})
+
+# builtins
+
+def array(items):
+    if type(items) not in (List, Array):
+        raise NativeError("array() takes a list.")
+    return Array(data(items).copy() if type(items) is Array else data(items))
+
+def arange(start, end):
+    if type(start) is not int or type(end) is not int:
+        raise NativeError("range() bounds must be integers.")
+    return Array(load_numpy().arange(start, end))
+
+def reduction(operation):
+    def reduce(items):
+        values = data(items)
+        if load_numpy().size(values) == 0:
+            raise NativeError(f"{operation}() of an empty array.")
+        return wrap(getattr(numpy, operation)(values))
+    return reduce
+
+def dot(left, right):
+    try:
+        return wrap(load_numpy().dot(data(left), data(right)))
+    except ValueError:
+        raise NativeError("dot() needs arrays of matching lengths.") from None
+
+vectorized = set() # the actions of the builtins that take a whole array at once
+
+def ufunc(name):
+    """
+    a numpy function applied to every element at once, or to a single number.
+    """
+    def apply(value):
+        return wrap(getattr(load_numpy(), name)(data(value)))
+    vectorized.add(apply)
+    return apply
+
+def map_items(function, items, call):
+    """
+    `map(fn, items)`: a list of what `call` gives back for every item of a list,
+    or an array of it for an array, in which case the results have to be numbers.
+    numpy's functions get the whole array in one call instead.
+    """
+    if type(items) not in (List, Array):
+        raise NativeError("map() takes a function and a list or an array.")
+    if not isinstance(function, Callable) or function.arity() != 1:
+        raise NativeError("map() needs a function that takes one argument.")
+    if type(items) is List:
+        return List([call(item) for item in items.items])
+
+    if getattr(function, "action", None) in vectorized:
+        return function.action(items)
+    results = [call(item) for item in items.data.tolist()]
+    if any(type(result) not in (int, float, bool) for result in results):
+        raise NativeError("map() over an array needs a function that gives back numbers.")
+    return Array(numpy.array(results, dtype=items.data.dtype if not results else None))
+
+builtins = {
+    "array": (array, ("items",)),
+    "range": (arange, ("start", "end")),
+    "sum": (reduction("sum"), ("items",)),
+    "mean": (reduction("mean"), ("items",)),
+    "min": (reduction("min"), ("items",)),
+    "max": (reduction("max"), ("items",)),
+    "dot": (dot, ("left", "right")),
+    "sqrt": (ufunc("sqrt"), ("value",)),
+    "abs": (ufunc("abs"), ("value",)),
+}
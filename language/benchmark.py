@@ -0,0 +1,119 @@
+"""
+the `--bench` runner.
+
+every workload is run once to warm up and then `runs` more times, each time on
+a fresh interpreter with the on-disk cache off, so the front end is timed too.
+the times are summarized as percentiles and can be saved as json. given a
+baseline saved the same way, a workload whose median got slower by more than
+the threshold counts as a regression, and the runner fails.
+"""
+import contextlib
+import io
+import json
+import os
+import time
+
+suite_directory = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "benchmarks", "suite")
+
+def percentile(times, fraction):
+    """
+    linearly interpolated percentile of an already sorted list.
+    """
+    position = (len(times) - 1) * fraction
+    lower = int(position)
+    upper = min(lower + 1, len(times) - 1)
+    return times[lower] + (times[upper] - times[lower]) * (position - lower)
+
+def summarize(times):
+    times = sorted(times)
+    return {
+        "min": times[0],
+        "median": percentile(times, 0.5),
+        "p90": percentile(times, 0.9),
+        "p99": percentile(times, 0.99),
+        "max": times[-1],
+        "times": times,
+    }
+
+def suite_files(paths=()):
+    """
+    the workloads to run: the given files, or every script in benchmarks/suite.
+    """
+    if paths:
+        return list(paths)
+    return [os.path.join(suite_directory, name) for name in sorted(os.listdir(suite_directory)) if name.endswith(".language")]
+
+def time_workload(make_interpreter, filename, runs):
+    with open(filename) as f:
+        content = f.read()
+
+    times = []
+    for run in range(runs + 1):
+        interpreter = make_interpreter()
+        interpreter.is_shell = False
+        interpreter.filename = filename
+        output = io.StringIO()
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(output):
+            interpreter.run(content)
+        elapsed = time.perf_counter() - start
+
+        if "\x1b[31m" in output.getvalue():
+            raise RuntimeError(f"{filename} failed:\n{output.getvalue()}")
+        if run > 0: # the first run only warms up
+            times.append(elapsed)
+    return times
+
+def run_suite(make_interpreter, config, paths=(), runs=10):
+    """
+    returns the results as a json-compatible dict.
+    """
+    results = {**config, "runs": runs, "workloads": {}}
+    for filename in suite_files(paths):
+        name = os.path.splitext(os.path.basename(filename))[0]
+        summary = summarize(time_workload(make_interpreter, filename, runs))
+        results["workloads"][name] = summary
+        print(f"{name:<16} median {summary['median'] * 1000:9.2f} ms   p90 {summary['p90'] * 1000:9.2f} ms   "
+              f"min {summary['min'] * 1000:9.2f} ms   max {summary['max'] * 1000:9.2f} ms")
+    return results
+
+def compare(results, baseline, threshold):
+    """
+    prints how every workload's median moved against the baseline and returns
+    the names of the ones that regressed past the threshold (e.g. 0.1 for 10%).
+    """
+    config = [key for key in ("engine", "optimize", "memo_size") if results.get(key) != baseline.get(key)]
+    if config:
+        print(f"\x1b[33mwarning: the baseline was recorded with a different {', '.join(config)}\x1b[0m")
+
+    regressions = []
+    for name, summary in results["workloads"].items():
+        old = baseline.get("workloads", {}).get(name)
+        if old is None:
+            print(f"{name:<16} not in the baseline")
+            continue
+
+        change = summary["median"] / old["median"] - 1
+        if change > threshold:
+            regressions.append(name)
+            print(f"\x1b[31m{name:<16} {change * 100:+7.1f}%  regressed (threshold {threshold * 100:.0f}%)\x1b[0m")
+        else:
+            print(f"{name:<16} {change * 100:+7.1f}%")
+    return regressions
+
+def main(make_interpreter, config, paths=(), runs=10, save=None, baseline=None, threshold=0.1) -> int:
+    """
+    runs the suite and returns the exit status: 1 if anything regressed, 0 otherwise.
+    """
+    results = run_suite(make_interpreter, config, paths, runs)
+
+    regressions = []
+    if baseline is not None:
+        with open(baseline) as f:
+            regressions = compare(results, json.load(f), threshold)
+
+    if save is not None:
+        with open(save, "w") as f:
+            json.dump(results, f, indent=2)
+
+    return 1 if regressions else 0
@@ -0,0 +1,225 @@
+"""
+opcodes and code objects shared by the bytecode compiler and the vm.
+
+every instruction is two ints wide: an opcode followed by a single operand
+(0 when the instruction doesn't need one). anything that isn't an int
+(numbers, strings, names, nested function prototypes) lives in the code
+object's constant pool and the operand is just an index into it.
+"""
+
+# loads and stores
+CONST = 0
+LOAD_FAST = 1 # slot in the current frame
+STORE_FAST = 2
+LOAD_DEREF = 3 # (slot << 16) | depth, walking up the frame chain
+STORE_DEREF = 4
+LOAD_GLOBAL = 5 # operand is the constant index of the name
+STORE_GLOBAL = 6
+POP = 7
+
+# arithmetic and comparisons, popping both operands
+ADD = 10
+SUBTRACT = 11
+MULTIPLY = 12
+DIVIDE = 13
+GREATER = 14
+LESS = 15
+GREATER_EQUAL = 16
+LESS_EQUAL = 17
+EQUAL = 18
+NOT_EQUAL = 19
+
+# the same operators with a constant on the right (operand is the constant index).
+# "n - 1" and "i < 10" are common enough that saving a dispatch on them pays off.
+ADD_CONST = 20
+SUBTRACT_CONST = 21
+MULTIPLY_CONST = 22
+DIVIDE_CONST = 23
+GREATER_CONST = 24
+LESS_CONST = 25
+GREATER_EQUAL_CONST = 26
+LESS_EQUAL_CONST = 27
+EQUAL_CONST = 28
+NOT_EQUAL_CONST = 29
+CONST_OFFSET = ADD_CONST - ADD
+
+# the same operators again, reading the left operand straight from a slot in the
+# current frame. the operand packs the constant index above the slot: (constant << 16) | slot
+ADD_FAST_CONST = 30
+SUBTRACT_FAST_CONST = 31
+MULTIPLY_FAST_CONST = 32
+DIVIDE_FAST_CONST = 33
+GREATER_FAST_CONST = 34
+LESS_FAST_CONST = 35
+GREATER_EQUAL_FAST_CONST = 36
+LESS_EQUAL_FAST_CONST = 37
+EQUAL_FAST_CONST = 38
+NOT_EQUAL_FAST_CONST = 39
+FAST_CONST_OFFSET = ADD_FAST_CONST - ADD
+
+# control flow
+JUMP = 40
+JUMP_IF_FALSE = 41 # pops the condition
+JUMP_IF_TRUE = 42 # pops the condition
+JUMP_IF_FALSE_OR_POP = 43 # used by "and"
+JUMP_IF_TRUE_OR_POP = 44 # used by "or"
+CALL = 45 # operand is the argument count
+RETURN = 46
+RETURN_NONE = 47
+# "obj.name(args)": LOAD_METHOD leaves the method and obj on the stack (or the field's
+# value and None), and CALL_METHOD calls the method with obj as self, without binding it.
+LOAD_METHOD = 48 # operand is the constant index of a PropertyCache
+CALL_METHOD = 49 # operand is the argument count
+
+# frames, objects and everything else
+PUSH_FRAME = 50 # operand is the number of slots
+POP_FRAME = 51
+MAKE_FUNCTION = 52 # operand is the constant index of a FunctionPrototype
+MAKE_CLASS = 53 # operand is the constant index of a ClassPrototype
+GET_PROP = 54 # operand is the constant index of a PropertyCache
+SET_PROP = 55 # operand is the constant index of a StoreCache
+BUILD_LIST = 56 # operand is the number of items
+PRINT = 57 # operand is 1 when a value should be printed, 0 for an empty line
+GET_ITEM = 58 # pops the index and the list
+SET_ITEM = 59 # pops the value, the index and the list
+
+# unary operators
+POSITIVE = 60
+NEGATE = 61
+NOT = 62
+AWAIT = 63 # replaces the task on top of the stack with its result, once it's done
+IMPORT = 64 # operand is the constant index of the Import node. not an operator, but the other groups are full
+
+# comparisons against a constant, fused with the conditional jump that follows them.
+# the operand packs the jump target above the constant index: (target << 16) | constant
+GREATER_CONST_JUMP_IF_FALSE = 70
+LESS_CONST_JUMP_IF_FALSE = 71
+GREATER_EQUAL_CONST_JUMP_IF_FALSE = 72
+LESS_EQUAL_CONST_JUMP_IF_FALSE = 73
+EQUAL_CONST_JUMP_IF_FALSE = 74
+NOT_EQUAL_CONST_JUMP_IF_FALSE = 75
+GREATER_CONST_JUMP_IF_TRUE = 80
+LESS_CONST_JUMP_IF_TRUE = 81
+GREATER_EQUAL_CONST_JUMP_IF_TRUE = 82
+LESS_EQUAL_CONST_JUMP_IF_TRUE = 83
+EQUAL_CONST_JUMP_IF_TRUE = 84
+NOT_EQUAL_CONST_JUMP_IF_TRUE = 85
+
+# and once more with the left operand read from a slot:
+# (target << 32) | (constant << 16) | slot
+GREATER_FAST_CONST_JUMP_IF_FALSE = 90
+LESS_FAST_CONST_JUMP_IF_FALSE = 91
+GREATER_EQUAL_FAST_CONST_JUMP_IF_FALSE = 92
+LESS_EQUAL_FAST_CONST_JUMP_IF_FALSE = 93
+EQUAL_FAST_CONST_JUMP_IF_FALSE = 94
+NOT_EQUAL_FAST_CONST_JUMP_IF_FALSE = 95
+GREATER_FAST_CONST_JUMP_IF_TRUE = 100
+LESS_FAST_CONST_JUMP_IF_TRUE = 101
+GREATER_EQUAL_FAST_CONST_JUMP_IF_TRUE = 102
+LESS_EQUAL_FAST_CONST_JUMP_IF_TRUE = 103
+EQUAL_FAST_CONST_JUMP_IF_TRUE = 104
+NOT_EQUAL_FAST_CONST_JUMP_IF_TRUE = 105
+
+# native loops. the first two pack their operand the same way:
+# (target << 32) | (constant << 16) | slot
+# and FOR_ITER with room for any slot: (target << 64) | (iterator slot << 32) | slot
+FOR_RANGE_LESS = 110 # adds one to the slot and jumps back to the body while it's below the constant
+FOR_RANGE_LESS_EQUAL = 111
+FOR_ITER = 112 # stores the next item in the slot and jumps back to the body, falls through once there are none left
+GET_ITER = 113 # pops a value and keeps an iterator over it in the slot given as the operand
+
+names = {value: key for key, value in dict(globals()).items() if key.isupper() and not key.endswith("_OFFSET")}
+
+class Code():
+    def __init__(self, name):
+        self.name = name
+        self.ops = []
+        self.constants = []
+        self.size = 1 # number of slots in the frame, including the parent link
+        self.tokens = {} # instruction offset -> token, used when reporting errors
+        self._constant_index = {}
+
+    def __repr__(self):
+        return f"<code {self.name}>"
+
+    def emit(self, op, arg=0, token=None):
+        if token is not None:
+            self.tokens[len(self.ops)] = token
+        self.ops.append(op)
+        self.ops.append(arg)
+        return len(self.ops) - 2
+
+    def patch(self, offset, arg):
+        self.ops[offset + 1] = arg
+
+    def patch_jump(self, offset, target):
+        if self.ops[offset] >= GREATER_FAST_CONST_JUMP_IF_FALSE:
+            self.ops[offset + 1] = target << 32 | self.ops[offset + 1] & 0xffffffff
+        elif self.ops[offset] >= GREATER_CONST_JUMP_IF_FALSE:
+            self.ops[offset + 1] = target << 16 | self.ops[offset + 1] & 0xffff
+        else:
+            self.ops[offset + 1] = target
+
+    def constant(self, value):
+        # numbers and strings are deduplicated, everything else is stored as is
+        if type(value) in (int, float, str, bool):
+            key = (type(value), value)
+            index = self._constant_index.get(key)
+            if index is None:
+                index = self._constant_index[key] = len(self.constants)
+                self.constants.append(value)
+            return index
+
+        self.constants.append(value)
+        return len(self.constants) - 1
+
+    def token_at(self, offset):
+        return self.tokens.get(offset)
+
+    def disassemble(self):
+        lines = [f"== {self.name} ({self.size - 1} slots) =="]
+        for offset in range(0, len(self.ops), 2):
+            op, arg = self.ops[offset], self.ops[offset + 1]
+            line = f"{offset:>5} {names[op]:<32} {arg}"
+            if op in (CONST, LOAD_GLOBAL, STORE_GLOBAL, GET_PROP, SET_PROP, LOAD_METHOD, MAKE_FUNCTION, MAKE_CLASS) or ADD_CONST <= op <= NOT_EQUAL_CONST:
+                line += f" ({self.constants[arg]!r})"
+            elif op == GET_ITER:
+                line += f" (slot {arg})"
+            elif op == FOR_ITER:
+                line = f"{offset:>5} {names[op]:<32} {arg >> 64} (slot {arg & 0xffffffff}, iterator in slot {arg >> 32 & 0xffffffff})"
+            elif op >= GREATER_FAST_CONST_JUMP_IF_FALSE:
+                line = f"{offset:>5} {names[op]:<32} {arg >> 32} (slot {arg & 0xffff}, {self.constants[arg >> 16 & 0xffff]!r})"
+            elif op >= GREATER_CONST_JUMP_IF_FALSE:
+                line = f"{offset:>5} {names[op]:<32} {arg >> 16} ({self.constants[arg & 0xffff]!r})"
+            elif ADD_FAST_CONST <= op <= NOT_EQUAL_FAST_CONST:
+                line += f" (slot {arg & 0xffff}, {self.constants[arg >> 16]!r})"
+            elif op in (LOAD_DEREF, STORE_DEREF):
+                line += f" (depth {arg & 0xffff}, slot {arg >> 16})"
+            lines.append(line)
+
+        for constant in self.constants:
+            if isinstance(constant, FunctionPrototype):
+                lines.append(constant.code.disassemble())
+            elif isinstance(constant, ClassPrototype):
+                lines.extend(method.code.disassemble() for method in constant.methods)
+        return "\n".join(lines)
+
+class FunctionPrototype():
+    """
+    everything about a function that is known at compile time.
+    the vm pairs it with the frame it was declared in to make a function object.
+    """
+    def __init__(self, expr, code):
+        self.expr = expr
+        self.code = code
+
+    def __repr__(self):
+        return f"<prototype {self.expr.name.token.value}>"
+
+class ClassPrototype():
+    def __init__(self, expr, methods):
+        self.expr = expr
+        self.methods = methods
+
+    def __repr__(self):
+        return f"<class prototype {self.expr.name.token.value}>"
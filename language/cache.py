@@ -0,0 +1,125 @@
+"""
+on-disk cache for programs that already went through the front end.
+
+a script's parsed and resolved tree (or its bytecode, for the vm) is pickled,
+compressed and written to a `__pycache__` directory next to it. every cache
+file starts with a magic number and a key hashed from the source, the kind of
+program it holds ("tree" or "bytecode") and the interpreter itself, so any
+change to one of them just makes the entry look stale and it gets rebuilt.
+anything that goes wrong while reading or writing the cache is treated as a
+miss: the cache can only ever make a run faster, never break it.
+
+unpickling runs whatever the file tells it to, so a cache is only read if it
+belongs to whoever is running the script and nobody else can write to it, and
+even then it may only make the interpreter's own tree and bytecode classes.
+"""
+import gc
+import hashlib
+import io
+import os
+import pickle
+import stat
+import zlib
+
+MAGIC = b"LNG\x01"
+KEY_SIZE = hashlib.sha256().digest_size
+
+def interpreter_fingerprint(version):
+    """
+    the interpreter version plus the size and mtime of every module it's made of,
+    so editing the interpreter invalidates caches the same way bumping the version does.
+    """
+    parts = [version]
+    directory = os.path.dirname(os.path.abspath(__file__))
+    for name in sorted(os.listdir(directory)):
+        if name.endswith(".py"):
+            stat = os.stat(os.path.join(directory, name))
+            parts.append(f"{name}:{stat.st_size}:{stat.st_mtime_ns}")
+    return "\n".join(parts)
+
+PACKAGE = __package__ or "language"
+
+# what a cached program is made of, and nothing else
+ALLOWED = {
+    f"{PACKAGE}.bytecode": {"Code", "FunctionPrototype", "ClassPrototype"},
+    f"{PACKAGE}.lexer": {"Token"},
+    f"{PACKAGE}.function_obj": {"PropertyCache", "StoreCache"},
+    "builtins": {"bool", "int", "float", "str"},
+}
+
+class Unpickler(pickle.Unpickler):
+    def find_class(self, module, name):
+        if module == f"{PACKAGE}.syntax_tree" or name in ALLOWED.get(module, ()):
+            value = super().find_class(module, name)
+            if isinstance(value, type):
+                return value
+        raise pickle.UnpicklingError(f"{module}.{name} has no business in a cached program")
+
+def trusted(f):
+    """
+    whether the open cache file is ours and only we can change it.
+    """
+    if not hasattr(os, "getuid"):
+        return True # no owners or modes to go by
+    info = os.fstat(f.fileno())
+    return info.st_uid == os.getuid() and not info.st_mode & (stat.S_IWGRP | stat.S_IWOTH)
+
+class ProgramCache():
+    def __init__(self, version):
+        self.fingerprint = interpreter_fingerprint(version).encode()
+        self.tag = f"language-{version}"
+
+    def path(self, filename, kind):
+        directory, name = os.path.split(os.path.abspath(filename))
+        return os.path.join(directory, "__pycache__", f"{name}.{self.tag}.{kind}.cache")
+
+    def key(self, content, kind):
+        digest = hashlib.sha256(self.fingerprint)
+        digest.update(b"\0" + kind.encode() + b"\0")
+        digest.update(content.encode("utf-8", "surrogatepass"))
+        return digest.digest()
+
+    def load(self, filename, content, kind):
+        """
+        returns the cached program, or None if there is no usable entry.
+        """
+        try:
+            with open(self.path(filename, kind), "rb") as f:
+                if not trusted(f):
+                    return None
+                data = f.read()
+        except OSError:
+            return None
+
+        header = len(MAGIC) + KEY_SIZE
+        if data[:len(MAGIC)] != MAGIC or data[len(MAGIC):header] != self.key(content, kind):
+            return None
+
+        # a program is a lot of small objects, so the cycle collector would otherwise
+        # keep kicking in while they're being rebuilt, for nothing.
+        enabled = gc.isenabled()
+        gc.disable()
+        try:
+            return Unpickler(io.BytesIO(zlib.decompress(data[header:]))).load()
+        except Exception:
+            return None
+        finally:
+            if enabled:
+                gc.enable()
+
+    def store(self, filename, content, kind, program):
+        path = self.path(filename, kind)
+        temp = f"{path}.{os.getpid()}.tmp"
+        try:
+            payload = zlib.compress(pickle.dumps(program, pickle.HIGHEST_PROTOCOL), 1)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # not writable by anyone else whatever the umask is, or it wouldn't be trusted later
+            with os.fdopen(os.open(temp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644), "wb") as f:
+                f.write(MAGIC + self.key(content, kind) + payload)
+            # readers either see the old entry or the complete new one, never half a file
+            os.replace(temp, path)
+        except (OSError, RecursionError, TypeError, pickle.PicklingError):
+            try:
+                os.remove(temp)
+            except OSError:
+                pass
@@ -0,0 +1,889 @@
+# pyright: reportShadowedImports=none
+from .lexer import TokenType
+from .syntax_tree import *
+from .compiler import call_token
+from .optimizer import position
+from .function_obj import *
+from .error import Error, NativeError
+from .quickening import equal, not_equal
+
+# every operator gets its own closure factory, so picking the operation happens
+# once at compile time instead of on every evaluation. an operator only fails
+# with a NativeError when an array is one of its operands (see arrays.py), and
+# the error then points at the expression.
+def add(left, right, token):
+    def run(frame):
+        try:
+            return left(frame) + right(frame)
+        except NativeError as e:
+            raise Error(e.msg, token) from None
+    return run
+
+def subtract(left, right, token):
+    def run(frame):
+        try:
+            return left(frame) - right(frame)
+        except NativeError as e:
+            raise Error(e.msg, token) from None
+    return run
+
+def multiply(left, right, token):
+    def run(frame):
+        try:
+            return left(frame) * right(frame)
+        except NativeError as e:
+            raise Error(e.msg, token) from None
+    return run
+
+def divide(left, right, token):
+    def run(frame):
+        try:
+            return left(frame) / right(frame)
+        except NativeError as e:
+            raise Error(e.msg, token) from None
+    return run
+
+def greater(left, right, token):
+    def run(frame):
+        try:
+            return left(frame) > right(frame)
+        except NativeError as e:
+            raise Error(e.msg, token) from None
+    return run
+
+def less(left, right, token):
+    def run(frame):
+        try:
+            return left(frame) < right(frame)
+        except NativeError as e:
+            raise Error(e.msg, token) from None
+    return run
+
+def greater_equal(left, right, token):
+    def run(frame):
+        try:
+            return left(frame) >= right(frame)
+        except NativeError as e:
+            raise Error(e.msg, token) from None
+    return run
+
+def less_equal(left, right, token):
+    def run(frame):
+        try:
+            return left(frame) <= right(frame)
+        except NativeError as e:
+            raise Error(e.msg, token) from None
+    return run
+
+def is_equal(left, right, token):
+    def run(frame):
+        try:
+            return equal(left(frame), right(frame))
+        except NativeError as e:
+            raise Error(e.msg, token) from None
+    return run
+
+def is_not_equal(left, right, token):
+    def run(frame):
+        try:
+            return not_equal(left(frame), right(frame))
+        except NativeError as e:
+            raise Error(e.msg, token) from None
+    return run
+
+binary = {
+    TokenType.PLUS: add,
+    TokenType.MINUS: subtract,
+    TokenType.MULTIPLY: multiply,
+    TokenType.DIVIDE: divide,
+    TokenType.GREATER: greater,
+    TokenType.LESS: less,
+    TokenType.GREATER_EQUAL: greater_equal,
+    TokenType.LESS_EQUAL: less_equal,
+    TokenType.EQUAL: is_equal,
+    TokenType.NOT_EQUAL: is_not_equal,
+}
+
+# right operand is a literal
+def add_const(left, value, token):
+    def run(frame):
+        try:
+            return left(frame) + value
+        except NativeError as e:
+            raise Error(e.msg, token) from None
+    return run
+
+def subtract_const(left, value, token):
+    def run(frame):
+        try:
+            return left(frame) - value
+        except NativeError as e:
+            raise Error(e.msg, token) from None
+    return run
+
+def multiply_const(left, value, token):
+    def run(frame):
+        try:
+            return left(frame) * value
+        except NativeError as e:
+            raise Error(e.msg, token) from None
+    return run
+
+def divide_const(left, value, token):
+    def run(frame):
+        try:
+            return left(frame) / value
+        except NativeError as e:
+            raise Error(e.msg, token) from None
+    return run
+
+def greater_const(left, value, token):
+    def run(frame):
+        try:
+            return left(frame) > value
+        except NativeError as e:
+            raise Error(e.msg, token) from None
+    return run
+
+def less_const(left, value, token):
+    def run(frame):
+        try:
+            return left(frame) < value
+        except NativeError as e:
+            raise Error(e.msg, token) from None
+    return run
+
+def greater_equal_const(left, value, token):
+    def run(frame):
+        try:
+            return left(frame) >= value
+        except NativeError as e:
+            raise Error(e.msg, token) from None
+    return run
+
+def less_equal_const(left, value, token):
+    def run(frame):
+        try:
+            return left(frame) <= value
+        except NativeError as e:
+            raise Error(e.msg, token) from None
+    return run
+
+def is_equal_const(left, value, token):
+    def run(frame):
+        try:
+            return equal(left(frame), value)
+        except NativeError as e:
+            raise Error(e.msg, token) from None
+    return run
+
+def is_not_equal_const(left, value, token):
+    def run(frame):
+        try:
+            return not_equal(left(frame), value)
+        except NativeError as e:
+            raise Error(e.msg, token) from None
+    return run
+
+binary_const = {
+    TokenType.PLUS: add_const,
+    TokenType.MINUS: subtract_const,
+    TokenType.MULTIPLY: multiply_const,
+    TokenType.DIVIDE: divide_const,
+    TokenType.GREATER: greater_const,
+    TokenType.LESS: less_const,
+    TokenType.GREATER_EQUAL: greater_equal_const,
+    TokenType.LESS_EQUAL: less_equal_const,
+    TokenType.EQUAL: is_equal_const,
+    TokenType.NOT_EQUAL: is_not_equal_const,
+}
+
+# left operand is a local in the current frame, right operand is a literal
+def add_slot_const(slot, value, token):
+    def run(frame):
+        try:
+            return frame[slot] + value
+        except NativeError as e:
+            raise Error(e.msg, token) from None
+    return run
+
+def subtract_slot_const(slot, value, token):
+    def run(frame):
+        try:
+            return frame[slot] - value
+        except NativeError as e:
+            raise Error(e.msg, token) from None
+    return run
+
+def multiply_slot_const(slot, value, token):
+    def run(frame):
+        try:
+            return frame[slot] * value
+        except NativeError as e:
+            raise Error(e.msg, token) from None
+    return run
+
+def divide_slot_const(slot, value, token):
+    def run(frame):
+        try:
+            return frame[slot] / value
+        except NativeError as e:
+            raise Error(e.msg, token) from None
+    return run
+
+def greater_slot_const(slot, value, token):
+    def run(frame):
+        try:
+            return frame[slot] > value
+        except NativeError as e:
+            raise Error(e.msg, token) from None
+    return run
+
+def less_slot_const(slot, value, token):
+    def run(frame):
+        try:
+            return frame[slot] < value
+        except NativeError as e:
+            raise Error(e.msg, token) from None
+    return run
+
+def greater_equal_slot_const(slot, value, token):
+    def run(frame):
+        try:
+            return frame[slot] >= value
+        except NativeError as e:
+            raise Error(e.msg, token) from None
+    return run
+
+def less_equal_slot_const(slot, value, token):
+    def run(frame):
+        try:
+            return frame[slot] <= value
+        except NativeError as e:
+            raise Error(e.msg, token) from None
+    return run
+
+def is_equal_slot_const(slot, value, token):
+    def run(frame):
+        try:
+            return equal(frame[slot], value)
+        except NativeError as e:
+            raise Error(e.msg, token) from None
+    return run
+
+def is_not_equal_slot_const(slot, value, token):
+    def run(frame):
+        try:
+            return not_equal(frame[slot], value)
+        except NativeError as e:
+            raise Error(e.msg, token) from None
+    return run
+
+binary_slot_const = {
+    TokenType.PLUS: add_slot_const,
+    TokenType.MINUS: subtract_slot_const,
+    TokenType.MULTIPLY: multiply_slot_const,
+    TokenType.DIVIDE: divide_slot_const,
+    TokenType.GREATER: greater_slot_const,
+    TokenType.LESS: less_slot_const,
+    TokenType.GREATER_EQUAL: greater_equal_slot_const,
+    TokenType.LESS_EQUAL: less_equal_slot_const,
+    TokenType.EQUAL: is_equal_slot_const,
+    TokenType.NOT_EQUAL: is_not_equal_slot_const,
+}
+
+class ClosureFunction(Function):
+    """
+    a function whose body has been compiled to a chain of closures.
+    uses the same list-backed frames as the vm: slot 0 links to the parent frame.
+    """
+    __slots__ = ("arity_count", "body", "size")
+
+    def __init__(self, closure, expr, globals, body, size, memo=None):
+        self.closure = closure
+        self.expr = expr
+        self.args = expr.args
+        self.arity_count = len(self.args)
+        self.globals = globals # its body was compiled against these, see ClosureCompiler.use
+        self.body = body
+        self.size = size
+        self.memo = memo
+
+    def invoke(self, interpreter, args):
+        frame = [self.closure, *args]
+        frame.extend([None] * (self.size - len(frame)))
+        try:
+            result = self.body(frame)
+        except Error as e:
+            e.happened_in(self.globals.filename)
+            raise
+        if result is not None:
+            return result[0]
+
+class ClosureProgram():
+    """
+    a program (or module) compiled to closures. the memos of its functions were
+    made when it was compiled, so every run starts them over.
+    """
+    __slots__ = ("interpreter", "body", "size", "memos")
+
+    def __init__(self, interpreter, body, size, memos):
+        self.interpreter = interpreter
+        self.body = body
+        self.size = size
+        self.memos = memos # [(declaration, Memo)]
+
+    def run(self):
+        memos = self.interpreter.memos
+        for node, memo in self.memos:
+            if memos.get(node) is not memo:
+                memo.reset()
+                memos[node] = memo
+        self.body([None] * self.size)
+
+class ClosureCompiler():
+    """
+    compiles every syntax tree node into a python closure once, so running a program
+    is a chain of direct calls instead of a walk that re-dispatches on node types.
+
+    expressions compile to `fn(frame) -> value`. statements compile to `fn(frame)`
+    which returns None to carry on, BREAK or CONTINUE to leave a loop early, or a
+    one element tuple holding the value of a `return` that has to travel up to the
+    enclosing function call.
+    """
+    def __init__(self, interpreter):
+        self.interpreter = interpreter
+        self.environment = None # the globals the code being compiled sees
+        self.globals = None # and their dict
+        self.use(interpreter.global_environment)
+
+    def use(self, environment):
+        """
+        compiles what comes next against `environment`: the closures look globals
+        up in its dict directly, so a module's functions keep using the module's
+        globals wherever they're called from. returns the environment used before.
+        """
+        previous = self.environment
+        self.environment = environment
+        self.globals = environment.values
+        return previous
+
+    def compile(self, tree):
+        """
+        compiles a whole program (or module) against the current globals, to be
+        run as many times as needed.
+        """
+        self.use(self.interpreter.global_environment) # the program's, or the module's being imported
+        memos = self.interpreter.memos
+        known = set(memos)
+        body = self.sequence([self.statement(child) for child in tree.children] or [lambda frame: None])
+        made = [(node, memo) for node, memo in memos.items() if node not in known]
+        return ClosureProgram(self.interpreter, body, tree.size, made)
+
+    # helpers
+
+    def sequence(self, statements):
+        if len(statements) == 1:
+            return statements[0]
+
+        statements = tuple(statements)
+        def run(frame):
+            for statement in statements:
+                result = statement(frame)
+                if result is not None:
+                    return result
+        return run
+
+    def block(self, node):
+        body = self.sequence([self.statement(child) for child in node.children])
+        if node.size is None:
+            return body
+
+        padding = [None] * (node.size - 1)
+        def run(frame):
+            return body([frame, *padding])
+        return run
+
+    def load(self, name, depth, slot, token):
+        if depth is None:
+            get = self.globals.get
+            def load_global(frame):
+                value = get(name)
+                if value is None:
+                    raise Error(f"Unkown name '{name}'.", token)
+                return value
+            return load_global
+
+        if depth == 0:
+            return lambda frame: frame[slot]
+        elif depth == 1:
+            return lambda frame: frame[0][slot]
+
+        def load_deref(frame):
+            for _ in range(depth):
+                frame = frame[0]
+            return frame[slot]
+        return load_deref
+
+    def store(self, name, depth, slot, value):
+        if depth is None:
+            globals = self.globals
+            def store_global(frame):
+                globals[name] = value(frame)
+            return store_global
+
+        if depth == 0:
+            def store_fast(frame):
+                frame[slot] = value(frame)
+            return store_fast
+
+        def store_deref(frame):
+            result = value(frame)
+            for _ in range(depth):
+                frame = frame[0]
+            frame[slot] = result
+        return store_deref
+
+    def function(self, node):
+        return self.sequence([self.statement(child) for child in node.statements.children] or [lambda frame: None])
+
+    # statements
+
+    def statement(self, node):
+        if type(node) == Declare:
+            value = self.expression(node.value)
+            return self.store(node.name.value, None if node.slot is None else 0, node.slot, value)
+
+        elif type(node) == Assign:
+            value = self.expression(node.value)
+            return self.store(node.name.token.value, node.name.depth, node.name.slot, value)
+
+        elif type(node) == SetProp:
+            obj = self.expression(node.object)
+            value = self.expression(node.value)
+            token = node.name.token
+            cache = node.cache
+            def set_prop(frame):
+                instance = obj(frame)
+                if not isinstance(instance, Instance):
+                    raise Error("Only instances have fields.", token)
+                result = value(frame)
+                if instance.shape is not cache.shape:
+                    cache.store(instance, result)
+                elif cache.next is None:
+                    instance.values[cache.index] = result
+                else:
+                    instance.shape = cache.next
+                    instance.values.append(result)
+            return set_prop
+
+        elif type(node) == SetItem:
+            obj = self.expression(node.object)
+            index = self.expression(node.index)
+            value = self.expression(node.value)
+            token = node.bracket
+            def set_item(frame):
+                target = obj(frame)
+                position = index(frame)
+                result = value(frame)
+                if type(target) is not List:
+                    set_item = getattr(type(target), "set_item", None)
+                    if set_item is None:
+                        raise Error("Only lists, arrays and bytes can be indexed.", token)
+                    try:
+                        return set_item(target, position, result)
+                    except NativeError as e:
+                        raise Error(e.msg, token) from None
+                if type(position) is not int:
+                    raise Error("List indices must be integers.", token)
+                try:
+                    target.items[position] = result
+                except IndexError:
+                    raise Error("List index out of range.", token) from None
+            return set_item
+
+        elif type(node) == Import:
+            load = self.interpreter.modules.load
+            return lambda frame: load(node)
+
+        elif type(node) == Print:
+            output = self.interpreter.output
+            if node.expression == "":
+                return lambda frame: output.line()
+            value = self.expression(node.expression)
+            write = output.print
+            def print_value(frame):
+                write(value(frame))
+            return print_value
+
+        elif type(node) == CodeBlock:
+            if not node.children:
+                return lambda frame: None
+            return self.block(node)
+
+        elif type(node) == IfStatement:
+            condition = self.expression(node.condition)
+            block = self.statement(node.block)
+            if node.else_block is None:
+                def if_statement(frame):
+                    value = condition(frame)
+                    if not (value is None or value is False):
+                        return block(frame)
+                return if_statement
+
+            else_block = self.statement(node.else_block)
+            def if_else_statement(frame):
+                value = condition(frame)
+                if not (value is None or value is False):
+                    return block(frame)
+                return else_block(frame)
+            return if_else_statement
+
+        elif type(node) == WhileStatement:
+            condition = self.expression(node.condition)
+            block = self.statement(node.block)
+            if node.increment is None:
+                def while_statement(frame):
+                    while True:
+                        value = condition(frame)
+                        if value is None or value is False:
+                            return
+                        result = block(frame)
+                        if result is not None and result is not CONTINUE:
+                            return None if result is BREAK else result
+                return while_statement
+
+            increment = self.statement(node.increment)
+            def for_statement(frame):
+                while True:
+                    value = condition(frame)
+                    if value is None or value is False:
+                        return
+                    result = block(frame)
+                    if result is not None and result is not CONTINUE:
+                        return None if result is BREAK else result
+                    increment(frame)
+            return for_statement
+
+        elif type(node) == ForRange:
+            return self.for_range(node)
+
+        elif type(node) == ForEach:
+            return self.for_each(node)
+
+        elif type(node) == Break:
+            return lambda frame: BREAK
+
+        elif type(node) == Continue:
+            return lambda frame: CONTINUE
+
+        elif type(node) == Return:
+            value = self.expression(node.statement)
+            return lambda frame: (value(frame),)
+
+        elif type(node) == DeclareFunc:
+            body = self.function(node)
+            size = node.size
+            memo = self.interpreter.calls_for(node)
+            globals = self.environment
+            make = lambda frame: ClosureFunction(frame, node, globals, body, size, memo)
+            return self.store(node.name.token.value, None if node.slot is None else 0, node.slot, make)
+
+        elif type(node) == ClassDecl:
+            methods = [(method, self.function(method), self.interpreter.calls_for(method, node)) for method in node.methods]
+            globals = self.environment
+
+            def make_class(frame):
+                bound = {}
+                for method, body, memo in methods:
+                    bound[method.name.token.value] = ClosureFunction(frame, method, globals, body, method.size, memo)
+                return Class(node, bound)
+            return self.store(node.name.token.value, None if node.slot is None else 0, node.slot, make_class)
+
+        expression = self.expression(node)
+        def expression_statement(frame):
+            expression(frame)
+        return expression_statement
+
+    def for_range(self, node):
+        start = self.expression(node.start)
+        block = self.statement(node.block)
+        slot = node.slot
+        inclusive = node.inclusive
+
+        def counted(frame, value, end):
+            while True:
+                bound = end(frame)
+                if not (value <= bound if inclusive else value < bound):
+                    return
+                result = block(frame)
+                if result is not None and result is not CONTINUE:
+                    return None if result is BREAK else result
+                value = value + 1
+                frame[slot] = value
+
+        if type(node.end) != Literal:
+            end = self.expression(node.end)
+            def for_range(frame):
+                value = start(frame)
+                frame[slot] = value
+                return counted(frame, value, end)
+            return for_range
+
+        bound = node.end.token.value
+        end = lambda frame: bound
+        stop = bound + 1 if inclusive and type(bound) is int else bound
+        def for_range_constant(frame):
+            value = start(frame)
+            frame[slot] = value
+            if type(value) is not int or type(bound) is not int:
+                return counted(frame, value, end)
+            # python's range does the counting
+            for value in range(value, stop):
+                frame[slot] = value
+                result = block(frame)
+                if result is not None and result is not CONTINUE:
+                    return None if result is BREAK else result
+            frame[slot] = max(frame[slot], stop) # where the condition would have stopped it
+        return for_range_constant
+
+    def for_each(self, node):
+        iterable = self.expression(node.iterable)
+        block = self.statement(node.block)
+        slot = node.slot
+        token = node.name
+        def for_each(frame):
+            try:
+                iterator = iterate(iterable(frame))
+            except NativeError as e: # a stream that's been closed
+                raise Error(e.msg, token) from None
+            if iterator is None:
+                raise Error("Only lists, arrays and strings can be looped over.", token)
+            # the body's own errors are already Errors, a NativeError comes from getting the next item
+            try:
+                for value in iterator:
+                    frame[slot] = value
+                    result = block(frame)
+                    if result is not None and result is not CONTINUE:
+                        return None if result is BREAK else result
+            except NativeError as e:
+                raise Error(e.msg, token) from None
+        return for_each
+
+    # expressions
+
+    def expression(self, node):
+        if type(node) == Literal:
+            value = node.token.value
+            return lambda frame: value
+
+        elif type(node) == Variable:
+            return self.load(node.token.value, node.depth, node.slot, node.token)
+
+        elif type(node) == Self:
+            return self.load(node.keyword.value, node.depth, node.slot, node.keyword)
+
+        elif type(node) == BinaryOperator:
+            token = position(node)
+            if type(node.right) == Literal:
+                value = node.right.token.value
+                if type(node.left) == Variable and node.left.depth == 0:
+                    return binary_slot_const[node.operator](node.left.slot, value, token)
+                return binary_const[node.operator](self.expression(node.left), value, token)
+            return binary[node.operator](self.expression(node.left), self.expression(node.right), token)
+
+        elif type(node) == UnaryOperator:
+            child = self.expression(node.child)
+            if node.operator.type == TokenType.PLUS:
+                return lambda frame: +child(frame)
+            elif node.operator.type == TokenType.MINUS:
+                token = node.operator
+                def negate(frame):
+                    try:
+                        return -child(frame)
+                    except NativeError as e:
+                        raise Error(e.msg, token) from None
+                return negate
+            def not_operator(frame):
+                value = child(frame)
+                return value is None or value is False
+            return not_operator
+
+        elif type(node) == Logical:
+            left = self.expression(node.left)
+            right = self.expression(node.right)
+            if node.operator.type == TokenType.OR:
+                def or_operator(frame):
+                    value = left(frame)
+                    if value is None or value is False:
+                        return right(frame)
+                    return value
+                return or_operator
+
+            def and_operator(frame):
+                value = left(frame)
+                if value is None or value is False:
+                    return value
+                return right(frame)
+            return and_operator
+
+        elif type(node) == FunctionCall:
+            return self.call(node)
+
+        elif type(node) == GetProp:
+            obj = self.expression(node.object)
+            name = node.name.token.value
+            token = node.name.token
+            cache = node.cache
+            def get_prop(frame):
+                instance = obj(frame)
+                if not isinstance(instance, Instance):
+                    raise Error("Only instances have properties.", token)
+                if instance.shape is not cache.shape:
+                    cache.lookup(instance)
+                if cache.method is not None:
+                    return cache.method.bind(instance)
+                index = cache.index
+                value = None if index is None else instance.values[index]
+                if value is None:
+                    raise Error(f"Unkown property '{name}'", token)
+                return value
+            return get_prop
+
+        elif type(node) == GetItem:
+            obj = self.expression(node.object)
+            index = self.expression(node.index)
+            token = node.bracket
+            def get_item(frame):
+                target = obj(frame)
+                position = index(frame)
+                if type(target) is not List:
+                    get_item = getattr(type(target), "get_item", None)
+                    if get_item is None:
+                        raise Error("Only lists, arrays and bytes can be indexed.", token)
+                    try:
+                        return get_item(target, position)
+                    except NativeError as e:
+                        raise Error(e.msg, token) from None
+                if type(position) is not int:
+                    raise Error("List indices must be integers.", token)
+                try:
+                    return target.items[position]
+                except IndexError:
+                    raise Error("List index out of range.", token) from None
+            return get_item
+
+        elif type(node) == BuiltinList:
+            items = [self.expression(item) for item in node.items]
+            def build_list(frame):
+                return List([item(frame) for item in items])
+            return build_list
+
+        elif type(node) == Await:
+            value = self.expression(node.value)
+            runtime = self.interpreter.runtime
+            token = node.keyword
+            return lambda frame: runtime.wait(value(frame), token)
+
+        raise Exception(f"couldn't compile this: {node}")
+
+    def call(self, node):
+        if type(node.name) == GetProp:
+            return self.method_call(node)
+
+        callee = self.expression(node.name)
+        args = [self.expression(arg) for arg in node.args]
+        count = len(args)
+        token = call_token(node)
+        engine = self
+
+        def call(frame):
+            function = callee(frame)
+            if type(function) is ClosureFunction and function.memo is None:
+                new_frame = [function.closure]
+                for arg in args:
+                    new_frame.append(arg(frame))
+                if count != function.arity_count:
+                    raise Error(f"Wanted {function.arity_count} argument(s), got {count} instead.", token)
+                if function.size > count + 1:
+                    new_frame.extend([None] * (function.size - count - 1))
+                try:
+                    result = function.body(new_frame)
+                except Error as e:
+                    e.happened_in(function.globals.filename)
+                    raise
+                if result is not None:
+                    return result[0]
+                return None
+
+            if not isinstance(function, Callable):
+                raise Error("Only functions are callable.", token)
+            values = [arg(frame) for arg in args]
+            if count != function.arity():
+                raise Error(f"Wanted {function.arity()} argument(s), got {count} instead.", token)
+            try:
+                return function.call(engine, values)
+            except NativeError as e:
+                raise Error(e.msg, token) from None
+        return call
+
+    def method_call(self, node):
+        """
+        "obj.name(args)": a method gets obj as self without being bound first.
+        """
+        obj = self.expression(node.name.object)
+        args = [self.expression(arg) for arg in node.args]
+        count = len(args)
+        name = node.name.name.token.value
+        token = node.name.name.token
+        cache = node.name.cache
+        engine = self
+
+        def method_call(frame):
+            instance = obj(frame)
+            if not isinstance(instance, Instance):
+                raise Error("Only instances have properties.", token)
+            if instance.shape is not cache.shape:
+                cache.lookup(instance)
+            method = cache.method
+
+            if method is None: # a field, called like any other value
+                index = cache.index
+                function = None if index is None else instance.values[index]
+                if function is None:
+                    raise Error(f"Unkown property '{name}'", token)
+                if not isinstance(function, Callable):
+                    raise Error("Only functions are callable.", token)
+                values = [arg(frame) for arg in args]
+                if count != function.arity():
+                    raise Error(f"Wanted {function.arity()} argument(s), got {count} instead.", token)
+                try:
+                    return function.call(engine, values)
+                except NativeError as e:
+                    raise Error(e.msg, token) from None
+
+            if type(method) is ClosureFunction and method.memo is None:
+                new_frame = [method.closure, instance]
+                for arg in args:
+                    new_frame.append(arg(frame))
+                if count != method.arity_count:
+                    raise Error(f"Wanted {method.arity_count} argument(s), got {count} instead.", token)
+                if method.size > count + 2:
+                    new_frame.extend([None] * (method.size - count - 2))
+                try:
+                    result = method.body(new_frame)
+                except Error as e:
+                    e.happened_in(method.globals.filename)
+                    raise
+                if result is not None:
+                    return result[0]
+                return None
+
+            values = [arg(frame) for arg in args]
+            if count != method.arity():
+                raise Error(f"Wanted {method.arity()} argument(s), got {count} instead.", token)
+            try:
+                return method.call_method(engine, instance, values)
+            except NativeError as e:
+                raise Error(e.msg, token) from None
+        return method_call
@@ -0,0 +1,380 @@
+# pyright: reportShadowedImports=none
+from .lexer import TokenType
+from .syntax_tree import *
+from .bytecode import *
+from .optimizer import position
+
+binary_ops = {
+    TokenType.PLUS: ADD,
+    TokenType.MINUS: SUBTRACT,
+    TokenType.MULTIPLY: MULTIPLY,
+    TokenType.DIVIDE: DIVIDE,
+    TokenType.GREATER: GREATER,
+    TokenType.LESS: LESS,
+    TokenType.GREATER_EQUAL: GREATER_EQUAL,
+    TokenType.LESS_EQUAL: LESS_EQUAL,
+    TokenType.EQUAL: EQUAL,
+    TokenType.NOT_EQUAL: NOT_EQUAL,
+}
+
+unary_ops = {
+    TokenType.PLUS: POSITIVE,
+    TokenType.MINUS: NEGATE,
+    TokenType.NOT: NOT,
+}
+
+class Loop():
+    """
+    jumps out of a loop that are waiting for the loop to be finished so they can be patched.
+    """
+    def __init__(self, depth):
+        self.depth = depth # frames pushed when the loop started
+        self.breaks = []
+        self.continues = []
+
+class Compiler():
+    """
+    turns a resolved syntax tree into bytecode for the vm.
+    frame layouts (which slot every local lives in) come from the resolver.
+    """
+    def __init__(self):
+        self.code = None
+        self.loops = []
+        self.depth = 0 # frames pushed by blocks in the code being compiled
+
+    def compile(self, tree, name="<script>") -> Code:
+        self.code = Code(name)
+        self.loops = []
+        self.depth = 0
+        for statement in tree.children:
+            self.statement(statement)
+        self.code.emit(RETURN_NONE)
+        self.code.size = tree.size
+        return self.code
+
+    def load(self, name, depth, slot, token):
+        if depth is None:
+            self.code.emit(LOAD_GLOBAL, self.code.constant(name), token)
+        elif depth == 0:
+            self.code.emit(LOAD_FAST, slot)
+        else:
+            self.code.emit(LOAD_DEREF, slot << 16 | depth)
+
+    def store(self, name, depth, slot):
+        if depth is None:
+            self.code.emit(STORE_GLOBAL, self.code.constant(name))
+        elif depth == 0:
+            self.code.emit(STORE_FAST, slot)
+        else:
+            self.code.emit(STORE_DEREF, slot << 16 | depth)
+
+    # statements
+
+    def block(self, node):
+        if node.size is not None:
+            self.code.emit(PUSH_FRAME, node.size - 1)
+            self.depth += 1
+        for statement in node.children:
+            self.statement(statement)
+        if node.size is not None:
+            self.code.emit(POP_FRAME)
+            self.depth -= 1
+
+    def leave_loop(self, jumps):
+        """
+        jumps out of the innermost loop, popping the frames that were pushed inside it.
+        """
+        loop = self.loops[-1]
+        for _ in range(self.depth - loop.depth):
+            self.code.emit(POP_FRAME)
+        jumps.append(self.code.emit(JUMP))
+
+    def statement(self, node):
+        if type(node) == Declare:
+            self.expression(node.value)
+            self.store(node.name.value, None if node.slot is None else 0, node.slot)
+
+        elif type(node) == Assign:
+            self.expression(node.value)
+            self.store(node.name.token.value, node.name.depth, node.name.slot)
+
+        elif type(node) == SetProp:
+            self.expression(node.object)
+            self.expression(node.value)
+            self.code.emit(SET_PROP, self.code.constant(node.cache), node.name.token)
+
+        elif type(node) == SetItem:
+            self.expression(node.object)
+            self.expression(node.index)
+            self.expression(node.value)
+            self.code.emit(SET_ITEM, 0, node.bracket)
+
+        elif type(node) == Import:
+            self.code.emit(IMPORT, self.code.constant(node), node.keyword)
+
+        elif type(node) == Print:
+            if node.expression == "":
+                self.code.emit(PRINT, 0)
+            else:
+                self.expression(node.expression)
+                self.code.emit(PRINT, 1)
+
+        elif type(node) == CodeBlock:
+            self.block(node)
+
+        elif type(node) == IfStatement:
+            skip_if = self.condition(node.condition, JUMP_IF_FALSE)
+            self.block(node.block)
+            if node.else_block is not None:
+                skip_else = self.code.emit(JUMP)
+                self.code.patch_jump(skip_if, len(self.code.ops))
+                self.block(node.else_block)
+                self.code.patch(skip_else, len(self.code.ops))
+            else:
+                self.code.patch_jump(skip_if, len(self.code.ops))
+
+        elif type(node) == WhileStatement:
+            # the condition is placed after the body so that every iteration
+            # only costs one jump instead of two.
+            entry_jump = self.code.emit(JUMP)
+            start = len(self.code.ops)
+            loop = Loop(self.depth)
+            self.loops.append(loop)
+            self.block(node.block)
+            self.loops.pop()
+
+            for jump in loop.continues:
+                self.code.patch(jump, len(self.code.ops))
+            if node.increment is not None:
+                self.statement(node.increment)
+            self.code.patch(entry_jump, len(self.code.ops))
+            jump = self.condition(node.condition, JUMP_IF_TRUE)
+            self.code.patch_jump(jump, start)
+            for jump in loop.breaks:
+                self.code.patch(jump, len(self.code.ops))
+
+        elif type(node) == ForRange:
+            self.for_range(node)
+
+        elif type(node) == ForEach:
+            self.for_each(node)
+
+        elif type(node) == Break:
+            self.leave_loop(self.loops[-1].breaks)
+
+        elif type(node) == Continue:
+            self.leave_loop(self.loops[-1].continues)
+
+        elif type(node) == Return:
+            self.expression(node.statement)
+            self.code.emit(RETURN)
+
+        elif type(node) == DeclareFunc:
+            prototype = self.function(node)
+            self.code.emit(MAKE_FUNCTION, self.code.constant(prototype))
+            self.store(node.name.token.value, None if node.slot is None else 0, node.slot)
+
+        elif type(node) == ClassDecl:
+            methods = [self.function(method) for method in node.methods]
+            self.code.emit(MAKE_CLASS, self.code.constant(ClassPrototype(node, methods)))
+            self.store(node.name.token.value, None if node.slot is None else 0, node.slot)
+
+        else:
+            self.expression(node)
+            self.code.emit(POP)
+
+    def condition(self, node, jump):
+        """
+        compiles a condition followed by a conditional jump, returning the jump's offset.
+        comparisons against a constant get folded into the jump itself.
+        """
+        if type(node) == BinaryOperator and type(node.right) == Literal:
+            op = binary_ops[node.operator]
+            constant = self.code.constant(node.right.token.value)
+            if GREATER <= op <= NOT_EQUAL and constant <= 0xffff:
+                fused = op + GREATER_CONST_JUMP_IF_FALSE - GREATER
+                if jump == JUMP_IF_TRUE:
+                    fused += GREATER_CONST_JUMP_IF_TRUE - GREATER_CONST_JUMP_IF_FALSE
+
+                if type(node.left) == Variable and node.left.depth == 0 and node.left.slot <= 0xffff:
+                    fused += GREATER_FAST_CONST_JUMP_IF_FALSE - GREATER_CONST_JUMP_IF_FALSE
+                    return self.code.emit(fused, constant << 16 | node.left.slot, position(node))
+
+                self.expression(node.left)
+                return self.code.emit(fused, constant, position(node))
+
+        self.expression(node)
+        return self.code.emit(jump)
+
+    def loop_body(self, block):
+        """
+        compiles the body of a loop, returning the loop so its breaks and continues can be patched.
+        """
+        loop = Loop(self.depth)
+        self.loops.append(loop)
+        self.block(block)
+        self.loops.pop()
+        return loop
+
+    def for_range(self, node):
+        """
+        the counter lives in its slot like any other variable. with a constant bound,
+        adding one, comparing and jumping back to the body is a single instruction.
+        """
+        slot = node.slot
+        op = LESS_EQUAL if node.inclusive else LESS
+        self.expression(node.start)
+        self.code.emit(STORE_FAST, slot)
+
+        constant = self.code.constant(node.end.token.value) if type(node.end) == Literal else None
+        # the fused instructions only have 16 bits for the slot and the constant
+        if constant is not None and constant <= 0xffff and slot <= 0xffff:
+            skip = self.code.emit(op + GREATER_FAST_CONST_JUMP_IF_FALSE - GREATER, constant << 16 | slot)
+        else:
+            constant = None
+            self.code.emit(LOAD_FAST, slot)
+            self.expression(node.end)
+            self.code.emit(op)
+            skip = self.code.emit(JUMP_IF_FALSE)
+
+        start = len(self.code.ops)
+        loop = self.loop_body(node.block)
+        for jump in loop.continues:
+            self.code.patch(jump, len(self.code.ops))
+
+        if constant is not None:
+            self.code.emit(FOR_RANGE_LESS_EQUAL if node.inclusive else FOR_RANGE_LESS, start << 32 | constant << 16 | slot)
+        else:
+            if slot <= 0xffff:
+                self.code.emit(ADD_FAST_CONST, self.code.constant(1) << 16 | slot)
+            else:
+                self.code.emit(LOAD_FAST, slot)
+                self.code.emit(ADD_CONST, self.code.constant(1))
+            self.code.emit(STORE_FAST, slot)
+            self.code.emit(LOAD_FAST, slot)
+            self.expression(node.end)
+            self.code.emit(op)
+            self.code.emit(JUMP_IF_TRUE, start)
+
+        self.code.patch_jump(skip, len(self.code.ops))
+        for jump in loop.breaks:
+            self.code.patch(jump, len(self.code.ops))
+
+    def for_each(self, node):
+        self.expression(node.iterable)
+        self.code.emit(GET_ITER, node.iterator_slot, node.name)
+        entry_jump = self.code.emit(JUMP)
+        start = len(self.code.ops)
+        loop = self.loop_body(node.block)
+
+        next_item = len(self.code.ops)
+        for jump in loop.continues:
+            self.code.patch(jump, next_item)
+        self.code.patch(entry_jump, next_item)
+        self.code.emit(FOR_ITER, start << 64 | node.iterator_slot << 32 | node.slot, node.name)
+        for jump in loop.breaks:
+            self.code.patch(jump, len(self.code.ops))
+
+    def function(self, node) -> FunctionPrototype:
+        outer = self.code, self.loops, self.depth
+        self.code = Code(node.name.token.value)
+        self.loops = []
+        self.depth = 0
+        for statement in node.statements.children:
+            self.statement(statement)
+        self.code.emit(RETURN_NONE)
+        self.code.size = node.size
+        code = self.code
+        self.code, self.loops, self.depth = outer
+        return FunctionPrototype(node, code)
+
+    # expressions
+
+    def expression(self, node):
+        if type(node) == Literal:
+            self.code.emit(CONST, self.code.constant(node.token.value))
+
+        elif type(node) == Variable:
+            self.load(node.token.value, node.depth, node.slot, node.token)
+
+        elif type(node) == Self:
+            self.load(node.keyword.value, node.depth, node.slot, node.keyword)
+
+        elif type(node) == BinaryOperator:
+            # arrays make operators fail with a NativeError, see arrays.py
+            token = position(node)
+            if type(node.right) == Literal:
+                op = binary_ops[node.operator]
+                constant = self.code.constant(node.right.token.value)
+                if type(node.left) == Variable and node.left.depth == 0 and node.left.slot <= 0xffff:
+                    self.code.emit(op + FAST_CONST_OFFSET, constant << 16 | node.left.slot, token)
+                else:
+                    self.expression(node.left)
+                    self.code.emit(op + CONST_OFFSET, constant, token)
+            else:
+                self.expression(node.left)
+                self.expression(node.right)
+                self.code.emit(binary_ops[node.operator], token=token)
+
+        elif type(node) == UnaryOperator:
+            self.expression(node.child)
+            self.code.emit(unary_ops[node.operator.type], token=node.operator)
+
+        elif type(node) == Logical:
+            self.expression(node.left)
+            op = JUMP_IF_TRUE_OR_POP if node.operator.type == TokenType.OR else JUMP_IF_FALSE_OR_POP
+            jump = self.code.emit(op)
+            self.expression(node.right)
+            self.code.patch(jump, len(self.code.ops))
+
+        elif type(node) == FunctionCall:
+            if type(node.name) == GetProp:
+                self.expression(node.name.object)
+                self.code.emit(LOAD_METHOD, self.code.constant(node.name.cache), node.name.name.token)
+                for arg in node.args:
+                    self.expression(arg)
+                self.code.emit(CALL_METHOD, len(node.args), call_token(node))
+                return
+
+            self.expression(node.name)
+            for arg in node.args:
+                self.expression(arg)
+            self.code.emit(CALL, len(node.args), call_token(node))
+
+        elif type(node) == GetProp:
+            self.expression(node.object)
+            self.code.emit(GET_PROP, self.code.constant(node.cache), node.name.token)
+
+        elif type(node) == GetItem:
+            self.expression(node.object)
+            self.expression(node.index)
+            self.code.emit(GET_ITEM, 0, node.bracket)
+
+        elif type(node) == BuiltinList:
+            for item in node.items:
+                self.expression(item)
+            self.code.emit(BUILD_LIST, len(node.items))
+
+        elif type(node) == Await:
+            self.expression(node.value)
+            self.code.emit(AWAIT, 0, node.keyword)
+
+        else:
+            raise Exception(f"couldn't compile this: {node}")
+
+def call_token(node):
+    """
+    the token that errors about a call should point at.
+    """
+    callee = node.name
+    while True:
+        if type(callee) == GetProp:
+            return callee.name.token
+        elif type(callee) == FunctionCall:
+            callee = callee.name
+        elif type(callee) == Self:
+            return callee.keyword
+        elif hasattr(callee, "token"):
+            return callee.token
+        else:
+            return None
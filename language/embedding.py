@@ -0,0 +1,125 @@
+"""
+running programs from python, for hosts that embed the language.
+
+    program = compile(source)
+    program.run(globals={"limit": 10}, stdout=buffer)
+
+`compile` puts the source through the front end once, and the program it gives
+back can be run any number of times. every run starts from fresh globals (the
+builtins, plus whatever the host passes in) and hands back the globals the
+program left behind, so runs don't see each other. errors are raised as
+`Error`, with the line and column they happened at, instead of being printed.
+
+programs share one interpreter per engine, made the first time it's needed, so
+only the first compile pays for setting one up. an interpreter runs one
+program at a time: hosts running programs from several threads at once should
+give each thread an `Interpreter` of its own (see `compile`).
+
+`register` makes a python function a builtin for every program. host
+functions get the program's values as they are, and can raise `NativeError` to
+report an error at the call. lists passed in as globals become the language's
+lists, and functions become builtins.
+
+importing this doesn't run anything or read the command line, and the parts of
+the interpreter only some programs need (the on-disk cache, parallel_map,
+asyncio, numpy, readline) are imported when they're first used.
+"""
+from .error import Error, NativeError
+from .function_obj import BuiltinFunction, Callable, Instance, List
+from .main import Interpreter, engines
+
+interpreters = {} # engine -> the interpreter programs compiled for it share
+host_builtins = {} # name -> (function, argument names), added to every interpreter
+
+def interpreter_for(engine):
+    interpreter = interpreters.get(engine)
+    if interpreter is None:
+        if engine not in engines:
+            raise ValueError(f"unknown engine '{engine}' (expected one of: {', '.join(engines)})")
+        interpreter = interpreters[engine] = Interpreter(engine)
+        for name, (function, args) in host_builtins.items():
+            interpreter.define_builtin(name, function, args)
+    return interpreter
+
+def parameters(function):
+    import inspect # only needed for functions registered without their arguments
+    try:
+        return tuple(inspect.signature(function).parameters)
+    except (TypeError, ValueError):
+        raise TypeError(f"couldn't tell what arguments {function!r} takes, pass them to register()") from None
+
+def register(name, function, args=None):
+    """
+    makes `function` a builtin called `name` in the shared interpreters (an
+    interpreter of your own has `define_builtin`). `args` names its arguments;
+    only their number matters, and it's taken from the function when left out.
+    """
+    if args is None:
+        args = parameters(function)
+    host_builtins[name] = (function, tuple(args))
+    for interpreter in interpreters.values():
+        interpreter.define_builtin(name, function, tuple(args))
+
+def to_value(name, value):
+    """
+    a python value passed in as a global, as the program should see it.
+    """
+    if type(value) is list or type(value) is tuple:
+        return List([to_value(name, item) for item in value])
+    if callable(value) and not isinstance(value, (Callable, Instance)):
+        return BuiltinFunction(name, value, parameters(value))
+    return value
+
+class Program():
+    """
+    a program that went through the front end, ready to run.
+    """
+    __slots__ = ("interpreter", "tree")
+
+    def __init__(self, interpreter, tree):
+        self.interpreter = interpreter
+        self.tree = tree # the resolved tree, bytecode for the vm, or closures for the closure engine
+
+    def __repr__(self):
+        return f"<program for the {self.interpreter.engine} engine>"
+
+    def run(self, globals=None, stdout=None):
+        """
+        runs the program with the builtins and `globals` (a dict) as its globals,
+        printing to `stdout` (sys.stdout if not given). returns the globals it
+        ends with, builtins aside.
+        """
+        interpreter = self.interpreter
+        builtins = interpreter.builtins
+        values = interpreter.global_environment.values
+        # updated in place, functions from earlier runs hold on to these globals
+        values.clear()
+        values.update(builtins)
+        if globals is not None:
+            for name, value in globals.items():
+                values[name] = to_value(name, value)
+
+        output = interpreter.output
+        stream, output.stream = output.stream, stdout
+        try:
+            interpreter.run_program(self.tree)
+        finally:
+            output.flush()
+            output.stream = stream
+        return {name: value for name, value in values.items() if builtins.get(name) is not value}
+
+def compile(source, engine="tree", interpreter=None):
+    """
+    parses and resolves a program (and compiles it, for the vm and the closure
+    engine) to be run later. raises `Error` if it doesn't parse. the program runs on the shared
+    interpreter for `engine`, unless it's given one of its own.
+    """
+    if interpreter is None:
+        interpreter = interpreter_for(engine)
+    interpreter.is_shell = False
+    interpreter.filename = None
+    program = interpreter.front_end(source)
+    if interpreter.engine == "closure":
+        # compiled once here rather than on every run
+        program = interpreter.closure_compiler.compile(program)
+    return Program(interpreter, program)
@@ -0,0 +1,38 @@
+from .error import Error
+
+# local scopes are plain lists with a fixed size, worked out by the resolver:
+#
+#   [parent frame, slot 1, slot 2, ...]
+#
+# every local read or write is an index into one of these, after walking up
+# `depth` parent links. only globals are looked up by name, in an Environment.
+
+def new_frame(parent, size):
+    frame = [None] * size
+    frame[0] = parent
+    return frame
+
+def ancestor(frame, depth):
+    for _ in range(depth):
+        frame = frame[0]
+    return frame
+
+class Environment():
+    """
+    the global scope. globals can be declared from anywhere (the shell, builtins,
+    functions assigning to names they never declared) so they stay in a dict.
+    """
+    __slots__ = ("values", "filename")
+
+    def __init__(self, filename=None):
+        self.values = {}
+        self.filename = filename # the module's path, None for the program being run
+
+    def __repr__(self):
+        return "".join([f"{key} ({type(key)}): {value}" for key, value in self.values.items()])
+
+    def get(self, name):
+        return self.values.get(name)
+
+    def assign(self, name, value):
+        self.values[name] = value
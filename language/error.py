@@ -0,0 +1,33 @@
+class Error(Exception):
+    def __init__(self, msg, token, *args: object) -> None:
+        super().__init__(*args)
+        self.msg = msg
+        self.line = token.line
+        self.column = token.column
+        self.filename = None # the module it happened in, when it isn't the program being run
+        self.located = False # whether filename has been worked out yet
+
+    def happened_in(self, filename):
+        """
+        records the file of the module whose code raised the error. the engines
+        call it for every function the error leaves, and only the innermost one
+        knows where it came from.
+        """
+        if not self.located:
+            self.filename = filename
+            self.located = True
+
+    def __str__(self):
+        where = f"line {self.line}, column {self.column}"
+        if self.filename is not None:
+            where = f"{self.filename}, {where}"
+        return f"{self.msg} ({where})"
+
+class NativeError(Exception):
+    """
+    raised by builtins, which don't know where they were called from. the engine
+    that made the call turns it into an Error pointing at the call.
+    """
+    def __init__(self, msg) -> None:
+        super().__init__(msg)
+        self.msg = msg
@@ -0,0 +1,210 @@
+"""
+reading and writing files, without ever holding a whole one in memory.
+
+- `open_lines(path)` is a stream of the file's lines, read through a large
+  buffer as a `for` loop asks for them.
+- `mmap_file(path)` maps a file into memory and hands back its bytes: indexing,
+  `slice` and `find` go straight to the mapping, so only the pages that get
+  touched are ever read, and slicing copies nothing. `read_bytes(path)` does the
+  same, but falls back to reading files that can't be mapped (pipes, devices).
+- `open_writer(path)` writes through a large buffer.
+
+like lists, every value of one of these types shares a single class for its methods.
+"""
+import mmap
+import os
+import stat
+from .error import NativeError
+from .function_obj import Class, Instance, NativeMethod
+
+BUFFER_SIZE = 1 << 20 # bytes read or written at a time
+
+def check_path(path, builtin):
+    if type(path) is not str:
+        raise NativeError(f"{builtin}() takes a path.")
+
+def failure(path, error):
+    return NativeError(f"Couldn't open '{path}': {error.strerror or error}.")
+
+class Lines(Instance):
+    """
+    the lines of a file, without their line breaks. the file is opened straight
+    away, so a bad path is reported where it's given, and read as it's looped
+    over. a stream can only be looped over once, and the file is closed once
+    it's done. looping over it after that (or after `close()`) is an error.
+    """
+    __slots__ = ("file",)
+
+    def __init__(self, file):
+        self.clss = lines_class
+        self.shape = lines_class.shape
+        self.values = []
+        self.file = file
+
+    def __repr__(self):
+        return f"<lines of '{self.file.name}'>"
+
+    def elements(self):
+        # checked before the generator starts, so the loop fails where it begins
+        if self.file.closed:
+            raise NativeError("Can't loop over a closed stream.")
+        return self.lines()
+
+    def lines(self):
+        with self.file:
+            try:
+                for line in self.file:
+                    yield line.rstrip("\r\n")
+            except ValueError:
+                if not self.file.closed:
+                    raise
+                raise NativeError("The stream was closed while it was looped over.") from None
+
+    def close(self):
+        self.file.close()
+
+lines_class = Class(None, {
+    "close": NativeMethod("close", Lines.close),
+})
+
+class Bytes(Instance):
+    """
+    a range of bytes, read-only. `buffer` is a memory map or a bytes object and
+    `start`/`end` the part of it this value covers, so slices share the buffer.
+    """
+    __slots__ = ("buffer", "start", "end")
+
+    def __init__(self, buffer, start, end):
+        self.clss = bytes_class
+        self.shape = bytes_class.shape
+        self.values = []
+        self.buffer = buffer
+        self.start = start
+        self.end = end
+
+    def __repr__(self):
+        return f"<{self.end - self.start} bytes>"
+
+    def get_item(self, index):
+        if type(index) is not int:
+            raise NativeError("Byte indices must be integers.")
+        if index < 0:
+            index += self.end - self.start
+        if not 0 <= index < self.end - self.start:
+            raise NativeError("Byte index out of range.")
+        return self.buffer[self.start + index]
+
+    def set_item(self, index, value):
+        raise NativeError("Bytes are read-only.")
+
+    def length(self):
+        return self.end - self.start
+
+    def elements(self):
+        return iter(memoryview(self.buffer)[self.start:self.end])
+
+    def slice(self, start, end):
+        if type(start) is not int or type(end) is not int:
+            raise NativeError("Byte slice bounds must be integers.")
+        # the same bounds python would pick for a slice, without copying it
+        start, end, _ = slice(start, end).indices(self.end - self.start)
+        return Bytes(self.buffer, self.start + start, self.start + max(start, end))
+
+    def find(self, text, start):
+        """
+        where the text next appears at or after `start`, or -1.
+        """
+        if type(text) is not str or type(start) is not int:
+            raise NativeError("find() takes a string and the index to start at.")
+        found = self.buffer.find(text.encode(), self.start + max(start, 0), self.end)
+        return -1 if found < 0 else found - self.start
+
+    def text(self):
+        return bytes(self.buffer[self.start:self.end]).decode("utf-8", "replace")
+
+bytes_class = Class(None, {
+    "length": NativeMethod("length", Bytes.length),
+    "slice": NativeMethod("slice", Bytes.slice, ("start", "end")),
+    "find": NativeMethod("find", Bytes.find, ("text", "start")),
+    "text": NativeMethod("text", Bytes.text),
+})
+
+class Writer(Instance):
+    __slots__ = ("file",)
+
+    def __init__(self, file):
+        self.clss = writer_class
+        self.shape = writer_class.shape
+        self.values = []
+        self.file = file
+
+    def __repr__(self):
+        return f"<writer for '{self.file.name}'>"
+
+    def write(self, value):
+        """
+        writes a value the way print would show it, without the line break.
+        """
+        if self.file.closed:
+            raise NativeError("Can't write to a closed file.")
+        self.file.write(value if type(value) is str else str(value))
+
+    def write_line(self, value):
+        self.write(value)
+        self.file.write("\n")
+
+    def close(self):
+        self.file.close()
+
+writer_class = Class(None, {
+    "write": NativeMethod("write", Writer.write, ("value",)),
+    "write_line": NativeMethod("write_line", Writer.write_line, ("value",)),
+    "close": NativeMethod("close", Writer.close),
+})
+
+# builtins
+
+def open_lines(path):
+    check_path(path, "open_lines")
+    try:
+        return Lines(open(path, encoding="utf-8", errors="replace", buffering=BUFFER_SIZE))
+    except OSError as e:
+        raise failure(path, e) from None
+
+def map_file(path, fallback):
+    try:
+        with open(path, "rb") as f:
+            info = os.fstat(f.fileno())
+            if stat.S_ISREG(info.st_mode):
+                if info.st_size == 0:
+                    return Bytes(b"", 0, 0) # an empty file can't be mapped
+                # the mapping stays valid after the file is closed
+                return Bytes(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ), 0, info.st_size)
+            if not fallback:
+                raise NativeError(f"Only regular files can be mapped into memory, '{path}' isn't one.")
+            data = f.read()
+            return Bytes(data, 0, len(data))
+    except OSError as e:
+        raise failure(path, e) from None
+
+def mmap_file(path):
+    check_path(path, "mmap_file")
+    return map_file(path, False)
+
+def read_bytes(path):
+    check_path(path, "read_bytes")
+    return map_file(path, True)
+
+def open_writer(path):
+    check_path(path, "open_writer")
+    try:
+        return Writer(open(path, "w", encoding="utf-8", buffering=BUFFER_SIZE))
+    except OSError as e:
+        raise failure(path, e) from None
+
+builtins = {
+    "open_lines": (open_lines, ("path",)),
+    "mmap_file": (mmap_file, ("path",)),
+    "read_bytes": (read_bytes, ("path",)),
+    "open_writer": (open_writer, ("path",)),
+}
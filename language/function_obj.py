@@ -0,0 +1,388 @@
+from collections import OrderedDict
+from .environment import new_frame
+from .error import Error, NativeError
+
+class Signal():
+  """
+  statements hand one of these back when control has to leave a loop early.
+  a return hands back its value wrapped in a one element tuple instead, so any
+  completion other than None means "stop running this block".
+  """
+  __slots__ = ("name",)
+
+  def __init__(self, name):
+      self.name = name
+
+  def __repr__(self):
+      return f"<{self.name}>"
+
+BREAK = Signal("break")
+CONTINUE = Signal("continue")
+
+class Callable():
+    __slots__ = ()
+
+    def __init__(self) -> None:
+        pass
+
+    def call(self, interpreter, args):
+        pass
+
+
+missing = object()
+
+class Memo():
+    """
+    the results of a pure function, keyed by its arguments.
+    once it holds `size` results the least recently used one is evicted.
+    """
+    __slots__ = ("name", "size", "results", "hits", "misses")
+
+    def __init__(self, name, size):
+        self.name = name
+        self.size = size
+        self.results = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, args):
+        # 1, 1.0 and true are the same key to python, but not to the program
+        key = (*args, *map(type, args))
+        try:
+            hash(key)
+        except TypeError:
+            return None
+        return key
+
+    def lookup(self, key):
+        """
+        the result remembered for the key, or `missing`.
+        """
+        result = self.results.get(key, missing)
+        if result is missing:
+            self.misses += 1
+        else:
+            self.hits += 1
+            self.results.move_to_end(key)
+        return result
+
+    def store(self, key, result):
+        self.results[key] = result
+        if len(self.results) > self.size:
+            self.results.popitem(last=False)
+
+    def reset(self):
+        # forgets everything, for code that runs again with the same memo
+        self.results.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def call(self, invoke, interpreter, args):
+        key = self.key(args)
+        if key is None:
+            return invoke(interpreter, args)
+
+        result = self.lookup(key)
+        if result is missing:
+            result = invoke(interpreter, args)
+            self.store(key, result)
+        return result
+
+class Function(Callable):
+    __slots__ = ("closure", "expr", "args", "globals", "memo")
+
+    def __init__(self, closure, expr, globals, memo=None):
+        self.closure = closure
+        self.expr = expr
+        self.args = expr.args
+        self.globals = globals # the Environment of the module (or program) it was declared in
+        self.memo = memo # what calls go through before the body runs, see Interpreter.calls_for
+
+    def __repr__(self):
+        name = self.expr.name.token
+        return f"<fn {name.value} at {name.line}:{name.column}>"
+    
+    def arity(self):
+        return len(self.args)
+
+    def call(self, interpreter, args):
+        if self.memo is not None:
+            return self.memo.call(self.invoke, interpreter, args)
+        return self.invoke(interpreter, args)
+
+    def invoke(self, interpreter, args):
+        environment = new_frame(self.closure, self.expr.size)
+        environment[1:len(args) + 1] = args # arguments (after self, for methods) take the first slots
+
+        globals = interpreter.global_environment
+        # a function from another module sees that module's globals while it runs
+        interpreter.global_environment = self.globals
+        try:
+            completion = interpreter.traverse_block(self.expr.statements, environment)
+        except Error as e:
+            e.happened_in(self.globals.filename)
+            raise
+        finally:
+            interpreter.global_environment = globals
+        if completion is not None:
+            return completion[0]
+        
+    def bind(self, instance):
+        return BoundMethod(self, instance)
+
+    def call_method(self, interpreter, instance, args):
+        # methods find "self" in the slot before their arguments
+        return self.call(interpreter, [instance, *args])
+
+class BuiltinFunction(Function):
+    __slots__ = ("name", "action")
+
+    def __init__(self, name, action, args=()):
+        self.name = name
+        self.action = action
+        self.args = args # only their number matters, for the arity check
+
+    def call(self, interpreter, args):
+        return self.action(*args)
+
+    def __repr__(self):
+        return f"<native fn {self.name}>"
+    
+    def bind(self, instance):
+        return self
+
+    def call_method(self, interpreter, instance, args):
+        return self.call(interpreter, args) # native methods are bound when they're made
+
+class NativeMethod(BuiltinFunction):
+    """
+    a method of a built-in type, shared by every value of that type instead of
+    being made for each one. its action gets the value before the arguments.
+    """
+    __slots__ = ()
+
+    def __repr__(self):
+        return f"<native method {self.name}>"
+
+    def bind(self, instance):
+        return BoundMethod(self, instance)
+
+    def call_method(self, interpreter, instance, args):
+        return self.action(instance, *args)
+
+class BoundMethod(Callable):
+    """
+    a method read off an instance as a value, e.g. `let m = list.sum;`.
+    calls that go straight to a method (`list.sum()`) don't need one.
+    """
+    __slots__ = ("function", "instance")
+
+    def __init__(self, function, instance):
+        self.function = function
+        self.instance = instance
+
+    def __repr__(self):
+        return repr(self.function)
+
+    def arity(self):
+        return self.function.arity()
+
+    def call(self, interpreter, args):
+        return self.function.call_method(interpreter, self.instance, args)
+
+class Shape():
+    """
+    the layout of an instance's fields: which index of its `values` every field is
+    stored at. instances that had the same fields set in the same order share a
+    shape, so field names are stored once per shape instead of once per instance.
+    setting a new field moves an instance on to the next shape, and every shape
+    remembers where each new field leads so that those are shared too.
+    """
+    __slots__ = ("slots", "transitions")
+
+    def __init__(self, slots):
+        self.slots = slots # field name -> index
+        self.transitions = {} # field name -> the shape with that field added
+
+    def add(self, name):
+        shape = self.transitions.get(name)
+        if shape is None:
+            shape = self.transitions[name] = Shape({**self.slots, name: len(self.slots)})
+        return shape
+
+class Class(Callable):
+    __slots__ = ("expr", "args", "methods", "shape")
+
+    def __init__(self, expr, methods):
+        self.expr = expr
+        self.args = []
+        self.methods = methods
+        self.shape = Shape({}) # every class has its own, so a shape also tells the class apart
+
+    def __repr__(self) -> str:
+        return f"<class '{self.expr.name}'>"
+    
+    def arity(self):
+        new_fn = self.methods.get("new")
+        if new_fn is None:
+            return 0
+        return new_fn.arity()
+    
+    def call(self, interpreter, args):
+        instance = Instance(self)
+        new_fn = self.methods.get("new")
+        if new_fn is not None:
+            new_fn.call_method(interpreter, instance, args)
+        return instance
+    
+    def get_method(self, name):
+        return self.methods.get(name)
+    
+class Instance():
+    __slots__ = ("clss", "shape", "values")
+
+    def __init__(self, clss) -> None:
+        self.clss = clss
+        self.shape = clss.shape
+        self.values = [] # field values, laid out by the shape
+
+    def get(self, name):
+        method = self.clss.get_method(name)
+        if method is not None:
+            return method.bind(self)
+        return self.field(name)
+
+    def field(self, name):
+        index = self.shape.slots.get(name)
+        if index is None:
+            return None
+        return self.values[index]
+    
+    def set(self, name, value):
+        index = self.shape.slots.get(name)
+        if index is None:
+            self.shape = self.shape.add(name)
+            self.values.append(value)
+        else:
+            self.values[index] = value
+
+    def __repr__(self):
+        return f"<'{self.clss.expr.name.token.value}' object>"
+
+class List(Instance):
+    """
+    a list value. its items live in a python list, so `xs[i]` is an index into it
+    and `push` is amortized O(1). every list has `list_class` as its class, so
+    the methods below are made once and property caches see a single shape.
+    """
+    __slots__ = ("items",)
+
+    def __init__(self, items):
+        self.clss = list_class
+        self.shape = list_class.shape
+        self.values = [] # lists can have fields too, like any instance
+        self.items = items
+
+    def __repr__(self):
+        return f"{self.items}"
+
+    def length(self):
+        return len(self.items)
+
+    def elements(self):
+        return iter(self.items) # sees items pushed while looping, like indexing up to length() would
+
+    def push(self, value):
+        self.items.append(value)
+
+    def pop(self):
+        if not self.items:
+            raise NativeError("Can't pop from an empty list.")
+        return self.items.pop()
+
+    def slice(self, start, end):
+        if type(start) is not int or type(end) is not int:
+            raise NativeError("List slice bounds must be integers.")
+        return List(self.items[start:end])
+
+    def sort(self):
+        try:
+            self.items.sort()
+        except TypeError:
+            raise NativeError("Only lists of numbers or of strings can be sorted.") from None
+
+def iterate(value):
+    """
+    a python iterator over what `for x in value:` loops over, or None if it
+    can't be looped over.
+    """
+    if type(value) is str:
+        return iter(value)
+    elements = getattr(type(value), "elements", None)
+    return None if elements is None else elements(value)
+
+list_class = Class(None, {
+    "length": NativeMethod("length", List.length),
+    "push": NativeMethod("push", List.push, ("value",)),
+    "pop": NativeMethod("pop", List.pop),
+    "slice": NativeMethod("slice", List.slice, ("start", "end")),
+    "sort": NativeMethod("sort", List.sort),
+})
+
+class PropertyCache():
+    """
+    an inline cache for one place in the program that reads a property. it holds the
+    shape of the last instance read from there and what the name turned out to be
+    for that shape: a method of the class, or the index of a field. as long as
+    instances of the same shape come through, reading a field is an index load.
+    """
+    __slots__ = ("name", "shape", "method", "index")
+
+    def __init__(self, name):
+        self.name = name
+        self.shape = None
+        self.method = None
+        self.index = None
+
+    def __repr__(self):
+        return repr(self.name)
+
+    def lookup(self, instance):
+        """
+        fills the cache in for this instance's shape. when the name is neither a
+        method nor a field that's been set, both `method` and `index` end up None.
+        """
+        shape = instance.shape
+        self.method = instance.clss.get_method(self.name)
+        self.index = shape.slots.get(self.name)
+        self.shape = shape if self.method is not None or self.index is not None else None
+
+class StoreCache():
+    """
+    an inline cache for one place in the program that sets a field: the shape the
+    last instance had there, the index the value went to, and the shape the
+    instance moved on to if the field was new to it (None otherwise).
+    """
+    __slots__ = ("name", "shape", "index", "next")
+
+    def __init__(self, name):
+        self.name = name
+        self.shape = None
+        self.index = None
+        self.next = None
+
+    def __repr__(self):
+        return repr(self.name)
+
+    def store(self, instance, value):
+        shape = instance.shape
+        index = shape.slots.get(self.name)
+        if index is None:
+            self.next = instance.shape = shape.add(self.name)
+            self.index = len(instance.values)
+            instance.values.append(value)
+        else:
+            self.next = None
+            self.index = index
+            instance.values[index] = value
+        self.shape = shape
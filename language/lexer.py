@@ -0,0 +1,223 @@
+import re
+from .error import Error
+
+class TokenType():
+  """
+  token types are small ints rather than enum members: they get compared all the
+  time while parsing and running, and ints are much cheaper to look up and compare.
+  """
+  PLUS = 0
+  MINUS = 1
+  MULTIPLY = 2
+  DIVIDE = 3
+  NUM = 4
+  STRING = 5
+  BOOL = 6
+  PAROPEN = 7
+  PARCLOSE = 8
+  ASSIGN = 9
+  NAME = 10
+  EOF = 11
+  SEPR = 12
+  TYPE = 13
+  FUNCOPEN = 14
+  END = 15
+  COLON = 16
+  COMMA = 17
+  RETURN = 18
+  PRINT = 19
+  IF = 20
+  ENDIF = 21
+  ELSE = 22
+  GREATER = 23
+  LESS = 24
+  EQUAL = 25
+  NOT = 26
+  GREATER_EQUAL = 27
+  LESS_EQUAL = 28
+  OR = 29
+  AND = 30
+  NOT_EQUAL = 31
+  WHILE = 32
+  FOR = 33
+  DECL = 34
+  TERNARY = 35
+  INCREMENT = 36
+  DECREMENT = 37
+  CLASS_DECL = 38
+  DOT = 39
+  SELF = 40
+  LIST_OPEN = 41
+  LIST_CLOSE = 42
+  ANNOTATION = 43
+  BREAK = 44
+  CONTINUE = 45
+  IN = 46
+  ASYNC = 47
+  AWAIT = 48
+  IMPORT = 49
+
+token_names = {value: name for name, value in vars(TokenType).items() if name.isupper()}
+
+ops = {"+": TokenType.PLUS, "-": TokenType.MINUS, "*": TokenType.MULTIPLY, "/": TokenType.DIVIDE}
+
+class Token():
+  __slots__ = ("type", "value", "line", "column")
+
+  def __init__(self, type, value, line=1, column=1):
+    self.type = type
+    self.value = value
+    self.line = line
+    self.column = column
+
+  def __str__(self):
+    return f"Token({token_names.get(self.type, self.type)}, {self.value} @ {self.line}:{self.column})"
+
+  def __repr__(self):
+    return self.__str__()
+
+# every token (and everything between tokens) is one alternative of a single pattern,
+# so the scanner never has to look at a character more than once.
+token_pattern = re.compile(r"""
+  (?P<newline>\r\n|[\n\r\v\f\x1c-\x1e\x85\u2028\u2029])
+  |(?P<space>[^\S\n\r\v\f\x1c-\x1e\x85\u2028\u2029]+)
+  |(?P<comment>//(?:[^\r\n]|\r(?!\n))*)
+  |(?P<num>\d[\d.]*)
+  |(?P<word>[^\W\d_]\w*)
+  |(?P<string>"[^"]*"|'[^']*')
+  |(?P<annotation>@[^\W\d_]\w*)
+  |(?P<op>==|\+\+|--|>=|<=|!=|[-=+*/();?:,><!\[\].])
+  |(?P<error>.)
+""", re.VERBOSE | re.DOTALL)
+
+# the same line breaks `str.splitlines` knows about
+newline_pattern = re.compile(r"\r\n|[\n\r\v\f\x1c-\x1e\x85\u2028\u2029]")
+
+symbols = {
+  "==": TokenType.EQUAL,
+  "=": TokenType.ASSIGN,
+  "++": TokenType.INCREMENT,
+  "--": TokenType.DECREMENT,
+  "+": TokenType.PLUS,
+  "-": TokenType.MINUS,
+  "*": TokenType.MULTIPLY,
+  "/": TokenType.DIVIDE,
+  "(": TokenType.PAROPEN,
+  ")": TokenType.PARCLOSE,
+  ";": TokenType.SEPR,
+  ":": TokenType.COLON,
+  ",": TokenType.COMMA,
+  ">=": TokenType.GREATER_EQUAL,
+  "<=": TokenType.LESS_EQUAL,
+  "!=": TokenType.NOT_EQUAL,
+  ">": TokenType.GREATER,
+  "<": TokenType.LESS,
+  "!": TokenType.NOT,
+  "[": TokenType.LIST_OPEN,
+  "]": TokenType.LIST_CLOSE,
+  ".": TokenType.DOT,
+}
+
+class Lexer():
+  def __init__(self) -> None:
+      self.content = " "
+      self.keywords = {
+        "num": (TokenType.TYPE, TokenType.NUM),
+        "fn": (TokenType.FUNCOPEN, "fn"),
+        "end": (TokenType.END, "end"),
+        "return": (TokenType.RETURN, "return"),
+        "print": (TokenType.PRINT, "print"),
+        "if": (TokenType.IF, "if"),
+        "fi": (TokenType.ENDIF, "fi"),
+        "else": (TokenType.ELSE, "else"),
+        "or": (TokenType.OR, "or"),
+        "and": (TokenType.AND, "and"),
+        "while": (TokenType.WHILE, "while"),
+        "for": (TokenType.FOR, "for"),
+        "in": (TokenType.IN, "in"),
+        "async": (TokenType.ASYNC, "async"),
+        "await": (TokenType.AWAIT, "await"),
+        "import": (TokenType.IMPORT, "import"),
+        "break": (TokenType.BREAK, "break"),
+        "continue": (TokenType.CONTINUE, "continue"),
+        "let": (TokenType.DECL, "let"),
+        "true": (TokenType.BOOL, True),
+        "false": (TokenType.BOOL, False),
+        "class": (TokenType.CLASS_DECL, "class"),
+        "self": (TokenType.SELF, "self")
+      }
+
+  def get_num(self, text):
+    if "." in text:
+      if len(text.split(".")) > 2:
+        print(f"\x1b[0minvalid float {text}")
+        return
+    
+      return float(text)
+    else:
+      return int(text)
+
+  def tokenize(self):
+    """
+    generates the tokens of `self.content` in a single pass, as the parser asks for them.
+
+    the line number and the offset the current line starts at are carried along as
+    the scanner moves, so a token's position is just a subtraction. columns count
+    from 1. names, keywords and strings are positioned at their last character,
+    everything else at its first.
+    """
+    keywords = self.keywords
+    line = 1
+    line_start = 0 # offset of the first character on the current line
+
+    for match in token_pattern.finditer(self.content):
+      kind = match.lastgroup
+      start = match.start()
+
+      if kind == "space":
+        continue
+
+      elif kind == "newline":
+        line += 1
+        line_start = match.end()
+
+      elif kind == "word":
+        text = match.group()
+        column = match.end() - line_start
+        keyword = keywords.get(text)
+        if keyword is not None:
+          yield Token(keyword[0], keyword[1], line, column)
+        else:
+          yield Token(TokenType.NAME, text, line, column)
+
+      elif kind == "op":
+        text = match.group()
+        if text == "?":
+          yield Token(TokenType.TERNARY, "?")
+        else:
+          yield Token(symbols[text], text, line, start - line_start + 1)
+
+      elif kind == "num":
+        yield Token(TokenType.NUM, self.get_num(match.group()), line, start - line_start + 1)
+
+      elif kind == "string":
+        text = match.group()
+        for newline in newline_pattern.finditer(text):
+          line += 1
+          line_start = start + newline.end()
+        yield Token(TokenType.STRING, text[1:-1], line, match.end() - line_start)
+
+      elif kind == "annotation":
+        yield Token(TokenType.ANNOTATION, match.group()[1:], line, start - line_start + 1)
+
+      elif kind == "comment":
+        for newline in newline_pattern.finditer(match.group()):
+          line += 1
+          line_start = start + newline.end()
+
+      else:
+        char = match.group()
+        token = Token(None, char, line, start - line_start + 1)
+        if char in "\"'":
+          raise Error("Unterminated string.", token)
+        raise Error(f"Unrecognized character '{char}'.", token)
@@ -0,0 +1,740 @@
+from .lexer import *
+from .syntax_tree import *
+from .parser import Parser
+from .semantic_analyzer import SemanticAnalyzer
+from .environment import Environment, new_frame, ancestor
+from .function_obj import *
+from .compiler import Compiler, call_token
+from .vm import VM
+from .closure_compiler import ClosureCompiler, ClosureProgram
+from .optimizer import Optimizer, position
+from .purity import PurityAnalyzer
+from .profiler import Profiler
+from . import arrays
+from . import files
+from . import modules
+from . import output
+from . import tasks
+from . import quickening
+from .error import *
+import sys
+import time
+
+_version = "0.1"
+engines = ("tree", "vm", "closure")
+
+class Interpreter():
+  def __init__(self, engine="tree", use_cache=True, optimize=False, memo_size=1024, profile=False, workers=None, buffer_size=output.BUFFER_SIZE):
+    self.parser = Parser()
+    self.semantic_analyzer = SemanticAnalyzer()
+    self.global_environment = Environment()
+    self.environment = None # the current local frame, see environment.py
+    self.is_shell = True
+    self.filename = None
+    self.engine = engine
+    self.compiler = Compiler()
+    self.vm = VM(self)
+    self.closure_compiler = ClosureCompiler(self)
+    self.cache = None
+    if use_cache:
+      from .cache import ProgramCache # only loaded when it's used, hashlib is slow to import
+      self.cache = ProgramCache(_version)
+    self.optimizer = Optimizer() if optimize else None
+    self.purity = PurityAnalyzer()
+    self.memo_size = memo_size # results kept per memoized function, 0 turns memoizing off
+    self.memos = {} # function declaration -> Memo, for the declarations of the latest run
+    self.profiler = Profiler() if profile else None
+    self.builtins = {} # name -> builtin, even if the program declares something else with its name
+    self.workers = workers
+    self.pool = None # the parallel_map workers, see parallel.py
+    self.runtime = tasks.Runtime(self)
+    self.modules = modules.Modules(self)
+    self.output = output.Output(buffer_size) # what the program prints, until it's written out
+
+    # add builtins to global scope
+    self.define_builtin("time", time.time)
+    self.define_builtin("flush", self.output.flush)
+    for name, (action, args) in arrays.builtins.items():
+      self.define_builtin(name, action, args)
+    for name, (action, args) in files.builtins.items():
+      self.define_builtin(name, action, args)
+    self.define_builtin("map", self.map, ("function", "items"))
+    self.define_builtin("parallel_map", self.parallel_map, ("function", "items"))
+    self.define_builtin("sleep", self.runtime.sleep, ("seconds",))
+    self.define_builtin("read_file", self.runtime.read_file, ("path",))
+    self.define_builtin("connect", self.runtime.connect, ("address",))
+
+  def define_builtin(self, name, action, args=()):
+    function = BuiltinFunction(name, action, args)
+    if self.profiler is not None:
+      function = self.profiler.wrap_builtin(function)
+    self.builtins[name] = function
+    self.global_environment.assign(name, function)
+
+  def map(self, function, items):
+    runner = self.vm if self.engine == "vm" else self # the vm runs compiled functions itself
+    return arrays.map_items(function, items, lambda item: function.call(runner, [item]))
+
+  def parallel_map(self, function, items):
+    if self.pool is None:
+      from . import parallel # loaded along with the pool, it needs pickle
+      self.pool = parallel.Pool(self, self.workers)
+    return self.pool.map(function, items)
+
+  def lookup(self, name, expr):
+    depth = expr.depth
+    if depth is None:
+      r = self.global_environment.values.get(name.value)
+      if r is None:
+        raise Error(f"Unkown name '{name.value}'.", name)
+      return r
+    elif depth == 0:
+      return self.environment[expr.slot]
+    return ancestor(self.environment, depth)[expr.slot]
+
+  def define(self, node, name, value):
+    if node.slot is None:
+      self.global_environment.assign(name, value)
+    else:
+      self.environment[node.slot] = value
+
+  def is_truthy(self, obj):
+    if obj is None:
+      return False
+
+    elif type(obj) == bool:
+      return obj
+
+    return True
+
+  def traverse_block(self, node, environment):
+    """
+    runs a block in the given frame. returns how the block completed, see `execute`.
+    an error abandons the whole program, so the old frame only has to be put back
+    when the block finishes normally.
+    """
+    old = self.environment
+    self.environment = environment
+    for statement in node.children:
+      completion = self.execute(statement)
+      if completion is not None:
+        self.environment = old
+        return completion
+    self.environment = old
+
+  def execute(self, node):
+    """
+    runs a statement. returns None when the next statement should run, BREAK or
+    CONTINUE when a loop has to be left early, or a one element tuple holding
+    the value of a return.
+    """
+    if type(node) == IfStatement:
+      if self.is_truthy(self.traverse(node.condition)):
+        return self.execute(node.block)
+      elif node.else_block != None:
+        return self.execute(node.else_block)
+
+    elif type(node) == CodeBlock:
+      if node.size is not None:
+        return self.traverse_block(node, new_frame(self.environment, node.size))
+
+      for statement in node.children: # flattened into the current frame by the resolver
+        completion = self.execute(statement)
+        if completion is not None:
+          return completion
+
+    elif type(node) == Return:
+      return (self.traverse(node.statement),)
+
+    elif type(node) == WhileStatement:
+      while self.is_truthy(self.traverse(node.condition)):
+        completion = self.execute(node.block)
+        if completion is not None:
+          if completion is BREAK:
+            break
+          elif completion is not CONTINUE:
+            return completion
+        if node.increment is not None:
+          self.traverse(node.increment)
+
+    elif type(node) == ForRange:
+      return self.for_range(node)
+
+    elif type(node) == ForEach:
+      return self.for_each(node)
+
+    elif type(node) == Break:
+      return BREAK
+
+    elif type(node) == Continue:
+      return CONTINUE
+
+    else:
+      self.traverse(node)
+
+  def for_range(self, node):
+    frame = self.environment
+    slot = node.slot
+    value = self.traverse(node.start)
+    frame[slot] = value
+    end = node.end
+    block = node.block
+
+    if type(end) is Literal and type(value) is int and type(end.token.value) is int:
+      # a constant bound: python's range does the counting
+      stop = end.token.value + 1 if node.inclusive else end.token.value
+      for value in range(value, stop):
+        frame[slot] = value
+        completion = self.execute(block)
+        if completion is not None:
+          if completion is BREAK:
+            return
+          elif completion is not CONTINUE:
+            return completion
+      frame[slot] = max(frame[slot], stop) # where the condition would have stopped it
+      return
+
+    inclusive = node.inclusive
+    while True:
+      bound = self.traverse(end)
+      if not (value <= bound if inclusive else value < bound):
+        return
+      completion = self.execute(block)
+      if completion is not None:
+        if completion is BREAK:
+          return
+        elif completion is not CONTINUE:
+          return completion
+      value = value + 1
+      frame[slot] = value
+
+  def for_each(self, node):
+    try:
+      iterator = iterate(self.traverse(node.iterable))
+    except NativeError as e: # a stream that's been closed
+      raise Error(e.msg, node.name) from None
+    if iterator is None:
+      raise Error("Only lists, arrays and strings can be looped over.", node.name)
+    frame = self.environment
+    slot = node.slot
+    block = node.block
+    # the body's own errors are already Errors, a NativeError comes from getting the next item
+    try:
+      for value in iterator:
+        frame[slot] = value
+        completion = self.execute(block)
+        if completion is not None:
+          if completion is BREAK:
+            return
+          elif completion is not CONTINUE:
+            return completion
+    except NativeError as e:
+      raise Error(e.msg, node.name) from None
+
+  def find_method(self, obj, node):
+    """
+    the method a property read refers to, or None if it's a field.
+    """
+    if not isinstance(obj, Instance):
+      raise Error("Only instances have properties.", node.name.token)
+    cache = node.cache
+    if obj.shape is not cache.shape:
+      cache.lookup(obj)
+    return cache.method
+
+  def get_field(self, obj, node):
+    """
+    the value of a field, once `find_method` said the property isn't a method.
+    """
+    index = node.cache.index
+    value = None if index is None else obj.values[index]
+    if value is None:
+      raise Error(f"Unkown property '{node.name}'", node.name.token)
+    return value
+
+  def traverse(self, node):
+    if type(node) == Literal:
+      return node.token.value
+
+    elif type(node) == BinaryOperator:
+      left = self.traverse(node.left)
+      right = node.right
+      right = right.token.value if type(right) is Literal else self.traverse(right) # "i < 10" and alike skip a traversal
+      if type(left) is node.left_type and type(right) is node.right_type:
+        return node.quick(left, right)
+      try:
+        return quickening.binary(node, left, right)
+      except NativeError as e: # an array that can't take part, see arrays.py
+        raise Error(e.msg, position(node)) from None
+
+    elif type(node) == UnaryOperator:
+      child = self.traverse(node.child)
+      if type(child) is node.child_type:
+        return node.quick(child)
+      try:
+        return quickening.unary(node, child)
+      except NativeError as e:
+        raise Error(e.msg, node.operator) from None
+
+    elif type(node) == Logical:
+      left = self.traverse(node.left)
+
+      if node.operator.type == TokenType.OR:
+        if self.is_truthy(left):
+          return left
+
+        return self.traverse(node.right)
+      
+      elif node.operator.type == TokenType.AND:
+        if not self.is_truthy(left):
+          return left # since left is not truthy, we return that to indicate the operation is falsey.
+        return self.traverse(node.right)
+
+    elif type(node) == Declare:
+      var_value = self.traverse(node.value)
+      if node.slot is None:
+        self.global_environment.assign(node.name.value, var_value)
+      else:
+        self.environment[node.slot] = var_value
+      return var_value
+
+    elif type(node) == Variable:
+      return self.lookup(node.token, node)
+
+    elif type(node) == Assign:
+        var_name = node.name
+        var_value = self.traverse(node.value)
+        if var_name.depth is None:
+          self.global_environment.assign(var_name.token.value, var_value)
+        else:
+          ancestor(self.environment, var_name.depth)[var_name.slot] = var_value
+        return var_value
+
+    elif type(node) == FunctionCall:
+      callee = node.name
+      if type(callee) == GetProp:
+        # "obj.method()" hands obj to the method as self, instead of binding the method first
+        obj = self.traverse(callee.object)
+        method = self.find_method(obj, callee)
+        if method is not None:
+          args = [self.traverse(arg) for arg in node.args]
+          if len(args) != method.arity():
+            raise Error(f"Wanted {method.arity()} argument(s), got {len(args)} instead.", callee.name.token)
+          try:
+            return method.call_method(self, obj, args)
+          except NativeError as e:
+            raise Error(e.msg, callee.name.token) from None
+        function = self.get_field(obj, callee)
+      else:
+        function = self.traverse(callee)
+
+      if not isinstance(function, Callable):
+        if isinstance(callee, GetProp):
+          raise Error("Only functions are callable.", callee.name.token)
+        raise Error("Only functions are callable.", call_token(node))
+      args = []
+      for arg in node.args:
+        args.append(self.traverse(arg))
+
+      if len(args) != function.arity():
+        raise Error(f"Wanted {function.arity()} argument(s), got {len(args)} instead.", call_token(node))
+      
+      try:
+        return function.call(self, args)
+      except NativeError as e:
+        raise Error(e.msg, call_token(node)) from None
+
+    elif type(node) == Print:
+      if node.expression == "":
+        self.output.line()
+        return
+      self.output.print(self.traverse(node.expression))
+
+    elif type(node) == DeclareFunc:
+      function = Function(self.environment, node, self.global_environment, self.calls_for(node))
+      self.define(node, node.name.token.value, function)
+    
+    elif type(node) == ClassDecl:
+      methods = {}
+      for method in node.methods:
+        function = Function(self.environment, method, self.global_environment, self.calls_for(method, node))
+        methods[method.name.token.value] = function
+      clss = Class(node, methods)
+      self.define(node, node.name.token.value, clss)
+
+    elif type(node) == GetProp:
+      obj = self.traverse(node.object)
+      if not isinstance(obj, Instance):
+        raise Error("Only instances have properties.", node.name.token)
+      cache = node.cache
+      if obj.shape is not cache.shape:
+        cache.lookup(obj)
+      if cache.method is not None:
+        return cache.method.bind(obj)
+      index = cache.index
+      value = None if index is None else obj.values[index] # fields are an index load while the shape stays the same
+      if value is None:
+        raise Error(f"Unkown property '{node.name}'", node.name.token)
+      return value
+    
+    elif type(node) == SetProp:
+      obj = self.traverse(node.object)
+      
+      if isinstance(obj, Instance):
+        val = self.traverse(node.value)
+        cache = node.cache
+        if obj.shape is not cache.shape:
+          cache.store(obj, val)
+        elif cache.next is None:
+          obj.values[cache.index] = val
+        else:
+          obj.shape = cache.next
+          obj.values.append(val)
+        return obj
+      else:
+        raise Error("Only instances have fields.", node.name.token)
+      
+    elif type(node) == Self:
+      return self.lookup(node.keyword, node)
+    
+    elif type(node) == GetItem:
+      obj = self.traverse(node.object)
+      index = self.traverse(node.index)
+      if type(obj) is not List:
+        get_item = getattr(type(obj), "get_item", None)
+        if get_item is None:
+          raise Error("Only lists, arrays and bytes can be indexed.", node.bracket)
+        try:
+          return get_item(obj, index)
+        except NativeError as e:
+          raise Error(e.msg, node.bracket) from None
+      if type(index) is not int:
+        raise Error("List indices must be integers.", node.bracket)
+      try:
+        return obj.items[index]
+      except IndexError:
+        raise Error("List index out of range.", node.bracket) from None
+
+    elif type(node) == SetItem:
+      obj = self.traverse(node.object)
+      index = self.traverse(node.index)
+      val = self.traverse(node.value)
+      if type(obj) is not List:
+        set_item = getattr(type(obj), "set_item", None)
+        if set_item is None:
+          raise Error("Only lists, arrays and bytes can be indexed.", node.bracket)
+        try:
+          set_item(obj, index, val)
+        except NativeError as e:
+          raise Error(e.msg, node.bracket) from None
+        return val
+      if type(index) is not int:
+        raise Error("List indices must be integers.", node.bracket)
+      try:
+        obj.items[index] = val
+      except IndexError:
+        raise Error("List index out of range.", node.bracket) from None
+      return val
+
+    elif type(node) == BuiltinList:
+      items = []
+      for item in node.items:
+        items.append(self.traverse(item))
+      return List(items)
+
+    elif type(node) == Await:
+      return self.runtime.wait(self.traverse(node.value), node.keyword)
+
+    elif type(node) == Import:
+      self.modules.load(node)
+
+    else:
+      raise Exception(f"couldn't identify this: {node}")
+      
+  def front_end(self, content, filename=None, module=False):
+    """
+    lexes, parses and resolves a program, and compiles it too if the engine runs bytecode.
+    scripts read from a file (the one being run, or a module it imports) are cached
+    on disk, so a warm start skips all of that.
+    """
+    if filename is None and not self.is_shell:
+      filename = self.filename
+    use_cache = self.cache is not None and filename is not None
+    kind = "bytecode" if self.engine == "vm" else "tree" # the closure engine starts from the tree too
+    if self.optimizer is not None:
+      kind += "-O"
+    if use_cache:
+      program = self.cache.load(filename, content, kind)
+      if program is not None:
+        return program
+
+    if not self.parser.setup(content):
+      return None
+    program = self.parser.parse()
+    self.semantic_analyzer.resolve_program(program)
+    # a module's globals are its own, even when it's imported from the shell. a
+    # program's can be bound again by the modules it imports, just like in the shell
+    whole_program = (module or not self.is_shell) and not self.semantic_analyzer.imports
+    if self.optimizer is not None:
+      self.report(self.optimizer.optimize(program, propagate_globals=whole_program))
+    self.purity.analyze(program, whole_program=whole_program)
+    if self.engine == "vm":
+      program = self.compiler.compile(program)
+
+    if use_cache:
+      self.cache.store(filename, content, kind, program)
+    return program
+
+  def memo_for(self, node):
+    """
+    every declaration of a memoized function shares one memo, however many
+    function objects are made from it. the table only lasts for one run, so the
+    shell doesn't hold on to every line's declarations: functions already made
+    keep their memo, and declarations run again later just start a new one.
+    """
+    if not node.memoized or self.memo_size <= 0:
+      return None
+    memo = self.memos.get(node)
+    if memo is None:
+      memo = self.memos[node] = Memo(node.name.token.value, self.memo_size)
+    return memo
+
+  def calls_for(self, node, owner=None):
+    """
+    what calls to functions made from this declaration (a method of `owner`, if
+    given) have to go through before their body runs: the function's memo (or, for
+    an async function, starting a task), and the profiler when it's on. None lets
+    the engines call the body directly.
+    """
+    if node.is_async:
+      memo = tasks.AsyncCalls(self.runtime, node.name.token.value) # every call is a new task, nothing to memoize
+    else:
+      memo = self.memo_for(node) if owner is None else None
+    if self.profiler is None:
+      return memo
+
+    name = node.name.token.value
+    if owner is not None:
+      name = f"{owner.name.token.value}.{name}"
+    location = f"{node.name.token.line}:{node.name.token.column}"
+    filename = self.global_environment.filename # set while a module's code runs
+    if filename is None and not self.is_shell:
+      filename = self.filename
+    if filename is not None:
+      location = f"{filename}:{location}"
+    return self.profiler.wrap(node, name, location, memo)
+
+  def memo_stats(self):
+    for memo in self.memos.values():
+      total = memo.hits + memo.misses
+      rate = memo.hits / total * 100 if total else 0
+      print(f"\x1b[33mmemo: {memo.name}: {memo.hits} hit(s), {memo.misses} miss(es) ({rate:.1f}% hits), {len(memo.results)} result(s) kept\x1b[0m", file=sys.stderr)
+
+  def report(self, changes):
+    for token, message in changes:
+      where = f"{token.line}:{token.column} " if token is not None else ""
+      print(f"\x1b[33moptimizer: {where}{message}\x1b[0m", file=sys.stderr)
+    print(f"\x1b[33moptimizer: {len(changes)} change(s)\x1b[0m", file=sys.stderr)
+
+  def run_body(self, program):
+    if self.engine == "vm":
+      self.vm.execute(program)
+    elif self.engine == "closure":
+      if type(program) is not ClosureProgram:
+        program = self.closure_compiler.compile(program)
+      program.run()
+    else:
+      self.traverse_block(program, new_frame(None, program.size))
+
+  def run_program(self, program):
+    """
+    runs a program that went through the front end, as many times as needed.
+    errors are raised rather than reported.
+    """
+    self.memos = {}
+    self.modules.start_run()
+    try:
+      self.run_body(program)
+      self.runtime.finish()
+    except Error:
+      self.runtime.cancel()
+      raise
+
+  def run(self, content):
+    try:
+      program = self.front_end(content)
+      if program is not None:
+        self.run_program(program)
+    
+    except Error as e:
+      self.output.flush() # what was printed before the error comes out before it
+      where = f" in {e.filename}" if e.filename is not None else ""
+      print(f"\x1b[31mError{where} at line {e.line}, column {e.column}")
+      msg = None
+      if self.is_shell and e.filename is None:
+        msg = [content]
+        msg.append("\n" + " " * (e.column-1) + "^")
+      else:
+        with open(e.filename or self.filename, "r") as f:
+          lines = f.readlines()
+          msg = [lines[e.line - 1] if e.line <= len(lines) else "\n"]
+          msg.append(f'\n{" " * (e.column - 1)}^')
+
+      msg.append(f"\n{e.msg}\x1b[0m")
+      print(" ".join(msg))
+
+    finally:
+      self.output.flush()
+
+  def run_shell(self):
+    import readline # cursor navigation in python input
+    print(f"\x1b[32mShell version {_version}")
+    print("Supported operators: +, -, *, /, ()")
+    print("Type \"exit\" or hit ^C to exit.\x1b[0m")
+    while True:
+      try:
+        content = input(">\x1b[0m ")
+        if content == "exit":
+          raise KeyboardInterrupt()
+
+        if content.isspace() or content == "":
+          continue
+        
+        self.run(content)
+
+      except KeyboardInterrupt:
+        print("\nbye")
+        exit(0)
+
+def main(argv):
+  args = list(argv)
+  engine = "tree"
+  use_cache = True
+  optimize = False
+  memo_size = "1024"
+  memo_stats = False
+  profile = False
+  profile_json = None
+  bench = False
+  runs = "10"
+  save = None
+  baseline = None
+  threshold = "0.1"
+  workers = None
+  unbuffered = False
+  buffer_size = str(output.BUFFER_SIZE)
+  for arg in list(args):
+    if arg.startswith("--engine="):
+      engine = arg.split("=", 1)[1]
+      args.remove(arg)
+    elif arg == "--no-cache":
+      use_cache = False
+      args.remove(arg)
+    elif arg == "-O":
+      optimize = True
+      args.remove(arg)
+    elif arg.startswith("--memo-size="):
+      memo_size = arg.split("=", 1)[1]
+      args.remove(arg)
+    elif arg == "--memo-stats":
+      memo_stats = True
+      args.remove(arg)
+    elif arg == "--profile":
+      profile = True
+      args.remove(arg)
+    elif arg.startswith("--profile-json="):
+      profile = True
+      profile_json = arg.split("=", 1)[1]
+      args.remove(arg)
+    elif arg == "--bench":
+      bench = True
+      args.remove(arg)
+    elif arg.startswith("--runs="):
+      runs = arg.split("=", 1)[1]
+      args.remove(arg)
+    elif arg.startswith("--save="):
+      save = arg.split("=", 1)[1]
+      args.remove(arg)
+    elif arg.startswith("--baseline="):
+      baseline = arg.split("=", 1)[1]
+      args.remove(arg)
+    elif arg.startswith("--threshold="):
+      threshold = arg.split("=", 1)[1]
+      args.remove(arg)
+    elif arg.startswith("--workers="):
+      workers = arg.split("=", 1)[1]
+      args.remove(arg)
+    elif arg == "--unbuffered":
+      unbuffered = True
+      args.remove(arg)
+    elif arg.startswith("--buffer-size="):
+      buffer_size = arg.split("=", 1)[1]
+      args.remove(arg)
+
+  if engine not in engines:
+    print(f"\x1b[31munknown engine '{engine}' (expected one of: {', '.join(engines)})\x1b[0m")
+    exit(1)
+
+  if not memo_size.isdigit():
+    print(f"\x1b[31m--memo-size expects a number of results, got '{memo_size}'\x1b[0m")
+    exit(1)
+
+  if workers is not None:
+    if not workers.isdigit() or int(workers) < 1:
+      print(f"\x1b[31m--workers expects a number of processes, got '{workers}'\x1b[0m")
+      exit(1)
+    workers = int(workers)
+
+  if not buffer_size.isdigit():
+    print(f"\x1b[31m--buffer-size expects a number of characters, got '{buffer_size}'\x1b[0m")
+    exit(1)
+  # terminals get every line as it's printed
+  buffer_size = 0 if unbuffered or sys.stdout.isatty() else int(buffer_size)
+
+  if bench:
+    if not runs.isdigit() or int(runs) < 1:
+      print(f"\x1b[31m--runs expects a number of runs, got '{runs}'\x1b[0m")
+      exit(1)
+    try:
+      threshold = float(threshold)
+    except ValueError:
+      print(f"\x1b[31m--threshold expects a fraction (e.g. 0.1 for 10%), got '{threshold}'\x1b[0m")
+      exit(1)
+
+    from . import benchmark
+    # the cache stays off so that every run goes through the whole front end
+    config = {"version": _version, "engine": engine, "optimize": optimize, "memo_size": int(memo_size)}
+    make_interpreter = lambda: Interpreter(engine, False, optimize, int(memo_size))
+    exit(benchmark.main(make_interpreter, config, args, int(runs), save, baseline, threshold))
+
+  i = Interpreter(engine, use_cache, optimize, int(memo_size), profile, workers, buffer_size)
+
+  def report():
+    if memo_stats:
+      i.memo_stats()
+    if profile:
+      i.profiler.report(sys.stderr)
+    if profile_json is not None:
+      i.profiler.write_json(profile_json)
+
+  if len(args) >= 1:
+    if args[0] == "--eval":
+      i.run(args[1])
+      report()
+      quit()
+  
+    try:
+      i.is_shell = False
+      i.filename = args[0]
+      with open(args[0]) as f:
+        i.run(f.read())
+    except FileNotFoundError:
+      print(f"\x1b[31mfile does not exist: '{args[0]}'\x1b[0m")
+
+    report()
+
+  else:
+    i.run_shell()
+
+if __name__ == "__main__":
+  main(sys.argv[1:])
@@ -0,0 +1,116 @@
+"""
+`import "path";`: using the code in another file.
+
+a module runs once per process, the first time something imports it, with
+globals of its own that start out as just the builtins. every global it ends up
+with (its own declarations, and whatever it imported itself) is one of its
+exports: they're bound under the same names in the globals of whatever imported
+it, and kept in a registry under the module's absolute path and mtime. importing
+it again binds the exports again (e.g. in a later run of an embedded program,
+which starts from fresh globals), and a module whose file changed since is run
+again.
+
+functions remember the globals of the module they were declared in, so the
+module's own code keeps seeing its globals wherever it's called from. the
+importer only gets the values the exports had when the module finished
+running: declaring or assigning one of their names changes the importer's
+globals, never the module's, and a module that assigns one of its globals
+later doesn't change what the importer already has, like python's
+`from module import *`.
+
+paths are relative to the directory of the file doing the importing (the
+working directory in the shell and for embedded programs). an import only
+does anything the first time a file runs it in a run: after that it's a single
+set lookup, however many times it's run. the module itself runs once however
+many files import it. a module that's imported
+again while it's still running, directly or through others, is an error.
+
+modules go through the front end like any script does, so they're cached on
+disk in their compiled form too (see cache.py).
+"""
+import os
+from .environment import Environment
+from .error import Error
+
+class Module():
+    __slots__ = ("path", "mtime", "globals", "exports")
+
+    def __init__(self, path, mtime, globals, exports):
+        self.path = path
+        self.mtime = mtime # st_mtime_ns of the file when it was run
+        self.globals = globals # the Environment its code runs with
+        self.exports = exports # name -> value, as they were when it finished running
+
+    def __repr__(self):
+        return f"<module '{self.path}'>"
+
+class Modules():
+    def __init__(self, interpreter):
+        self.interpreter = interpreter
+        self.registry = {} # absolute path -> Module
+        self.imported = set() # (importer's globals, path) of the imports already done in the current run
+        self.loading = [] # the modules running right now, innermost last
+
+    def start_run(self):
+        self.imported = set()
+        # the script being run counts as loading, so a module importing it is circular too
+        interpreter = self.interpreter
+        self.loading = [] if interpreter.is_shell or interpreter.filename is None else [os.path.abspath(interpreter.filename)]
+
+    def directory(self):
+        return os.path.dirname(self.loading[-1]) if self.loading else os.getcwd()
+
+    def load(self, node):
+        """
+        what an import statement does.
+        """
+        path = node.resolved
+        if path is None:
+            path = node.resolved = os.path.abspath(os.path.join(self.directory(), node.path))
+        globals = self.interpreter.global_environment
+        if (globals, path) in self.imported:
+            return
+
+        if path in self.loading:
+            cycle = self.loading[self.loading.index(path):] + [path]
+            names = [os.path.relpath(module, os.path.dirname(path)) for module in cycle]
+            raise Error(f"Circular import: {' -> '.join(names)}.", node.keyword)
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except OSError as e:
+            raise Error(f"Couldn't import '{node.path}': {e.strerror or e}.", node.keyword) from None
+
+        module = self.registry.get(path)
+        if module is None or module.mtime != mtime:
+            module = self.run(path, mtime, node)
+        globals.values.update(module.exports)
+        self.imported.add((globals, path))
+
+    def run(self, path, mtime, node):
+        try:
+            with open(path, encoding="utf-8") as f:
+                content = f.read()
+        except (OSError, UnicodeDecodeError) as e:
+            raise Error(f"Couldn't import '{node.path}': {getattr(e, 'strerror', None) or e}.", node.keyword) from None
+
+        interpreter = self.interpreter
+        builtins = interpreter.builtins
+        globals = Environment(path)
+        globals.values.update(builtins)
+        importer = interpreter.global_environment
+        # the engines run top-level code with the interpreter's globals, and
+        # functions declared there hold on to them
+        interpreter.global_environment = globals
+        self.loading.append(path)
+        try:
+            interpreter.run_body(interpreter.front_end(content, path, module=True))
+        except Error as e:
+            e.happened_in(path)
+            raise
+        finally:
+            self.loading.pop()
+            interpreter.global_environment = importer
+
+        exports = {name: value for name, value in globals.values.items() if builtins.get(name) is not value}
+        module = self.registry[path] = Module(path, mtime, globals, exports)
+        return module
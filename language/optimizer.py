@@ -0,0 +1,440 @@
+# pyright: reportShadowedImports=none
+from .lexer import Token, TokenType
+from .syntax_tree import *
+
+MAX_FOLDED_STRING = 4096 # longer strings are cheaper to build at runtime than to store in the tree
+
+def is_truthy(value):
+    return not (value is None or value is False)
+
+def position(node):
+    """
+    the first token of a node, used to tell where a change was made.
+    """
+    if type(node) in (Literal, Variable):
+        return node.token
+    elif type(node) == Self:
+        return node.keyword
+    elif type(node) == Declare:
+        return node.name
+    elif type(node) in (Return, Break, Continue):
+        return node.token
+    elif type(node) == UnaryOperator:
+        return node.operator
+    elif type(node) in (Await, Import):
+        return node.keyword
+    elif type(node) in (BinaryOperator, Logical):
+        return position(node.left)
+    elif type(node) in (IfStatement, WhileStatement):
+        return position(node.condition)
+    elif type(node) in (ForRange, ForEach):
+        return node.name
+    elif type(node) == Assign:
+        return position(node.name)
+    elif type(node) in (GetProp, SetProp, GetItem, SetItem):
+        return position(node.object)
+    elif type(node) in (FunctionCall, DeclareFunc, ClassDecl):
+        return position(node.name)
+    elif type(node) == Print and node.expression != "":
+        return position(node.expression)
+    elif type(node) == BuiltinList:
+        return node.name
+    elif type(node) == CodeBlock and node.children:
+        return position(node.children[0])
+    return None
+
+def literal(value, token):
+    if type(value) == bool:
+        kind = TokenType.BOOL
+    elif type(value) == str:
+        kind = TokenType.STRING
+    else:
+        kind = TokenType.NUM
+    return Literal(Token(kind, value, token.line, token.column))
+
+def evaluate_binary(operator, left, right):
+    """
+    the same operations the engines do at runtime. raises whatever python raises,
+    in which case the expression is left alone so the error still happens at runtime.
+    """
+    if operator == TokenType.PLUS:
+        return left + right
+    elif operator == TokenType.MINUS:
+        return left - right
+    elif operator == TokenType.MULTIPLY:
+        return left * right
+    elif operator == TokenType.DIVIDE:
+        return left / right
+    elif operator == TokenType.GREATER:
+        return left > right
+    elif operator == TokenType.LESS:
+        return left < right
+    elif operator == TokenType.GREATER_EQUAL:
+        return left >= right
+    elif operator == TokenType.LESS_EQUAL:
+        return left <= right
+    elif operator == TokenType.EQUAL:
+        return left == right
+    return left != right
+
+def evaluate_unary(operator, value):
+    if operator == TokenType.PLUS:
+        return +value
+    elif operator == TokenType.MINUS:
+        return -value
+    return not is_truthy(value)
+
+class VariableTracker():
+    """
+    walks a resolved tree keeping track of the frames it's in, so that every variable
+    can be identified by the frame it lives in and its slot (or just its name for
+    globals), which is exactly what the resolver stored on every node.
+    """
+    def __init__(self):
+        self.frames = []
+        self.writes = {} # variable -> how many times it's declared or assigned
+
+    def count_all_writes(self, tree):
+        self.writes = {}
+        self.frames = [tree]
+        for statement in tree.children:
+            self.count_writes(statement)
+
+    def release(self):
+        """
+        lets go of the last tree walked, so a finished program isn't kept alive.
+        """
+        self.frames = []
+        self.writes = {}
+
+    def variable(self, name, depth, slot):
+        if depth is None:
+            return name
+        return (self.frames[-1 - depth], slot)
+
+    def declared(self, name, slot):
+        return name if slot is None else (self.frames[-1], slot)
+
+    def write(self, variable):
+        self.writes[variable] = self.writes.get(variable, 0) + 1
+
+    def count_writes(self, node):
+        if type(node) == Declare:
+            self.count_writes(node.value)
+            self.write(self.declared(node.name.value, node.slot))
+
+        elif type(node) == Assign:
+            self.count_writes(node.value)
+            if type(node.name) == Variable:
+                self.write(self.variable(node.name.token.value, node.name.depth, node.name.slot))
+
+        elif type(node) == DeclareFunc:
+            self.write(self.declared(node.name.token.value, node.slot))
+            self.function(node, self.count_writes)
+
+        elif type(node) == ClassDecl:
+            self.write(self.declared(node.name.token.value, node.slot))
+            for method in node.methods:
+                self.function(method, self.count_writes)
+
+        elif type(node) == CodeBlock:
+            self.block(node, lambda block: [self.count_writes(child) for child in block.children])
+
+        elif type(node) == IfStatement:
+            self.count_writes(node.condition)
+            self.count_writes(node.block)
+            if node.else_block is not None:
+                self.count_writes(node.else_block)
+
+        elif type(node) == WhileStatement:
+            self.count_writes(node.condition)
+            self.count_writes(node.block)
+            if node.increment is not None:
+                self.count_writes(node.increment)
+
+        elif type(node) == ForRange:
+            self.count_writes(node.start)
+            self.write(self.declared(node.name.value, node.slot))
+            self.count_writes(node.end)
+            self.count_writes(node.block)
+
+        elif type(node) == ForEach:
+            self.count_writes(node.iterable)
+            self.write(self.declared(node.name.value, node.slot))
+            self.count_writes(node.block)
+
+        else:
+            for child in children(node):
+                self.count_writes(child)
+
+    def block(self, node, visit):
+        if node.size is None:
+            return visit(node)
+
+        self.frames.append(node)
+        try:
+            return visit(node)
+        finally:
+            self.frames.pop()
+
+    def function(self, node, visit):
+        self.frames.append(node)
+        for statement in node.statements.children:
+            visit(statement)
+        self.frames.pop()
+
+class Optimizer(VariableTracker):
+    """
+    rewrites a resolved syntax tree so that it does less work at runtime:
+
+    - expressions over literals are folded into a single literal
+    - variables that are declared once with a constant and never assigned again
+      are replaced by that constant wherever they are read
+    - if statements and while loops with a constant condition lose the branches
+      that can never run
+    - statements after a return, break or continue are dropped
+
+    it runs after the resolver, so it has to keep every frame layout intact:
+    nodes are only ever replaced by literals or by their own children.
+    """
+    def __init__(self):
+        super().__init__()
+        self.changes = [] # (token, message)
+        self.constants = {} # variable -> value, once its declaration has been passed
+        self.propagate_globals = True
+
+    def optimize(self, tree, propagate_globals=True) -> list:
+        """
+        optimizes a program in place and returns a list of what was changed.
+        globals should only be propagated when the whole program is known, e.g. not
+        in the shell where the next line might assign them.
+        """
+        self.changes = []
+        self.constants = {}
+        self.propagate_globals = propagate_globals
+
+        self.count_all_writes(tree)
+        self.frames = [tree]
+        tree.children = self.statements(tree.children)
+        self.constants = {}
+        self.release()
+        return self.changes
+
+    def report(self, node, message):
+        self.changes.append((position(node), message))
+
+    # statements
+
+    def statements(self, nodes) -> list:
+        result = []
+        for index, node in enumerate(nodes):
+            node = self.statement(node)
+            if node is None:
+                continue
+
+            if type(node) == CodeBlock and node.size is None:
+                # a branch that is always taken, its variables already live in this frame
+                result.extend(node.children)
+            else:
+                result.append(node)
+
+            if type(node) in (Return, Break, Continue) and index + 1 < len(nodes):
+                self.report(nodes[index + 1], f"removed {len(nodes) - index - 1} unreachable statement(s) after {node.token.value}")
+                break
+        return result
+
+    def function_body(self, node):
+        self.frames.append(node)
+        node.statements.children = self.statements(node.statements.children)
+        self.frames.pop()
+
+    def statement(self, node):
+        """
+        returns the optimized statement, or None if it can be dropped entirely.
+        """
+        if type(node) == Declare:
+            node.value = self.expression(node.value)
+            variable = self.declared(node.name.value, node.slot)
+            if type(node.value) == Literal and self.writes.get(variable) == 1 and (self.propagate_globals or node.slot is not None):
+                self.constants[variable] = node.value.token.value
+            return node
+
+        elif type(node) == Assign:
+            node.value = self.expression(node.value)
+            return node
+
+        elif type(node) == SetProp:
+            node.object = self.expression(node.object)
+            node.value = self.expression(node.value)
+            return node
+
+        elif type(node) == SetItem:
+            node.object = self.expression(node.object)
+            node.index = self.expression(node.index)
+            node.value = self.expression(node.value)
+            return node
+
+        elif type(node) == Print:
+            if node.expression != "":
+                node.expression = self.expression(node.expression)
+            return node
+
+        elif type(node) == Return:
+            node.statement = self.expression(node.statement)
+            return node
+
+        elif type(node) == CodeBlock:
+            def visit(block):
+                block.children = self.statements(block.children)
+            self.block(node, visit)
+            return node
+
+        elif type(node) == IfStatement:
+            node.condition = self.expression(node.condition)
+            if type(node.condition) == Literal:
+                if is_truthy(node.condition.token.value):
+                    self.report(node, "condition is always true, removed the else branch" if node.else_block else "condition is always true, removed the check")
+                    return self.statement(node.block)
+                elif node.else_block is not None:
+                    self.report(node, "condition is always false, removed the if branch")
+                    return self.statement(node.else_block)
+                self.report(node, "condition is always false, removed the if statement")
+                return None
+
+            node.block = self.statement(node.block)
+            if node.else_block is not None:
+                node.else_block = self.statement(node.else_block)
+            return node
+
+        elif type(node) == WhileStatement:
+            node.condition = self.expression(node.condition)
+            if type(node.condition) == Literal and not is_truthy(node.condition.token.value):
+                self.report(node, "condition is always false, removed the loop")
+                return None
+            node.block = self.statement(node.block)
+            if node.increment is not None:
+                node.increment = self.statement(node.increment)
+            return node
+
+        elif type(node) == ForRange:
+            node.start = self.expression(node.start)
+            node.end = self.expression(node.end)
+            node.block = self.statement(node.block)
+            return node
+
+        elif type(node) == ForEach:
+            node.iterable = self.expression(node.iterable)
+            node.block = self.statement(node.block)
+            return node
+
+        elif type(node) == DeclareFunc:
+            self.function_body(node)
+            return node
+
+        elif type(node) == ClassDecl:
+            for method in node.methods:
+                self.function_body(method)
+            return node
+
+        return self.expression(node)
+
+    # expressions
+
+    def expression(self, node):
+        if type(node) == Variable:
+            variable = self.variable(node.token.value, node.depth, node.slot)
+            if variable in self.constants:
+                value = self.constants[variable]
+                self.report(node, f"replaced '{node.token.value}' with its constant value {value!r}")
+                return literal(value, node.token)
+            return node
+
+        elif type(node) == BinaryOperator:
+            node.left = self.expression(node.left)
+            node.right = self.expression(node.right)
+            if type(node.left) == Literal and type(node.right) == Literal:
+                try:
+                    value = evaluate_binary(node.operator, node.left.token.value, node.right.token.value)
+                except Exception:
+                    return node
+                if type(value) == str and len(value) > MAX_FOLDED_STRING:
+                    return node
+                self.report(node, f"folded a constant expression into {value!r}")
+                return literal(value, position(node))
+            return node
+
+        elif type(node) == UnaryOperator:
+            node.child = self.expression(node.child)
+            if type(node.child) == Literal:
+                try:
+                    value = evaluate_unary(node.operator.type, node.child.token.value)
+                except Exception:
+                    return node
+                self.report(node, f"folded a constant expression into {value!r}")
+                return literal(value, node.operator)
+            return node
+
+        elif type(node) == Logical:
+            node.left = self.expression(node.left)
+            node.right = self.expression(node.right)
+            if type(node.left) == Literal:
+                left = is_truthy(node.left.token.value)
+                # "or" short-circuits on a truthy left side, "and" on a falsy one
+                if left == (node.operator.type == TokenType.OR):
+                    self.report(node, f"'{node.operator.value}' always short-circuits, removed the right side")
+                    return node.left
+                self.report(node, f"'{node.operator.value}' never short-circuits, removed the left side")
+                return node.right
+            return node
+
+        elif type(node) == FunctionCall:
+            node.name = self.expression(node.name)
+            node.args = [self.expression(arg) for arg in node.args]
+            return node
+
+        elif type(node) == GetProp:
+            node.object = self.expression(node.object)
+            return node
+
+        elif type(node) == Await:
+            node.value = self.expression(node.value)
+            return node
+
+        elif type(node) == GetItem:
+            node.object = self.expression(node.object)
+            node.index = self.expression(node.index)
+            return node
+
+        elif type(node) == BuiltinList:
+            node.items = [self.expression(item) for item in node.items]
+            return node
+
+        return node
+
+def children(node) -> list:
+    """
+    the expressions directly inside a node that isn't a declaration or a block.
+    """
+    if type(node) in (BinaryOperator, Logical):
+        return [node.left, node.right]
+    elif type(node) == UnaryOperator:
+        return [node.child]
+    elif type(node) == Await:
+        return [node.value]
+    elif type(node) == FunctionCall:
+        return [node.name, *node.args]
+    elif type(node) == GetProp:
+        return [node.object]
+    elif type(node) == SetProp:
+        return [node.object, node.value]
+    elif type(node) == GetItem:
+        return [node.object, node.index]
+    elif type(node) == SetItem:
+        return [node.object, node.index, node.value]
+    elif type(node) == Print:
+        return [] if node.expression == "" else [node.expression]
+    elif type(node) == Return:
+        return [node.statement]
+    elif type(node) == BuiltinList:
+        return list(node.items)
+    return []
@@ -0,0 +1,65 @@
+"""
+where `print` goes.
+
+python's `print()` is slow to call once per line: it looks up `sys.stdout`,
+writes the value and the line break separately, and a terminal flushes after
+every line. programs that print millions of lines spend most of their time
+there. so the engines hand what they print to the interpreter's `Output`
+instead, which collects it and writes it out in large pieces.
+
+what's been printed but not written yet is written out:
+- once there's `size` characters of it
+- when the program calls `flush()`
+- when a run ends, however it ends, and before an error is reported
+- before anything else is written to stdout or stderr, e.g. the profiler's
+  report, so the two come out in the order they happened
+- before the interpreter forks its parallel_map workers, which would otherwise
+  write it out again
+
+a size of 0 writes every line straight away. that's what `--unbuffered` asks
+for, and what the interpreter uses when stdout is a terminal, so output still
+shows up there as it's printed.
+"""
+import sys
+
+BUFFER_SIZE = 1 << 16 # characters held before they're written
+
+class Output():
+    __slots__ = ("stream", "size", "parts", "pending")
+
+    def __init__(self, size=BUFFER_SIZE, stream=None):
+        self.stream = stream # None writes to whatever sys.stdout is at the time
+        self.size = size
+        self.parts = []
+        self.pending = 0 # characters in parts
+
+    def target(self):
+        return sys.stdout if self.stream is None else self.stream
+
+    def print(self, value):
+        text = f"{value}\n"
+        if self.size == 0:
+            stream = self.target()
+            stream.write(text)
+            stream.flush()
+            return
+        self.parts.append(text)
+        self.pending += len(text)
+        if self.pending >= self.size:
+            self.flush()
+
+    def line(self):
+        """
+        an empty `print`.
+        """
+        self.print("")
+
+    def flush(self):
+        stream = self.target()
+        if self.parts:
+            text = "".join(self.parts)
+            self.parts = []
+            self.pending = 0
+            stream.write(text)
+        stream.flush()
+
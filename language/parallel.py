@@ -0,0 +1,286 @@
+"""
+`parallel_map(fn, items)`: calls a function on every item of a list in a pool
+of worker processes, so cpu-bound work isn't stuck behind python's GIL.
+
+the workers are forked from the interpreter the first time they're needed and
+then kept around, each with a copy of the interpreter to run calls with. every
+`parallel_map` sends each worker the function (its declaration, the frames it
+closed over and the globals of the module it was declared in) once. the items
+then go out in chunks, a new one to whichever worker finishes first, and the
+results are put back together in the order of the items.
+
+functions can't be pickled as they are: the closure engine's are python
+closures, and memos and profiling wrappers belong to the process that made
+them. so they're pickled as the declaration, frame and globals they were made
+from, and the process on the other end makes them again for its own engine.
+builtins go by name, and lists and arrays as their items, so they keep their
+shared class.
+
+every call gets copies of what it's given: changes it makes to lists or
+objects stay in the worker. anything it prints comes out whenever that worker
+gets to it. small inputs, `--workers=1` and platforms that can't fork just
+call the function in the interpreter, one item after another, and so does
+`parallel_map` in an async function, since forking from a thread isn't safe.
+
+this module is only imported once a program calls `parallel_map`, and
+multiprocessing once it maps something in parallel, since it takes longer to
+load than the interpreter takes to start.
+"""
+import io
+import os
+import pickle
+import sys
+from .arrays import Array
+from .closure_compiler import ClosureFunction
+from .environment import Environment
+from .error import Error, NativeError
+from .function_obj import BuiltinFunction, Callable, Function, List, NativeMethod, PropertyCache, StoreCache
+from .lexer import Token
+from .vm import CompiledFunction
+
+CHUNKS_PER_WORKER = 4 # fewer chunks means less overhead, more means less waiting on the slowest one
+
+def fields(instance):
+    """
+    the names of an instance's fields, in the order of its values.
+    """
+    return list(instance.shape.slots)
+
+class Pickler(pickle.Pickler):
+    def persistent_id(self, obj):
+        kind = type(obj)
+        if kind is List:
+            return ("list", obj.items, fields(obj), obj.values)
+        if kind is Array:
+            return ("array", obj.data, fields(obj), obj.values)
+        if kind is PropertyCache or kind is StoreCache:
+            return ("cache", kind, obj.name) # inline caches start out empty on the other end
+        if kind is NativeMethod:
+            return None
+        if isinstance(obj, BuiltinFunction):
+            return ("builtin", obj.name)
+        # globals go as their dict: pickle remembers it before its items, so the
+        # functions in it that lead back to it don't go round in circles
+        if kind is CompiledFunction:
+            return ("function", obj.closure, obj.prototype, obj.globals.values, obj.globals.filename)
+        if isinstance(obj, Function):
+            return ("function", obj.closure, obj.expr, obj.globals.values, obj.globals.filename)
+        return None
+
+class Unpickler(pickle.Unpickler):
+    def __init__(self, file, interpreter):
+        super().__init__(file)
+        self.interpreter = interpreter
+        self.bodies = {} # (declaration, globals) -> compiled body, for the closure engine
+        self.environments = {} # id of a globals dict -> the Environment made around it
+
+    def persistent_load(self, pid):
+        kind = pid[0]
+        if kind == "list" or kind == "array":
+            _, items, names, values = pid
+            value = List(items) if kind == "list" else Array(items)
+            for name, field in zip(names, values):
+                value.set(name, field)
+            return value
+        if kind == "cache":
+            return pid[1](pid[2])
+        if kind == "builtin":
+            return self.interpreter.builtins[pid[1]]
+        return self.function(pid[1], pid[2], self.environment(pid[3], pid[4]))
+
+    def environment(self, values, filename):
+        # the dict may still be filling up, functions only hold on to it
+        environment = self.environments.get(id(values))
+        if environment is None:
+            environment = self.environments[id(values)] = Environment(filename)
+            environment.values = values
+        return environment
+
+    def function(self, closure, declaration, globals):
+        interpreter = self.interpreter
+        if interpreter.engine == "vm":
+            return CompiledFunction(closure, declaration, globals, interpreter.calls_for(declaration.expr))
+        if interpreter.engine == "closure":
+            body = self.bodies.get((declaration, globals))
+            if body is None:
+                compiler = interpreter.closure_compiler
+                previous = compiler.use(globals)
+                try:
+                    body = self.bodies[declaration, globals] = compiler.function(declaration)
+                finally:
+                    compiler.use(previous)
+            return ClosureFunction(closure, declaration, globals, body, declaration.size, interpreter.calls_for(declaration))
+        return Function(closure, declaration, globals, interpreter.calls_for(declaration))
+
+def dumps(value):
+    buffer = io.BytesIO()
+    Pickler(buffer, pickle.HIGHEST_PROTOCOL).dump(value)
+    return buffer.getvalue()
+
+def loads(data, interpreter):
+    return Unpickler(io.BytesIO(data), interpreter).load()
+
+def call(interpreter, function, item):
+    # the vm runs compiled functions itself, everything else takes the interpreter
+    return function.call(interpreter.vm if interpreter.engine == "vm" else interpreter, [item])
+
+def serve(interpreter, connection, parent_end):
+    """
+    what every worker runs: makes the function it's sent, then calls it on every
+    item of every chunk that comes in, until the interpreter goes away.
+    """
+    # the parent's ends of the pipes came along with the fork. they have to be
+    # closed here, or the workers wouldn't see the pipes close when it exits
+    parent_end.close()
+    for other in interpreter.pool.connections:
+        other.close()
+    interpreter.pool.connections = []
+    interpreter.pool.workers = 1 # a parallel_map inside a worker runs in the worker
+    function = None
+    while True:
+        try:
+            message = loads(connection.recv_bytes(), interpreter)
+        except (EOFError, KeyboardInterrupt):
+            return
+
+        if message[0] == "function":
+            function = message[1]
+            interpreter.memos = {} # the declarations from the last function are gone
+            continue
+
+        index, items = message[1], message[2]
+        try:
+            reply = ("done", index, [call(interpreter, function, item) for item in items])
+        except Error as e:
+            reply = ("error", index, e.msg, e.line, e.column, e.filename)
+        except NativeError as e:
+            reply = ("native", index, e.msg)
+        except KeyboardInterrupt:
+            return
+        except Exception as e:
+            reply = ("crash", index, e)
+        interpreter.output.flush()
+
+        try:
+            data = dumps(reply)
+        except Exception as e:
+            data = dumps(("native", index, f"parallel_map() couldn't send a result back: {e}"))
+        connection.send_bytes(data)
+
+def available_cores():
+    # the cores this process may run on, which can be fewer than the machine has
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+class Pool():
+    """
+    the worker processes behind `parallel_map`, started on its first use.
+    """
+    def __init__(self, interpreter, workers=None):
+        self.interpreter = interpreter
+        self.workers = available_cores() if workers is None else workers
+        self.connections = [] # one pipe per worker
+
+    def can_fork(self):
+        import multiprocessing # only loaded once it's needed, it takes a while to import
+        import threading
+        # a fork only copies the thread that made it, so one made from an async
+        # task's thread (see tasks.py) could leave the workers stuck on a lock
+        # another thread held. tasks map their items one after another instead
+        if threading.current_thread() is not threading.main_thread():
+            return False
+        return self.workers > 1 and "fork" in multiprocessing.get_all_start_methods()
+
+    def start(self):
+        import multiprocessing
+        context = multiprocessing.get_context("fork")
+        # a forked worker gets a copy of anything still waiting in the buffers, and would print it again
+        self.interpreter.output.flush()
+        sys.stderr.flush()
+        for _ in range(self.workers):
+            mine, theirs = context.Pipe()
+            process = context.Process(target=serve, args=(self.interpreter, theirs, mine), daemon=True)
+            process.start()
+            theirs.close()
+            self.connections.append(mine)
+
+    def stop(self):
+        for connection in self.connections:
+            connection.close()
+        self.connections = []
+
+    def map(self, function, items):
+        if type(items) is Array:
+            items = items.data.tolist()
+        elif type(items) is List:
+            items = items.items
+        else:
+            raise NativeError("parallel_map() takes a function and a list.")
+        if not isinstance(function, Callable) or function.arity() != 1:
+            raise NativeError("parallel_map() needs a function that takes one argument.")
+
+        if len(items) < 2 or not self.can_fork():
+            return List([call(self.interpreter, function, item) for item in items])
+        return List(self.scatter(function, items))
+
+    def scatter(self, function, items):
+        size = -(-len(items) // (self.workers * CHUNKS_PER_WORKER))
+        chunks = [items[start:start + size] for start in range(0, len(items), size)]
+        try:
+            setup = dumps(("function", function))
+            chunks = [dumps(("chunk", index, chunk)) for index, chunk in enumerate(chunks)]
+        except (pickle.PicklingError, TypeError, AttributeError, RecursionError) as e:
+            raise NativeError(f"parallel_map() couldn't send the function or its items to the workers: {e}") from None
+
+        if not self.connections:
+            self.start()
+        connections = self.connections[:len(chunks)]
+        try:
+            for connection in connections:
+                connection.send_bytes(setup)
+            return self.gather(connections, chunks)
+        except (EOFError, OSError):
+            self.stop() # a worker died, start over with new ones next time
+            raise NativeError("A parallel_map() worker stopped unexpectedly.") from None
+
+    def gather(self, connections, chunks):
+        """
+        hands out the chunks as workers free up and collects the results in
+        order. when a call fails, the chunks already sent out are still waited
+        for, so the error reported is the one for the earliest item, as if the
+        items had been mapped one after another.
+        """
+        import multiprocessing.connection
+        results = [None] * len(chunks)
+        failures = []
+        waiting = {}
+        sent = 0
+        for connection in connections:
+            connection.send_bytes(chunks[sent])
+            waiting[connection] = sent
+            sent += 1
+
+        while waiting:
+            for connection in multiprocessing.connection.wait(list(waiting)):
+                reply = loads(connection.recv_bytes(), self.interpreter)
+                del waiting[connection]
+                if reply[0] == "done":
+                    results[reply[1]] = reply[2]
+                else:
+                    failures.append(reply)
+                if sent < len(chunks) and not failures:
+                    connection.send_bytes(chunks[sent])
+                    waiting[connection] = sent
+                    sent += 1
+
+        if failures:
+            failure = min(failures, key=lambda reply: reply[1])
+            if failure[0] == "error":
+                error = Error(failure[2], Token(None, None, failure[3], failure[4]))
+                error.happened_in(failure[5])
+                raise error
+            if failure[0] == "native":
+                raise NativeError(failure[2])
+            raise failure[2]
+        return [result for chunk in results for result in chunk]
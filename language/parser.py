@@ -1,31 +1,73 @@
 # pyright: reportShadowedImports=none
-from lexer import *
-from syntax_tree import *
-from error import *
+from .lexer import *
+from .syntax_tree import *
+from .error import *
+
+def is_variable(node, name) -> bool:
+    return type(node) == Variable and node.token.value == name
+
+def assigns(node, name) -> bool:
+    """
+    whether anything in this subtree (nested functions included) assigns the name.
+    """
+    if type(node) == Assign and is_variable(node.name, name):
+        return True
+    if type(node) == list:
+        return any(assigns(child, name) for child in node)
+    if isinstance(node, AbstractSyntaxTree):
+        return any(assigns(getattr(node, field, None), name) for field in type(node).__slots__)
+    return False
+
+def is_counted(initializer, condition, increment, block) -> bool:
+    """
+    whether a for loop just counts a variable up by one: `for (let i = a; i < b; i++)`
+    (or `i <= b`, or `i = i + 1`) with nothing else in the body assigning `i`.
+    """
+    if type(initializer) != Declare:
+        return False
+    name = initializer.name.value
+    if type(condition) != BinaryOperator or condition.operator not in (TokenType.LESS, TokenType.LESS_EQUAL):
+        return False
+    if not is_variable(condition.left, name) or type(increment) != Assign or not is_variable(increment.name, name):
+        return False
+
+    step = increment.value
+    if type(step) != BinaryOperator or step.operator != TokenType.PLUS or not is_variable(step.left, name):
+        return False
+    if type(step.right) != Literal or type(step.right.token.value) != int or step.right.token.value != 1:
+        return False
+    return not assigns(block, name) and not assigns(condition.right, name)
 
 class Parser():
     def __init__(self):
-        self.tokens = []
+        self.tokens = iter(())
         self.lexer = Lexer()
-        self.token_index = -1
+        self.lookahead = [] # tokens pulled from the lexer by peek() but not consumed yet
         self.current_token = None
         self.filename = None
 
     def next_token(self) -> None:
-        self.token_index += 1
-
-        if self.token_index < len(self.tokens): 
-            self.current_token = self.tokens[self.token_index]
-        else:
-            last_token = self.tokens[-1]
-            self.current_token = Token(TokenType.EOF, None, last_token.line, last_token.column + 2)
-
+        if self.lookahead:
+            self.current_token = self.lookahead.pop(0)
+            return
+
+        last_token = self.current_token
+        self.current_token = next(self.tokens, None)
+        if self.current_token is None:
+            if last_token is None:
+                self.current_token = Token(TokenType.EOF, None)
+            elif last_token.type == TokenType.EOF:
+                self.current_token = last_token
+            else:
+                self.current_token = Token(TokenType.EOF, None, last_token.line, last_token.column + 2)
 
     def peek(self) -> Token:
-        if self.token_index + 1 < len(self.tokens):
-            return self.tokens[self.token_index + 1]
-        else:
-            return Token(TokenType.EOF, None)
+        if not self.lookahead:
+            token = next(self.tokens, None)
+            if token is None:
+                return Token(TokenType.EOF, None)
+            self.lookahead.append(token)
+        return self.lookahead[0]
 
     def eat_token(self, expected_token, error) -> None:
         if self.current_token.type == expected_token:
@@ -47,13 +89,7 @@ class Parser():
         
         elif token.type == TokenType.NAME:
             self.eat_token(TokenType.NAME, "")
-            var = Variable(token)
-            # if self.current_token.type == TokenType.LIST_OPEN: # getter
-            #     self.eat_token(TokenType.LIST_OPEN, "")
-            #     expr = self.get_expression()
-            #     self.eat_token(TokenType.LIST_CLOSE, "Expected closing bracket.")
-            #     var = GetProp(var, expr)
-            return var
+            return Variable(token)
         
         elif token.type == TokenType.SELF:
             self.eat_token(TokenType.SELF, "")
@@ -88,6 +124,13 @@ class Parser():
                 self.eat_token(TokenType.NAME, "Expected property or method name after dot (\".\").")
                 expr = GetProp(expr, Variable(name))
 
+            elif self.current_token.type == TokenType.LIST_OPEN:
+                bracket = self.current_token
+                self.eat_token(TokenType.LIST_OPEN, "")
+                index = self.get_expression()
+                self.eat_token(TokenType.LIST_CLOSE, "Expected closing bracket after list index.")
+                expr = GetItem(expr, index, bracket)
+
             else: break
 
         return expr
@@ -109,6 +152,10 @@ class Parser():
             factor = self.primary()
             return UnaryOperator(token, factor)
 
+        elif token.type == TokenType.AWAIT:
+            self.eat_token(TokenType.AWAIT, "")
+            return Await(token, self.unary())
+
         val = self.call_function()
         if val is None:
             raise Error(f"Unexpected end of expression.", self.current_token)
@@ -220,6 +267,8 @@ class Parser():
                 return Assign(expr, value)
             elif isinstance(expr, GetProp):
                 return SetProp(expr.object, expr.name, value)
+            elif isinstance(expr, GetItem):
+                return SetItem(expr.object, expr.index, value, expr.bracket)
         
         return expr
 
@@ -252,7 +301,25 @@ class Parser():
         statements = self.code_block(TokenType.END)
 
         return DeclareFunc(func_name, args, statements)
+
+    def async_func(self) -> DeclareFunc:
+        self.eat_token(TokenType.ASYNC, "")
+        node = self.declare_func()
+        node.is_async = True
+        return node
     
+    def annotated_func(self) -> DeclareFunc:
+        annotation = self.current_token
+        self.eat_token(TokenType.ANNOTATION, "")
+        if annotation.value not in ("memoize", "no_memoize"):
+            raise Error(f"Unkown annotation '@{annotation.value}'.", annotation)
+
+        self.eat_token(TokenType.FUNCOPEN, "Expected a function declaration after an annotation.")
+        node = self.declare_func()
+        self.eat_token(TokenType.END, "")
+        node.memoize = annotation.value == "memoize"
+        return node
+
     def if_statement(self):
         self.eat_token(TokenType.PAROPEN, "Expected a set of parenthesis for condition.")
         condition = self.get_expression()
@@ -281,7 +348,10 @@ class Parser():
 
         return WhileStatement(condition, block)
 
-    def for_statement(self): # "desugars" a for loop and returns a WhileStatement instance (reads a for loop, returns a while loop)
+    def for_statement(self): # reads a for loop: a ForRange when it just counts, a ForEach for "for x in xs", and a while loop (WhileStatement) otherwise
+        if self.current_token.type == TokenType.NAME and self.peek().type == TokenType.IN:
+            return self.for_each()
+
         self.eat_token(TokenType.PAROPEN, "Expected open parenthesis for loop initialization.")
 
         intializer = None
@@ -301,10 +371,25 @@ class Parser():
         block = self.code_block(TokenType.END)
         self.eat_token(TokenType.END, "")
 
-        block.children.append(increment) # put the incrementer at the back
+        if is_counted(initializer, condition, increment, block):
+            loop = ForRange(initializer.name, initializer.value, condition.right, condition.operator == TokenType.LESS_EQUAL, block)
+            return CodeBlock([loop])
 
-        while_loop = WhileStatement(condition, block)
+        # the incrementer is kept apart from the body so that "continue" doesn't skip it
+        while_loop = WhileStatement(condition, block, increment)
         return CodeBlock([initializer, while_loop])
+
+    def for_each(self):
+        name = self.current_token
+        self.eat_token(TokenType.NAME, "")
+        self.eat_token(TokenType.IN, "")
+        iterable = self.get_expression()
+        self.eat_token(TokenType.COLON, "Expected colon after the list to loop over.")
+
+        block = self.code_block(TokenType.END)
+        self.eat_token(TokenType.END, "")
+
+        return CodeBlock([ForEach(name, iterable, block)]) # a block of its own, so the loop variable is scoped to it
     
     def class_decl(self):
         name = Variable(self.current_token)
@@ -315,17 +400,22 @@ class Parser():
         methods = []
         l = 1
         while self.current_token.type != TokenType.END:
-            methods.append(self.declare_func())
+            if self.current_token.type == TokenType.ASYNC:
+                methods.append(self.async_func())
+            else:
+                methods.append(self.declare_func())
             self.eat_token(TokenType.END, "Expected end keyword after method declaration.")
         self.eat_token(TokenType.END, "Expected end keyword after class declaration.")
 
         return ClassDecl(name, methods)
     
     def list(self):
-        items = [self.get_expression()]
-        while self.current_token.type == TokenType.COMMA:
-            self.eat_token(TokenType.COMMA, "")
+        items = []
+        if self.current_token.type != TokenType.LIST_CLOSE:
             items.append(self.get_expression())
+            while self.current_token.type == TokenType.COMMA:
+                self.eat_token(TokenType.COMMA, "")
+                items.append(self.get_expression())
         token = Variable(self.current_token)
         self.eat_token(TokenType.LIST_CLOSE, "Expected closing bracket after list items.")
         return BuiltinList(items, token)
@@ -338,7 +428,7 @@ class Parser():
                 tree_nodes.append(self.declare_var())
 
             elif self.current_token.type in (TokenType.NAME, TokenType.SELF):
-                if self.peek().type in (TokenType.ASSIGN, TokenType.INCREMENT, TokenType.DECREMENT, TokenType.DOT):
+                if self.peek().type in (TokenType.ASSIGN, TokenType.INCREMENT, TokenType.DECREMENT, TokenType.DOT, TokenType.LIST_OPEN):
                     tree_nodes.append(self.assign())
 
                 else:
@@ -350,11 +440,30 @@ class Parser():
                 self.eat_token(TokenType.END, "")
                 tree_nodes.append(node)
 
+            elif self.current_token.type == TokenType.ANNOTATION:
+                tree_nodes.append(self.annotated_func())
+
+            elif self.current_token.type == TokenType.ASYNC:
+                self.eat_token(TokenType.ASYNC, "")
+                self.eat_token(TokenType.FUNCOPEN, "Expected \"fn\" after \"async\".")
+                node = self.declare_func()
+                self.eat_token(TokenType.END, "")
+                node.is_async = True
+                tree_nodes.append(node)
+
             elif self.current_token.type == TokenType.RETURN:
                 token = self.current_token
                 self.eat_token(TokenType.RETURN, "")
                 tree_nodes.append(Return(self.get_expression(), token))
 
+            elif self.current_token.type == TokenType.BREAK:
+                tree_nodes.append(Break(self.current_token))
+                self.eat_token(TokenType.BREAK, "")
+
+            elif self.current_token.type == TokenType.CONTINUE:
+                tree_nodes.append(Continue(self.current_token))
+                self.eat_token(TokenType.CONTINUE, "")
+
             elif self.current_token.type == TokenType.PRINT:
                 self.eat_token(TokenType.PRINT, "")
                 value = ""
@@ -379,6 +488,13 @@ class Parser():
                 self.eat_token(TokenType.CLASS_DECL, "")
                 tree_nodes.append(self.class_decl())
 
+            elif self.current_token.type == TokenType.IMPORT:
+                keyword = self.current_token
+                self.eat_token(TokenType.IMPORT, "")
+                path = self.current_token
+                self.eat_token(TokenType.STRING, "Expected the path of a module (a string) after \"import\".")
+                tree_nodes.append(Import(keyword, path.value))
+
             else:
                 tree_nodes.append(self.get_expression())
             
@@ -393,15 +509,13 @@ class Parser():
         return tree
 
     def setup(self, content) -> None:
-        self.tokens = []
-        self.token_index = -1
+        """
+        tokens are only lexed as the parser asks for them, so nothing but the
+        current token and the lookahead is ever held in memory.
+        """
+        self.lookahead = []
         self.current_token = None
         self.lexer.content = content
-        self.lexer.index = -1
         self.tokens = self.lexer.tokenize()
-
-        if self.tokens == []:
-            return False
-
         self.next_token()
-        return True
\ No newline at end of file
+        return True
@@ -0,0 +1,100 @@
+"""
+the `--profile` mode.
+
+functions already route their calls through `Function.memo` when it's set, and
+the vm and closure engines only take their fast paths when it isn't. so when
+profiling, every function gets a `ProfiledCalls` in that spot (wrapping its real
+memo, if it has one), and none of the engines need to check anything when the
+profiler is off.
+"""
+import time
+from .function_obj import BuiltinFunction
+
+class Entry():
+    """
+    everything measured for one function declaration.
+    """
+    __slots__ = ("name", "location", "calls", "total", "own", "active")
+
+    def __init__(self, name, location):
+        self.name = name
+        self.location = location
+        self.calls = 0
+        self.total = 0.0 # from the outermost call in until it returns, so recursion isn't counted twice
+        self.own = 0.0 # minus the time spent in other profiled calls
+        self.active = 0 # calls to it that haven't returned yet
+
+    def as_dict(self):
+        return {"name": self.name, "location": self.location, "calls": self.calls, "total": self.total, "self": self.own}
+
+class ProfiledCalls():
+    """
+    stands in for a function's memo, timing every call before passing it on.
+    """
+    __slots__ = ("profiler", "entry", "memo")
+
+    def __init__(self, profiler, entry, memo=None):
+        self.profiler = profiler
+        self.entry = entry
+        self.memo = memo
+
+    def call(self, invoke, interpreter, args):
+        if self.memo is not None:
+            return self.profiler.measure(self.entry, self.memo.call, invoke, interpreter, args)
+        return self.profiler.measure(self.entry, invoke, interpreter, args)
+
+class Profiler():
+    def __init__(self):
+        self.entries = {} # declaration -> Entry
+        self.children = [] # time spent in profiled calls, for every call that's running
+
+    def entry(self, key, name, location):
+        entry = self.entries.get(key)
+        if entry is None:
+            entry = self.entries[key] = Entry(name, location)
+        return entry
+
+    def wrap(self, key, name, location, memo=None):
+        return ProfiledCalls(self, self.entry(key, name, location), memo)
+
+    def wrap_builtin(self, function):
+        """
+        builtins don't go through a memo, so their action gets timed instead.
+        """
+        entry = self.entry(function, function.name, "<builtin>")
+        action = function.action
+        return BuiltinFunction(function.name, lambda *args: self.measure(entry, action, *args), function.args)
+
+    def measure(self, entry, call, *args):
+        children = self.children
+        children.append(0.0)
+        entry.active += 1
+        start = time.perf_counter()
+        try:
+            return call(*args)
+        finally:
+            elapsed = time.perf_counter() - start
+            entry.calls += 1
+            entry.own += elapsed - children.pop()
+            entry.active -= 1
+            if entry.active == 0:
+                entry.total += elapsed
+            if children:
+                children[-1] += elapsed
+
+    def sorted_entries(self):
+        called = [entry for entry in self.entries.values() if entry.calls > 0]
+        return sorted(called, key=lambda entry: entry.own, reverse=True)
+
+    def report(self, file):
+        entries = self.sorted_entries()
+        width = max([len(entry.name) for entry in entries] + [8])
+        print(f"{'function':<{width}}  {'calls':>9}  {'total ms':>10}  {'self ms':>10}  {'self/call us':>12}  location", file=file)
+        for entry in entries:
+            per_call = entry.own / entry.calls * 1e6 if entry.calls else 0
+            print(f"{entry.name:<{width}}  {entry.calls:>9}  {entry.total * 1000:>10.3f}  {entry.own * 1000:>10.3f}  {per_call:>12.2f}  {entry.location}", file=file)
+
+    def write_json(self, filename):
+        import json # only needed here, no point loading it for every run
+        with open(filename, "w") as f:
+            json.dump([entry.as_dict() for entry in self.sorted_entries()], f, indent=2)
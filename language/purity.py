@@ -0,0 +1,156 @@
+# pyright: reportShadowedImports=none
+from .syntax_tree import *
+from .optimizer import VariableTracker, children
+
+class PurityAnalyzer(VariableTracker):
+    """
+    finds the functions whose calls can be memoized, i.e. the ones that always give
+    the same result for the same arguments and do nothing else:
+
+    - no printing, no fields or list items being read or set, no lists or closures being created
+    - not async, and not awaiting anything: every call to an async function starts a new task
+    - nothing outside the function is assigned
+    - the only things read from outside are other functions, and those are pure too
+    - every call is to one of those: a function held by a parameter or local could be anything
+
+    functions are assumed pure until proven otherwise, so (mutually) recursive
+    functions like fib come out pure as long as everything else holds.
+    @memoize and @no_memoize on a declaration override whatever the analysis says.
+    """
+    def __init__(self):
+        super().__init__()
+        self.functions = {} # variable -> the function declared in it, if it's never reassigned
+        self.dependencies = {} # function -> variables it reads from outside itself
+        self.impure = set()
+        self.methods = set()
+        self.current = None # the function being looked at
+        self.boundary = 0 # index of its frame in self.frames
+        self.whole_program = True
+
+    def analyze(self, tree, whole_program=True):
+        """
+        marks every function in the program. global functions can only be trusted
+        when the whole program is known, e.g. not in the shell where the next line
+        might declare them again.
+        """
+        self.count_all_writes(tree)
+        self.functions = {}
+        self.dependencies = {}
+        self.impure = set()
+        self.methods = set()
+        self.current = None
+        self.whole_program = whole_program
+
+        self.frames = [tree]
+        for statement in tree.children:
+            self.visit(statement)
+
+        pure = {function for function in self.dependencies if function not in self.impure}
+        changed = True
+        while changed:
+            changed = False
+            for function in list(pure):
+                if any(self.functions.get(variable) not in pure for variable in self.dependencies[function]):
+                    pure.discard(function)
+                    changed = True
+
+        for function in self.dependencies:
+            if function in self.methods:
+                continue
+            function.memoized = function.memoize if function.memoize is not None else function in pure
+
+        self.functions = {}
+        self.dependencies = {}
+        self.impure = set()
+        self.methods = set()
+        self.release()
+
+    def taint(self):
+        if self.current is not None:
+            self.impure.add(self.current)
+
+    def is_outside(self, depth):
+        """
+        whether a variable at this depth lives outside the function being looked at.
+        """
+        return depth is None or len(self.frames) - 1 - depth < self.boundary
+
+    def function_body(self, node):
+        old = self.current, self.boundary
+        self.current = node
+        self.dependencies[node] = set()
+        self.frames.append(node)
+        self.boundary = len(self.frames) - 1
+        for statement in node.statements.children:
+            self.visit(statement)
+        self.frames.pop()
+        self.current, self.boundary = old
+
+    def visit(self, node):
+        if type(node) == DeclareFunc:
+            self.taint() # every call would make a new closure
+            variable = self.declared(node.name.token.value, node.slot)
+            if self.writes.get(variable) == 1 and (self.whole_program or node.slot is not None):
+                self.functions[variable] = node
+            self.function_body(node)
+            if node.is_async:
+                self.impure.add(node)
+
+        elif type(node) == ClassDecl:
+            self.taint()
+            for method in node.methods:
+                self.methods.add(method)
+                self.function_body(method)
+
+        elif type(node) in (Print, SetProp, GetProp, GetItem, SetItem, Self, BuiltinList, Await):
+            self.taint()
+            for child in children(node):
+                self.visit(child)
+
+        elif type(node) == Variable:
+            if self.current is not None and self.is_outside(node.depth):
+                self.dependencies[self.current].add(self.variable(node.token.value, node.depth, node.slot))
+
+        elif type(node) == Assign:
+            if type(node.name) != Variable or self.is_outside(node.name.depth):
+                self.taint()
+            self.visit(node.value)
+
+        elif type(node) == Declare:
+            self.visit(node.value)
+
+        elif type(node) == FunctionCall:
+            # only functions declared outside can be checked, a parameter or local could hold anything
+            if type(node.name) != Variable or not self.is_outside(node.name.depth):
+                self.taint() # can't tell what's being called
+            for child in children(node):
+                self.visit(child)
+
+        elif type(node) == CodeBlock:
+            self.block(node, lambda block: [self.visit(child) for child in block.children])
+
+        elif type(node) == IfStatement:
+            self.visit(node.condition)
+            self.visit(node.block)
+            if node.else_block is not None:
+                self.visit(node.else_block)
+
+        elif type(node) == ForRange:
+            self.visit(node.start)
+            self.visit(node.end)
+            self.visit(node.block)
+
+        elif type(node) == ForEach:
+            self.taint() # reads the items of a list, like indexing does
+            self.visit(node.iterable)
+            self.visit(node.block)
+
+        elif type(node) == WhileStatement:
+            self.visit(node.condition)
+            self.visit(node.block)
+            if node.increment is not None:
+                self.visit(node.increment)
+
+        else:
+            for child in children(node):
+                self.visit(child)
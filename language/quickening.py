@@ -0,0 +1,114 @@
+"""
+self-specializing operators for the tree walker.
+
+every `BinaryOperator` and `UnaryOperator` node starts out generic: the walker
+hands its operands to `binary`/`unary` below, which look the operation up and
+count down the node's warm-up counter. once that reaches zero, the node is
+specialized for the operand types it just saw: it stores those types and an
+operation that only has to be right for them (`operator.add` for int + int, a
+plain `==` instead of the None handling for EQUAL, ...). from then on the walker
+checks the types itself and calls that operation directly, skipping the lookup.
+
+when an operand of another type shows up, the node goes back to being generic
+and waits a while longer before specializing again, so an operator that keeps
+seeing different types doesn't keep flipping between the two.
+"""
+import operator
+from .lexer import TokenType
+
+WARMUP = 8 # generic evaluations before a node specializes
+BACKOFF = 64 # generic evaluations before it tries again after being de-optimized
+
+# == and != as the language has them, where nothing is only equal to nothing.
+# the closure engine uses these too
+def equal(left, right):
+    if left is None:
+        return right is None
+    return left == right
+
+def not_equal(left, right):
+    if left is None:
+        return right is not None
+    return left != right
+
+def logical_not(value):
+    return value is None or value is False
+
+generic_binary = {
+    TokenType.PLUS: operator.add,
+    TokenType.MINUS: operator.sub,
+    TokenType.MULTIPLY: operator.mul,
+    TokenType.DIVIDE: operator.truediv,
+    TokenType.GREATER: operator.gt,
+    TokenType.LESS: operator.lt,
+    TokenType.GREATER_EQUAL: operator.ge,
+    TokenType.LESS_EQUAL: operator.le,
+    TokenType.EQUAL: equal,
+    TokenType.NOT_EQUAL: not_equal,
+}
+
+generic_unary = {
+    TokenType.PLUS: operator.pos,
+    TokenType.MINUS: operator.neg,
+    TokenType.NOT: logical_not,
+}
+
+numbers = (int, float)
+
+def specialize_binary(op, left, right):
+    """
+    the operation to use while the operands keep these types, or None if there's
+    nothing faster than the generic one.
+    """
+    if op == TokenType.EQUAL or op == TokenType.NOT_EQUAL:
+        if left is type(None):
+            return None
+        # the left operand can't be None, so the None handling can go
+        return operator.eq if op == TokenType.EQUAL else operator.ne
+
+    if left in numbers and right in numbers or op == TokenType.PLUS and left is str and right is str:
+        return generic_binary[op]
+    return None
+
+def specialize_unary(op, child):
+    if op == TokenType.NOT:
+        return operator.not_ if child is bool else None
+    return generic_unary[op] if child in numbers else None
+
+def binary(node, left, right):
+    """
+    evaluates a binary operator whose specialization (if it has one) didn't apply
+    to these operands, specializing or de-optimizing the node as needed.
+    """
+    if node.left_type is not None:
+        # specialized for other types: back to generic
+        node.left_type = node.right_type = None
+        node.counter = BACKOFF
+    else:
+        node.counter -= 1
+        if node.counter <= 0:
+            kinds = type(left), type(right)
+            quick = specialize_binary(node.operator, *kinds)
+            if quick is not None:
+                node.quick = quick
+                node.left_type, node.right_type = kinds
+            else:
+                node.counter = BACKOFF
+    return generic_binary[node.operator](left, right)
+
+def unary(node, child):
+    op = node.operator.type
+    if node.child_type is not None:
+        node.child_type = None
+        node.counter = BACKOFF
+    else:
+        node.counter -= 1
+        if node.counter <= 0:
+            kind = type(child)
+            quick = specialize_unary(op, kind)
+            if quick is not None:
+                node.quick = quick
+                node.child_type = kind
+            else:
+                node.counter = BACKOFF
+    return generic_unary[op](child)
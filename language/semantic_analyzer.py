@@ -0,0 +1,283 @@
+from .lexer import *
+from .syntax_tree import *
+from .error import *
+
+class FrameScope():
+    """
+    resolver-side view of a single runtime frame.
+
+    blocks that no closure can capture don't need a frame of their own, so their
+    variables are flattened into the frame they're nested in. that means one frame
+    can hold several block scopes at once, each mapping a name to a slot.
+    """
+    def __init__(self, is_global=False):
+        self.blocks = [{}]
+        self.is_global = is_global # names in the outermost block of the script are globals
+        self.next_slot = 1 # slot 0 holds the parent frame
+        self.size = 1
+
+    def declare(self, name):
+        block = self.blocks[-1]
+        if self.is_global and len(self.blocks) == 1:
+            block[name] = None
+            return None
+
+        slot = block.get(name)
+        if slot is None:
+            slot = block[name] = self.next_slot
+            self.next_slot += 1
+            self.size = max(self.size, self.next_slot)
+        return slot
+
+def declares_closure(node) -> bool:
+    """
+    whether a function or class is declared anywhere inside this block.
+    only those blocks need a real frame at runtime, since a closure can
+    outlive the block it was declared in.
+    """
+    if type(node) in (DeclareFunc, ClassDecl):
+        return True
+    elif type(node) == CodeBlock:
+        return any(declares_closure(child) for child in node.children)
+    elif type(node) == IfStatement:
+        return declares_closure(node.block) or declares_closure(node.else_block)
+    elif type(node) in (WhileStatement, ForRange, ForEach):
+        return declares_closure(node.block)
+    return False
+
+class SemanticAnalyzer():
+    """
+    resolves every name in the program to where it lives at runtime.
+
+    locals get a (depth, slot) pair: how many frames to walk up, then which slot
+    of that frame to read. globals are left with a depth of None and are looked
+    up by name. the results are stored on the nodes themselves, so every engine
+    can index straight into its frames.
+    """
+    def __init__(self):
+        self.global_frame = FrameScope(is_global=True)
+        self.frames = [self.global_frame]
+        self.declaring = None
+        self.function_state = False
+        self.class_state = False
+        self.loop_state = False
+        self.async_state = False
+        self.imports = False # whether the last program resolved imports a module
+
+    def begin_scope(self, node):
+        """
+        returns whatever `end_scope` needs to close the scope again.
+        """
+        if declares_closure(node):
+            self.frames.append(FrameScope())
+            return None
+
+        frame = self.frames[-1]
+        frame.blocks.append({})
+        return frame.next_slot
+
+    def end_scope(self, node, state):
+        if state is None:
+            node.size = self.frames.pop().size
+            return
+
+        node.size = None
+        frame = self.frames[-1]
+        frame.blocks.pop()
+        frame.next_slot = state # slots of a flattened block are free again once it ends
+
+    def declare(self, name: str):
+        """
+        Give a name a slot in the innermost scope.
+        Returns None for globals, which are looked up by name instead.
+        """
+        return self.frames[-1].declare(name)
+
+    def resolve_local(self, expr: AbstractSyntaxTree, name: str):
+        depth = 0
+        for frame in reversed(self.frames):
+            for index in range(len(frame.blocks) - 1, -1, -1):
+                if name in frame.blocks[index]:
+                    slot = frame.blocks[index][name]
+                    expr.depth = None if slot is None else depth
+                    expr.slot = slot
+                    return
+            depth += 1
+
+        expr.depth = None
+        expr.slot = None
+
+    def resolve_program(self, tree):
+        """
+        resolves a whole program. globals are remembered between calls (e.g. in the shell),
+        everything else starts over.
+        """
+        self.global_frame.blocks = self.global_frame.blocks[:1]
+        self.global_frame.next_slot = 1
+        self.global_frame.size = 1
+        self.frames = [self.global_frame]
+        self.declaring = None
+        self.function_state = False
+        self.class_state = False
+        self.loop_state = False
+        self.async_state = False
+        self.imports = False
+
+        self.resolve_block(tree)
+        tree.size = self.global_frame.size
+
+    def resolve_block(self, block):
+        for statement in block.children:
+            self.resolve(statement)
+
+    def resolve_function(self, node, type):
+        old = self.function_state, self.loop_state, self.async_state
+        self.function_state = True
+        self.loop_state = False # loops outside the function can't be broken out of from inside
+        self.async_state = node.is_async
+        if type == "function":
+            node.slot = self.declare(node.name.token.value)
+
+        frame = FrameScope()
+        if type == "method":
+            frame.declare("self") # passed in before the arguments
+        self.frames.append(frame)
+        for arg in node.args:
+            frame.declare(arg.name)
+        self.resolve_block(node.statements)
+        self.frames.pop()
+        node.size = frame.size
+        self.function_state, self.loop_state, self.async_state = old
+
+    def resolve_loop_body(self, block):
+        old = self.loop_state
+        self.loop_state = True
+        self.resolve(block)
+        self.loop_state = old
+
+    def resolve(self, node):
+        if type(node) == CodeBlock:
+            state = self.begin_scope(node)
+            self.resolve_block(node)
+            self.end_scope(node, state)
+
+        elif type(node) in (BinaryOperator, Logical):
+            self.resolve(node.left)
+            self.resolve(node.right)
+
+        elif type(node) == UnaryOperator:
+            self.resolve(node.child)
+
+        elif type(node) == Await:
+            # the top level can await too, it's only a plain function that can't be paused
+            if self.function_state and not self.async_state:
+                raise Error("Cannot use 'await' outside of an async function.", node.keyword)
+            self.resolve(node.value)
+
+        elif type(node) == Declare:
+            name = node.name.value
+            old = self.declaring
+            self.declaring = name
+            self.resolve(node.value)
+            self.declaring = old
+            node.slot = self.declare(name)
+
+        elif type(node) == Variable:
+            if node.token.value == self.declaring:
+                raise Error(f"'{node.token.value}' cannot be read in its own declaration.", node.token)
+            self.resolve_local(node, node.token.value)
+
+        elif type(node) == Assign:
+            self.resolve(node.value)
+            self.resolve_local(node.name, node.name.token.value)
+
+        elif type(node) == DeclareFunc:
+            self.resolve_function(node, "function")
+
+        elif type(node) == IfStatement:
+            self.resolve(node.condition)
+            self.resolve(node.block)
+            if node.else_block:
+                self.resolve(node.else_block)
+
+        elif type(node) == Print:
+            self.resolve(node.expression)
+
+        elif type(node) == Return:
+            if not self.function_state:
+                raise Error("Cannot use return statement outside of a function.", node.token)
+
+            self.resolve(node.statement)
+
+        elif type(node) == WhileStatement:
+            self.resolve(node.condition)
+            old = self.loop_state
+            self.loop_state = True
+            self.resolve(node.block)
+            self.loop_state = old
+            if node.increment is not None:
+                self.resolve(node.increment)
+
+        elif type(node) == ForRange:
+            name = node.name.value
+            old = self.declaring
+            self.declaring = name
+            self.resolve(node.start)
+            self.declaring = old
+            node.slot = self.declare(name)
+            self.resolve(node.end)
+            self.resolve_loop_body(node.block)
+
+        elif type(node) == ForEach:
+            self.resolve(node.iterable)
+            node.slot = self.declare(node.name.value)
+            node.iterator_slot = self.declare(" iterator") # can't clash with a real name
+            self.resolve_loop_body(node.block)
+
+        elif type(node) in (Break, Continue):
+            if not self.loop_state:
+                raise Error(f"Cannot use '{node.token.value}' outside of a loop.", node.token)
+
+        elif type(node) == Import:
+            # a module's globals become the program's, which only makes sense where the program's globals are
+            if self.function_state:
+                raise Error("Modules can only be imported outside of functions.", node.keyword)
+            self.imports = True
+
+        elif type(node) == FunctionCall:
+            self.resolve(node.name)
+            for arg in node.args:
+                self.resolve(arg)
+
+        elif type(node) == ClassDecl:
+            old = self.class_state
+            self.class_state = True
+            node.slot = self.declare(node.name.token.value)
+            for method in node.methods:
+                self.resolve_function(method, "method")
+            self.class_state = old
+
+        elif type(node) == GetProp:
+            self.resolve(node.object)
+
+        elif type(node) == SetProp:
+            self.resolve(node.object)
+            self.resolve(node.value)
+
+        elif type(node) == GetItem:
+            self.resolve(node.object)
+            self.resolve(node.index)
+
+        elif type(node) == SetItem:
+            self.resolve(node.object)
+            self.resolve(node.index)
+            self.resolve(node.value)
+
+        elif type(node) == Self:
+            if not self.class_state:
+                raise Error("Cannot use 'self' keyword outside of a class.", node.keyword)
+            self.resolve_local(node, node.keyword.value)
+
+        elif type(node) == BuiltinList:
+            for item in node.items:
+                self.resolve(item)
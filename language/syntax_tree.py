@@ -0,0 +1,336 @@
+from unicodedata import name
+from .lexer import token_names
+from .quickening import WARMUP
+from .function_obj import PropertyCache, StoreCache
+
+class AbstractSyntaxTree():
+    r"""
+    this file contains the abstract syntax tree for the main parser.
+
+    a syntax tree is just a representation of the grammar rules defined by our program.
+    in the context of a calculator, the syntax tree would show the order of operations
+    that the parser follows.
+
+    for example, 10 + 30 / 5 can be represented as:
+    ```
+         (+)
+        /   \
+    (10)     (/)
+            /   \
+        (30)     (5)
+
+    ```
+    it's a helpful way to visualize how the interpreter solves expressions.
+    """
+    __slots__ = ()
+
+class CodeBlock(AbstractSyntaxTree):
+    __slots__ = ("children", "size")
+
+    def __init__(self, children):
+        self.children = children
+        self.size = None # frame size if the block needs its own frame, set by the resolver
+    
+    def __repr__(self):
+        return f"CODE BLOCK: {self.children}"
+
+class BinaryOperator(AbstractSyntaxTree):
+    __slots__ = ("operator", "left", "right", "quick", "left_type", "right_type", "counter")
+
+    def __init__(self, operator, left, right):
+        self.operator = operator
+        self.left = left
+        self.right = right
+        # the tree walker specializes the node for the operand types it sees, see quickening.py
+        self.quick = None
+        self.left_type = None
+        self.right_type = None
+        self.counter = WARMUP
+        
+    def __repr__(self):
+        return f"{self.left} {token_names[self.operator]} {self.right}"
+
+class UnaryOperator(AbstractSyntaxTree):
+    __slots__ = ("operator", "child", "quick", "child_type", "counter")
+
+    def __init__(self, operator, child):
+        self.operator = operator
+        self.child = child # token that the unary operator is modifying
+        self.quick = None # see BinaryOperator
+        self.child_type = None
+        self.counter = WARMUP
+
+    def __repr__(self):
+        return f"{self.operator}{self.child}"
+
+class Literal(AbstractSyntaxTree):
+    __slots__ = ("token",)
+
+    def __init__(self, token):
+        self.token = token
+    
+    def __repr__(self):
+        return f"{self.token.value}"
+
+class Assign(AbstractSyntaxTree):
+    __slots__ = ("name", "value")
+
+    def __init__(self, name, value):
+        self.name = name
+        self.value = value
+
+    def __repr__(self):
+        return f"{self.name} = {self.value}"
+
+class Variable(AbstractSyntaxTree):
+    __slots__ = ("token", "symbol", "depth", "slot")
+
+    def __init__(self, token):
+        self.token = token
+        self.symbol = None
+        self.depth = None # (depth, slot) is set by the resolver, depth is None for globals
+        self.slot = None
+
+    def __repr__(self):
+        return f"{self.token.value}"
+
+class Declare(AbstractSyntaxTree):
+    __slots__ = ("name", "value", "slot")
+
+    def __init__(self, name, value):
+        self.name = name
+        self.value = value
+        self.slot = None
+    
+    def __repr__(self):
+        return f"{self.name.value} = {self.value}"
+
+class Argument(AbstractSyntaxTree):
+    __slots__ = ("name",)
+
+    def __init__(self, name):
+        self.name = name
+        # self.type = type
+
+    def __repr__(self):
+        return f"Argument({type(self.name)})"
+
+class DeclareFunc(AbstractSyntaxTree):
+    __slots__ = ("name", "args", "statements", "slot", "size", "memoize", "memoized", "is_async")
+
+    def __init__(self, name, args, statements):
+        self.name = name
+        self.args = args
+        self.statements = statements
+        self.slot = None
+        self.size = None
+        self.memoize = None # True or False when annotated with @memoize or @no_memoize
+        self.memoized = False # whether calls are memoized, decided by the purity analysis
+        self.is_async = False # declared with "async fn": calls start a task instead of running the body
+        # self.symbol = symbol
+    
+    def __repr__(self):
+        return f"fn {self.name}({len(self.args)} argument(s))"
+
+class FunctionCall(AbstractSyntaxTree):
+    __slots__ = ("name", "args", "symbol")
+
+    def __init__(self, name, args, symbol=None):
+        self.name = name
+        self.args = args
+        self.symbol = symbol
+    
+    def __repr__(self) -> str:
+        return f"{self.name}({', '.join([str(arg) for arg in self.args])})"
+
+class Await(AbstractSyntaxTree):
+    __slots__ = ("keyword", "value")
+
+    def __init__(self, keyword, value):
+        self.keyword = keyword
+        self.value = value
+
+    def __repr__(self) -> str:
+        return f"await {self.value}"
+
+class Import(AbstractSyntaxTree):
+    __slots__ = ("keyword", "path", "resolved")
+
+    def __init__(self, keyword, path):
+        self.keyword = keyword
+        self.path = path # as written
+        self.resolved = None # the module's absolute path, worked out the first time the import runs
+
+    def __repr__(self) -> str:
+        return f"import {self.path!r}"
+
+class Return(AbstractSyntaxTree):
+    __slots__ = ("statement", "token")
+
+    def __init__(self, statement, token):
+        self.statement = statement
+        self.token = token
+
+    def __repr__(self) -> str:
+        return f"return {self.statement}"
+
+class Print(AbstractSyntaxTree):
+    __slots__ = ("expression",)
+
+    def __init__(self, expression):
+        self.expression = expression
+
+    def __repr__(self) -> str:
+        return f"print {self.expression}"
+
+class IfStatement(AbstractSyntaxTree):
+    __slots__ = ("condition", "block", "else_block")
+
+    def __init__(self, condition, block, else_block=None):
+        self.condition = condition
+        self.block = block
+        self.else_block = else_block
+
+    def __repr__(self):
+        return f"if ({self.condition}) | else {bool(self.else_block)}"
+
+class Logical(AbstractSyntaxTree):
+    __slots__ = ("left", "operator", "right")
+
+    def __init__(self, left, operator, right):
+        self.left = left
+        self.operator = operator
+        self.right = right
+
+    def __repr__(self) -> str:
+        return f"{self.left} OR {self.right}"
+
+class WhileStatement(AbstractSyntaxTree):
+    __slots__ = ("condition", "block", "increment")
+
+    def __init__(self, condition, block, increment=None):
+        self.condition = condition
+        self.block = block
+        self.increment = increment # the last part of a for loop, runs after every iteration
+
+    def __repr__(self):
+        return f"while ({self.condition}): {self.block}"
+    
+class ForRange(AbstractSyntaxTree):
+    """
+    a for loop the parser could tell is counting: `for (let i = a; i < b; i++)`
+    (or `i <= b`) where the body never assigns `i`. the engines keep the count
+    themselves instead of running the condition and the increment as expressions.
+    """
+    __slots__ = ("name", "start", "end", "inclusive", "block", "slot")
+
+    def __init__(self, name, start, end, inclusive, block):
+        self.name = name
+        self.start = start
+        self.end = end # evaluated before every iteration, like the condition it came from
+        self.inclusive = inclusive # `<=` rather than `<`
+        self.block = block
+        self.slot = None
+
+    def __repr__(self):
+        return f"for ({self.name.value} = {self.start}; {'<=' if self.inclusive else '<'} {self.end}): {self.block}"
+
+class ForEach(AbstractSyntaxTree):
+    __slots__ = ("name", "iterable", "block", "slot", "iterator_slot")
+
+    def __init__(self, name, iterable, block):
+        self.name = name
+        self.iterable = iterable
+        self.block = block
+        self.slot = None
+        self.iterator_slot = None # where the vm keeps the python iterator while the loop runs
+
+    def __repr__(self):
+        return f"for {self.name.value} in {self.iterable}: {self.block}"
+
+class Break(AbstractSyntaxTree):
+    __slots__ = ("token",)
+
+    def __init__(self, token):
+        self.token = token
+
+    def __repr__(self) -> str:
+        return "break"
+
+class Continue(AbstractSyntaxTree):
+    __slots__ = ("token",)
+
+    def __init__(self, token):
+        self.token = token
+
+    def __repr__(self) -> str:
+        return "continue"
+
+class ClassDecl(AbstractSyntaxTree):
+    __slots__ = ("name", "methods", "slot")
+
+    def __init__(self, name, methods) -> None:
+        self.name = name
+        self.methods = methods
+        self.slot = None
+
+    def __repr__(self) -> str:
+        return f"class '{self.name}' ({len(self.methods)} methods)"
+
+class GetProp(AbstractSyntaxTree):
+    __slots__ = ("object", "name", "cache")
+
+    def __init__(self, object, name) -> None:
+        self.object = object
+        self.name = name
+        self.cache = PropertyCache(name.token.value) # the shape last read from here, see function_obj.py
+
+    def __repr__(self) -> str:
+        return f"{self.object}.{self.name}"
+    
+class SetProp(AbstractSyntaxTree):
+    __slots__ = ("object", "name", "value", "cache")
+
+    def __init__(self, object, name, value) -> None:
+        self.object = object
+        self.name = name
+        self.value = value
+        self.cache = StoreCache(name.token.value) # the shape last written to from here, see function_obj.py
+
+class GetItem(AbstractSyntaxTree):
+    __slots__ = ("object", "index", "bracket")
+
+    def __init__(self, object, index, bracket) -> None:
+        self.object = object
+        self.index = index
+        self.bracket = bracket # the opening bracket, for errors
+
+    def __repr__(self) -> str:
+        return f"{self.object}[{self.index}]"
+
+class SetItem(AbstractSyntaxTree):
+    __slots__ = ("object", "index", "value", "bracket")
+
+    def __init__(self, object, index, value, bracket) -> None:
+        self.object = object
+        self.index = index
+        self.value = value
+        self.bracket = bracket
+
+class Self(AbstractSyntaxTree):
+    __slots__ = ("keyword", "depth", "slot")
+
+    def __init__(self, keyword) -> None:
+        self.keyword = keyword
+        self.depth = None
+        self.slot = None
+
+class BuiltinList(AbstractSyntaxTree):
+    __slots__ = ("items", "name")
+
+    def __init__(self, items, name) -> None:
+        self.items = items
+        self.name = name
+
+    def __str__(self) -> str:
+        return f"{[i for i in self.items]}"
\ No newline at end of file
@@ -0,0 +1,299 @@
+"""
+async functions, `await`, and the builtins that wait without blocking.
+
+calling an `async fn` doesn't run its body there and then: the call hands back a
+task, and the body runs on an asyncio event loop. `await task` waits for the task
+to finish and gives back its result, or raises its error. the builtins that wait
+on the outside world (`sleep`, `read_file`, `connect` and its connections'
+methods) hand back tasks too, so one program can be waiting on any number of
+them at once.
+
+the engines are plain recursive python, so a function can't be paused halfway
+through its body the way a python coroutine can. instead every task's body runs
+on a thread of its own (a fiber), and the event loop hands control to one fiber
+at a time: it runs the fiber until it awaits something, and waits for the fiber
+to hand control back before going on. so there's only ever one of them running
+language code, the engines don't need any locking, and tasks take turns in the
+order asyncio schedules them rather than whenever the os feels like it.
+
+the program itself isn't a fiber: an `await` at the top level runs the loop
+until the task it's waiting for is done. whatever tasks are still running when
+the program ends are waited for then.
+
+async functions are told apart by what sits in their `Function.memo` (see
+`AsyncCalls`), which already keeps calls off the engines' fast paths. none of
+this, asyncio and threading included, is loaded before a program makes its
+first task, so programs that don't use it run exactly as they did.
+"""
+from .error import Error, NativeError
+from .function_obj import Class, Instance, NativeMethod
+
+asyncio = None
+threading = None
+
+def load_asyncio():
+    global asyncio, threading
+    if asyncio is None:
+        import asyncio as module
+        import threading as threads
+        asyncio = module
+        threading = threads
+    return asyncio
+
+class Task():
+    """
+    a running async call, or something a builtin is waiting on.
+    """
+    __slots__ = ("name", "future")
+
+    def __init__(self, name, future):
+        self.name = name
+        self.future = future # the asyncio task doing the work
+
+    def __repr__(self):
+        return f"<task {self.name}>"
+
+class Fiber():
+    """
+    the thread an async call's body runs on, and the two semaphores that pass
+    control between it and the event loop.
+    """
+    __slots__ = ("runtime", "body", "resume", "suspended", "waiting", "outcome", "done", "result", "error")
+
+    def __init__(self, runtime, body):
+        self.runtime = runtime
+        self.body = body
+        self.resume = threading.Semaphore(0) # released when the fiber may run
+        self.suspended = threading.Semaphore(0) # released when it hands control back
+        self.waiting = None # the future the fiber is waiting on
+        self.outcome = (None, None) # what that future came to: (result, error)
+        self.done = False
+        self.result = None
+        self.error = None
+
+    async def drive(self):
+        """
+        the coroutine behind the fiber's task, run by the event loop.
+        """
+        threading.Thread(target=self.main, daemon=True).start()
+        while True:
+            self.resume.release()
+            self.suspended.acquire() # the loop stands still while the fiber runs
+            if self.done:
+                if self.error is not None:
+                    raise self.error
+                return self.result
+            try:
+                self.outcome = (await self.waiting, None)
+            except Exception as e:
+                self.outcome = (None, e)
+
+    def main(self):
+        self.resume.acquire()
+        self.runtime.local.fiber = self
+        try:
+            self.result = self.body()
+        except BaseException as e:
+            self.error = e
+        self.done = True
+        self.suspended.release()
+
+    def suspend(self, future):
+        """
+        hands control back to the event loop until the future is done.
+        """
+        self.waiting = future
+        self.suspended.release()
+        self.resume.acquire()
+        self.waiting = None
+        result, error = self.outcome
+        if error is not None:
+            raise error
+        return result
+
+class AsyncCalls():
+    """
+    stands in for an async function's memo: instead of running the body, every
+    call starts a task that will.
+    """
+    __slots__ = ("runtime", "name")
+
+    def __init__(self, runtime, name):
+        self.runtime = runtime
+        self.name = name
+
+    def call(self, invoke, interpreter, args):
+        return self.runtime.spawn(self.name, lambda: invoke(interpreter, args))
+
+class Connection(Instance):
+    """
+    a socket opened by `connect`. like lists, every connection shares one class.
+    """
+    __slots__ = ("runtime", "reader", "writer")
+
+    def __init__(self, runtime, reader, writer):
+        self.clss = connection_class
+        self.shape = connection_class.shape
+        self.values = []
+        self.runtime = runtime
+        self.reader = reader
+        self.writer = writer
+
+    def __repr__(self):
+        return "<connection>"
+
+    def send(self, text):
+        if type(text) is not str:
+            raise NativeError("send() takes a string.")
+        async def write():
+            try:
+                self.writer.write(text.encode())
+                await self.writer.drain()
+            except OSError as e:
+                raise NativeError(f"Couldn't send: {e.strerror or e}.") from None
+        return self.runtime.start("send", write())
+
+    def receive(self):
+        async def read():
+            try:
+                data = await self.reader.read(65536)
+            except OSError as e:
+                raise NativeError(f"Couldn't receive: {e.strerror or e}.") from None
+            return data.decode("utf-8", "replace") # "" once the other end has closed it
+        return self.runtime.start("receive", read())
+
+    def close(self):
+        async def close():
+            self.writer.close()
+            try:
+                await self.writer.wait_closed()
+            except OSError:
+                pass
+        return self.runtime.start("close", close())
+
+connection_class = Class(None, {
+    "send": NativeMethod("send", Connection.send, ("text",)),
+    "receive": NativeMethod("receive", Connection.receive),
+    "close": NativeMethod("close", Connection.close),
+})
+
+def read_text(path):
+    with open(path, encoding="utf-8") as f:
+        return f.read()
+
+class Runtime():
+    def __init__(self, interpreter):
+        self.interpreter = interpreter
+        self.loop = None # made along with the first task
+        self.local = None # .fiber is the fiber running on this thread, if any
+        self.unawaited = {} # tasks nobody has awaited yet, in the order they were made
+
+    def start(self, name, coroutine):
+        if self.loop is None:
+            self.loop = load_asyncio().new_event_loop()
+            self.local = threading.local()
+        task = Task(name, self.loop.create_task(coroutine))
+        self.unawaited[task] = None
+        return task
+
+    def spawn(self, name, body):
+        """
+        starts a task that runs a function's body on a fiber.
+        """
+        load_asyncio()
+        return self.start(name, Fiber(self, body).drive())
+
+    def wait(self, value, token):
+        """
+        what `await` does: waits for a task and returns its result.
+        """
+        if type(value) is not Task:
+            raise Error("Only tasks can be awaited.", token)
+        self.unawaited.pop(value, None)
+
+        interpreter = self.interpreter
+        # the tree walker's current frame and globals, which other tasks move while this one waits
+        environment = interpreter.environment
+        globals = interpreter.global_environment
+        fiber = getattr(self.local, "fiber", None)
+        try:
+            if fiber is None:
+                return self.loop.run_until_complete(value.future)
+            return fiber.suspend(value.future)
+        except NativeError as e:
+            raise Error(e.msg, token) from None
+        finally:
+            interpreter.environment = environment
+            interpreter.global_environment = globals
+
+    def finish(self):
+        """
+        runs the tasks still going when the program ends to completion, then
+        raises the first error from a task nobody awaited.
+        """
+        if self.loop is None:
+            return
+        while True:
+            pending = asyncio.all_tasks(self.loop)
+            if not pending:
+                break
+            self.loop.run_until_complete(asyncio.wait(pending))
+
+        unawaited, self.unawaited = self.unawaited, {}
+        for task in unawaited:
+            future = task.future
+            # a builtin's error has nowhere to point to, so it's dropped like any other unused result
+            if not future.cancelled() and future.exception() is not None and not isinstance(future.exception(), NativeError):
+                raise future.exception()
+
+    def cancel(self):
+        """
+        stops the tasks that are still going when an error ends the program.
+        a fiber that was waiting is left blocked on its thread, which is a daemon
+        and so doesn't keep the process alive.
+        """
+        if self.loop is None:
+            return
+        pending = asyncio.all_tasks(self.loop)
+        for future in pending:
+            future.cancel()
+        if pending:
+            self.loop.run_until_complete(asyncio.wait(pending))
+        self.unawaited = {}
+
+    # builtins
+
+    def sleep(self, seconds):
+        if type(seconds) not in (int, float):
+            raise NativeError("sleep() takes a number of seconds.")
+        return self.start("sleep", load_asyncio().sleep(seconds))
+
+    def read_file(self, path):
+        if type(path) is not str:
+            raise NativeError("read_file() takes a path.")
+        async def read():
+            try:
+                # files can't be read without blocking, so it happens on one of asyncio's threads
+                return await asyncio.get_running_loop().run_in_executor(None, read_text, path)
+            except OSError as e:
+                raise NativeError(f"Couldn't read '{path}': {e.strerror or e}.") from None
+        load_asyncio()
+        return self.start("read_file", read())
+
+    def connect(self, address):
+        """
+        connects to a port on this machine, or to a unix socket given its path.
+        """
+        if type(address) is not int and type(address) is not str:
+            raise NativeError("connect() takes a port number or the path of a unix socket.")
+        async def open():
+            try:
+                if type(address) is int:
+                    reader, writer = await asyncio.open_connection("127.0.0.1", address)
+                else:
+                    reader, writer = await asyncio.open_unix_connection(address)
+            except OSError as e:
+                raise NativeError(f"Couldn't connect to {address!r}: {e.strerror or e}.") from None
+            return Connection(self, reader, writer)
+        load_asyncio()
+        return self.start("connect", open())
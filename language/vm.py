@@ -0,0 +1,493 @@
+# pyright: reportShadowedImports=none
+from .bytecode import *
+from .function_obj import *
+from .error import Error, NativeError
+
+# how deep calls between compiled functions can go. they don't take up python's
+# stack, so without a limit a runaway recursion would only stop once memory ran out
+MAX_CALL_DEPTH = 10000
+
+class CompiledFunction(Function):
+    """
+    a function whose body has been compiled to bytecode.
+    frames are plain lists: slot 0 links to the parent frame, the rest hold locals.
+    """
+    __slots__ = ("prototype", "code", "arity_count")
+
+    def __init__(self, closure, prototype, globals, memo=None):
+        self.closure = closure
+        self.prototype = prototype
+        self.code = prototype.code
+        self.expr = prototype.expr
+        self.args = prototype.expr.args
+        self.arity_count = len(self.args)
+        self.globals = globals
+        self.memo = memo
+
+    def invoke(self, interpreter, args):
+        frame = [self.closure, *args]
+        frame.extend([None] * (self.code.size - len(frame)))
+        return interpreter.run(self.code, frame, self.globals)
+
+class VM():
+    """
+    stack-based virtual machine for the bytecode produced by `Compiler`.
+
+    calls between compiled functions don't recurse in python: the caller's state is
+    pushed onto `calls` and the dispatch loop carries on in the callee, up to
+    MAX_CALL_DEPTH calls deep. anything else that is callable (classes, builtins)
+    goes through its regular `call` method.
+    """
+    def __init__(self, interpreter):
+        self.interpreter = interpreter
+
+    def execute(self, code):
+        frame = [None] * code.size
+        return self.run(code, frame, self.interpreter.global_environment)
+
+    def run(self, code, frame, environment):
+        """
+        runs code with `environment` as its globals. a call to a function from
+        another module switches to that module's globals until it returns.
+        """
+        ops = code.ops
+        constants = code.constants
+        stack = []
+        push = stack.append
+        pop = stack.pop
+        calls = []
+        globals = environment.values
+        pc = 0
+
+        try:
+            while True:
+                op = ops[pc]
+                arg = ops[pc + 1]
+                pc += 2
+
+                # opcodes are grouped by range so that a dispatch costs a handful of
+                # comparisons instead of walking one long if/elif chain.
+                if op < 10:
+                    if op == LOAD_FAST:
+                        push(frame[arg])
+
+                    elif op == CONST:
+                        push(constants[arg])
+
+                    elif op == LOAD_GLOBAL:
+                        value = globals.get(constants[arg])
+                        if value is None:
+                            raise Error(f"Unkown name '{constants[arg]}'.", code.token_at(pc - 2))
+                        push(value)
+
+                    elif op == STORE_FAST:
+                        frame[arg] = pop()
+
+                    elif op == STORE_GLOBAL:
+                        globals[constants[arg]] = pop()
+
+                    elif op == POP:
+                        pop()
+
+                    elif op == LOAD_DEREF:
+                        target = frame
+                        for _ in range(arg & 0xffff):
+                            target = target[0]
+                        push(target[arg >> 16])
+
+                    else: # STORE_DEREF
+                        target = frame
+                        for _ in range(arg & 0xffff):
+                            target = target[0]
+                        target[arg >> 16] = pop()
+
+                elif op < 40:
+                    if op < ADD_CONST:
+                        right = pop()
+                    elif op < ADD_FAST_CONST:
+                        right = constants[arg]
+                        op -= CONST_OFFSET
+                    else:
+                        push(frame[arg & 0xffff])
+                        right = constants[arg >> 16]
+                        op -= FAST_CONST_OFFSET
+
+                    # arrays make operators fail with a NativeError, see arrays.py
+                    try:
+                        if op == ADD:
+                            stack[-1] = stack[-1] + right
+
+                        elif op == SUBTRACT:
+                            stack[-1] = stack[-1] - right
+
+                        elif op == LESS:
+                            stack[-1] = stack[-1] < right
+
+                        elif op == LESS_EQUAL:
+                            stack[-1] = stack[-1] <= right
+
+                        elif op == MULTIPLY:
+                            stack[-1] = stack[-1] * right
+
+                        elif op == DIVIDE:
+                            stack[-1] = stack[-1] / right
+
+                        elif op == GREATER:
+                            stack[-1] = stack[-1] > right
+
+                        elif op == GREATER_EQUAL:
+                            stack[-1] = stack[-1] >= right
+
+                        elif op == EQUAL:
+                            left = stack[-1]
+                            stack[-1] = right is None if left is None else left == right
+
+                        else: # NOT_EQUAL
+                            left = stack[-1]
+                            stack[-1] = right is not None if left is None else left != right
+                    except NativeError as e:
+                        raise Error(e.msg, code.token_at(pc - 2)) from None
+
+                elif op < 50:
+                    if op == JUMP_IF_FALSE:
+                        value = pop()
+                        if value is None or value is False:
+                            pc = arg
+
+                    elif op == JUMP_IF_TRUE:
+                        value = pop()
+                        if not (value is None or value is False):
+                            pc = arg
+
+                    elif op == JUMP:
+                        pc = arg
+
+                    elif op == CALL:
+                        function = stack[-arg - 1]
+
+                        # profiled and async functions take the regular path below, through what wraps them
+                        if type(function) is CompiledFunction and (function.memo is None or type(function.memo) is Memo):
+                            if arg != function.arity_count:
+                                raise Error(f"Wanted {function.arity_count} argument(s), got {arg} instead.", code.token_at(pc - 2))
+                            # a memo is looked up here and filled in by RETURN, so memoized
+                            # calls don't recurse in python either
+                            memo = function.memo
+                            key = None
+                            value = missing
+                            if memo is not None:
+                                key = memo.key(stack[len(stack) - arg:])
+                                if key is not None:
+                                    value = memo.lookup(key)
+
+                            if value is not missing:
+                                del stack[-arg - 1:]
+                                push(value)
+                            else:
+                                if len(calls) == MAX_CALL_DEPTH:
+                                    raise Error(f"Too many nested calls (more than {MAX_CALL_DEPTH}).", code.token_at(pc - 2))
+                                calls.append((code, pc, frame, environment, memo, key))
+                                # the callee and its arguments are already laid out like a frame,
+                                # the callee just needs to be swapped for the parent link.
+                                frame = stack[-arg - 1:]
+                                del stack[-arg - 1:]
+                                frame[0] = function.closure
+                                if function.globals is not environment:
+                                    environment = function.globals
+                                    globals = environment.values
+                                code = function.code
+                                if code.size > arg + 1:
+                                    frame.extend([None] * (code.size - arg - 1))
+                                ops = code.ops
+                                constants = code.constants
+                                pc = 0
+
+                        elif isinstance(function, Callable):
+                            if arg != function.arity():
+                                raise Error(f"Wanted {function.arity()} argument(s), got {arg} instead.", code.token_at(pc - 2))
+                            args = stack[-arg:] if arg else []
+                            del stack[-arg - 1:]
+                            try:
+                                push(function.call(self, args))
+                            except NativeError as e:
+                                raise Error(e.msg, code.token_at(pc - 2)) from None
+                            except RecursionError: # profiled functions recurse in python
+                                raise Error("Too many nested calls.", code.token_at(pc - 2)) from None
+
+                        else:
+                            raise Error("Only functions are callable.", code.token_at(pc - 2))
+
+                    elif op == CALL_METHOD:
+                        function = stack[-arg - 2]
+                        instance = stack[-arg - 1]
+
+                        if instance is None: # a field, called like any other value
+                            if not isinstance(function, Callable):
+                                raise Error("Only functions are callable.", code.token_at(pc - 2))
+                            if arg != function.arity():
+                                raise Error(f"Wanted {function.arity()} argument(s), got {arg} instead.", code.token_at(pc - 2))
+                            args = stack[-arg:] if arg else []
+                            del stack[-arg - 2:]
+                            try:
+                                push(function.call(self, args))
+                            except NativeError as e:
+                                raise Error(e.msg, code.token_at(pc - 2)) from None
+                            except RecursionError: # profiled functions recurse in python
+                                raise Error("Too many nested calls.", code.token_at(pc - 2)) from None
+
+                        elif type(function) is CompiledFunction and function.memo is None:
+                            if arg != function.arity_count:
+                                raise Error(f"Wanted {function.arity_count} argument(s), got {arg} instead.", code.token_at(pc - 2))
+                            if len(calls) == MAX_CALL_DEPTH:
+                                raise Error(f"Too many nested calls (more than {MAX_CALL_DEPTH}).", code.token_at(pc - 2))
+                            calls.append((code, pc, frame, environment, None, None))
+                            # same as CALL, with self already sitting in the slot before the arguments
+                            frame = stack[-arg - 2:]
+                            del stack[-arg - 2:]
+                            frame[0] = function.closure
+                            if function.globals is not environment:
+                                environment = function.globals
+                                globals = environment.values
+                            code = function.code
+                            if code.size > arg + 2:
+                                frame.extend([None] * (code.size - arg - 2))
+                            ops = code.ops
+                            constants = code.constants
+                            pc = 0
+
+                        else:
+                            if arg != function.arity():
+                                raise Error(f"Wanted {function.arity()} argument(s), got {arg} instead.", code.token_at(pc - 2))
+                            args = stack[-arg:] if arg else []
+                            del stack[-arg - 2:]
+                            try:
+                                push(function.call_method(self, instance, args))
+                            except NativeError as e:
+                                raise Error(e.msg, code.token_at(pc - 2)) from None
+                            except RecursionError:
+                                raise Error("Too many nested calls.", code.token_at(pc - 2)) from None
+
+                    elif op == LOAD_METHOD:
+                        obj = stack[-1]
+                        if not isinstance(obj, Instance):
+                            raise Error("Only instances have properties.", code.token_at(pc - 2))
+                        cache = constants[arg]
+                        if obj.shape is not cache.shape:
+                            cache.lookup(obj)
+                        if cache.method is not None:
+                            stack[-1] = cache.method
+                            push(obj)
+                        else:
+                            index = cache.index
+                            value = None if index is None else obj.values[index]
+                            if value is None:
+                                raise Error(f"Unkown property '{cache.name}'", code.token_at(pc - 2))
+                            stack[-1] = value
+                            push(None)
+
+                    elif op == RETURN or op == RETURN_NONE:
+                        value = pop() if op == RETURN else None
+                        if not calls:
+                            return value
+                        code, pc, frame, environment, memo, key = calls.pop()
+                        if key is not None:
+                            memo.store(key, value)
+                        globals = environment.values
+                        ops = code.ops
+                        constants = code.constants
+                        push(value)
+
+                    elif op == JUMP_IF_FALSE_OR_POP:
+                        value = stack[-1]
+                        if value is None or value is False:
+                            pc = arg
+                        else:
+                            pop()
+
+                    else: # JUMP_IF_TRUE_OR_POP
+                        value = stack[-1]
+                        if value is None or value is False:
+                            pop()
+                        else:
+                            pc = arg
+
+                elif op >= FOR_RANGE_LESS:
+                    if op == FOR_ITER:
+                        try:
+                            value = next(frame[arg >> 32 & 0xffffffff], missing)
+                        except NativeError as e: # a stream closed in the middle of the loop
+                            raise Error(e.msg, code.token_at(pc - 2)) from None
+                        if value is not missing:
+                            frame[arg & 0xffffffff] = value
+                            pc = arg >> 64
+
+                    elif op == GET_ITER:
+                        try:
+                            iterator = iterate(pop())
+                        except NativeError as e: # a stream that's been closed
+                            raise Error(e.msg, code.token_at(pc - 2)) from None
+                        if iterator is None:
+                            raise Error("Only lists, arrays and strings can be looped over.", code.token_at(pc - 2))
+                        frame[arg] = iterator
+
+                    else:
+                        slot = arg & 0xffff
+                        value = frame[slot] + 1
+                        frame[slot] = value
+                        bound = constants[arg >> 16 & 0xffff]
+                        if value < bound if op == FOR_RANGE_LESS else value <= bound:
+                            pc = arg >> 32
+
+                elif op >= GREATER_CONST_JUMP_IF_FALSE:
+                    if op >= GREATER_FAST_CONST_JUMP_IF_FALSE:
+                        left = frame[arg & 0xffff]
+                        right = constants[arg >> 16 & 0xffff]
+                        target = arg >> 32
+                    else:
+                        left = pop()
+                        right = constants[arg & 0xffff]
+                        target = arg >> 16
+
+                    kind = op % 10 + GREATER
+                    try:
+                        if kind == LESS:
+                            result = left < right
+                        elif kind == LESS_EQUAL:
+                            result = left <= right
+                        elif kind == GREATER:
+                            result = left > right
+                        elif kind == GREATER_EQUAL:
+                            result = left >= right
+                        elif kind == EQUAL:
+                            result = right is None if left is None else left == right
+                        else:
+                            result = right is not None if left is None else left != right
+                    except NativeError as e:
+                        raise Error(e.msg, code.token_at(pc - 2)) from None
+
+                    # the jump-if-false variants sit in the odd decades (70s and 90s)
+                    if (result is None or result is False) == (op // 10 % 2 == 1):
+                        pc = target
+
+                elif op >= POSITIVE:
+                    if op == NOT:
+                        value = stack[-1]
+                        stack[-1] = value is None or value is False
+
+                    elif op == AWAIT:
+                        stack[-1] = self.interpreter.runtime.wait(stack[-1], code.token_at(pc - 2))
+
+                    elif op == NEGATE:
+                        try:
+                            stack[-1] = -stack[-1]
+                        except NativeError as e:
+                            raise Error(e.msg, code.token_at(pc - 2)) from None
+
+                    elif op == IMPORT:
+                        self.interpreter.modules.load(constants[arg])
+
+                    else: # POSITIVE
+                        stack[-1] = +stack[-1]
+
+                elif op == GET_PROP:
+                    obj = pop()
+                    if not isinstance(obj, Instance):
+                        raise Error("Only instances have properties.", code.token_at(pc - 2))
+                    cache = constants[arg]
+                    if obj.shape is not cache.shape:
+                        cache.lookup(obj)
+                    if cache.method is not None:
+                        push(cache.method.bind(obj))
+                    else:
+                        index = cache.index
+                        value = None if index is None else obj.values[index]
+                        if value is None:
+                            raise Error(f"Unkown property '{cache.name}'", code.token_at(pc - 2))
+                        push(value)
+
+                elif op == SET_PROP:
+                    value = pop()
+                    obj = pop()
+                    if not isinstance(obj, Instance):
+                        raise Error("Only instances have fields.", code.token_at(pc - 2))
+                    cache = constants[arg]
+                    if obj.shape is not cache.shape:
+                        cache.store(obj, value)
+                    elif cache.next is None:
+                        obj.values[cache.index] = value
+                    else:
+                        obj.shape = cache.next
+                        obj.values.append(value)
+
+                elif op == GET_ITEM:
+                    index = pop()
+                    obj = stack[-1]
+                    if type(obj) is List:
+                        if type(index) is not int:
+                            raise Error("List indices must be integers.", code.token_at(pc - 2))
+                        try:
+                            stack[-1] = obj.items[index]
+                        except IndexError:
+                            raise Error("List index out of range.", code.token_at(pc - 2)) from None
+                    else:
+                        get_item = getattr(type(obj), "get_item", None)
+                        if get_item is None:
+                            raise Error("Only lists, arrays and bytes can be indexed.", code.token_at(pc - 2))
+                        try:
+                            stack[-1] = get_item(obj, index)
+                        except NativeError as e:
+                            raise Error(e.msg, code.token_at(pc - 2)) from None
+
+                elif op == SET_ITEM:
+                    value = pop()
+                    index = pop()
+                    obj = pop()
+                    if type(obj) is List:
+                        if type(index) is not int:
+                            raise Error("List indices must be integers.", code.token_at(pc - 2))
+                        try:
+                            obj.items[index] = value
+                        except IndexError:
+                            raise Error("List index out of range.", code.token_at(pc - 2)) from None
+                    else:
+                        set_item = getattr(type(obj), "set_item", None)
+                        if set_item is None:
+                            raise Error("Only lists, arrays and bytes can be indexed.", code.token_at(pc - 2))
+                        try:
+                            set_item(obj, index, value)
+                        except NativeError as e:
+                            raise Error(e.msg, code.token_at(pc - 2)) from None
+
+                elif op == PUSH_FRAME:
+                    frame = [frame] + [None] * arg
+
+                elif op == POP_FRAME:
+                    frame = frame[0]
+
+                elif op == MAKE_FUNCTION:
+                    prototype = constants[arg]
+                    push(CompiledFunction(frame, prototype, environment, self.interpreter.calls_for(prototype.expr)))
+
+                elif op == MAKE_CLASS:
+                    prototype = constants[arg]
+                    methods = {}
+                    for method in prototype.methods:
+                        methods[method.expr.name.token.value] = CompiledFunction(frame, method, environment, self.interpreter.calls_for(method.expr, prototype.expr))
+                    push(Class(prototype.expr, methods))
+
+                elif op == BUILD_LIST:
+                    items = stack[len(stack) - arg:]
+                    del stack[len(stack) - arg:]
+                    push(List(items))
+
+                elif op == PRINT:
+                    if arg:
+                        self.interpreter.output.print(pop())
+                    else:
+                        self.interpreter.output.line()
+
+                else:
+                    raise Exception(f"unknown opcode {op} at {pc - 2} in {code}")
+        except Error as e:
+            # the globals of the function that was running are those of the module it's from
+            e.happened_in(environment.filename)
+            raise
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# the tests use the interpreter as the `language` package, straight from the repository
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
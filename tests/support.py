@@ -0,0 +1,68 @@
+"""
+running programs from the tests.
+"""
+import contextlib
+import io
+import os
+import re
+from language.main import Interpreter, engines
+from language.parser import Parser
+from language.semantic_analyzer import SemanticAnalyzer
+from language.syntax_tree import AbstractSyntaxTree, Variable
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PROGRAMS = os.path.join(ROOT, "tests", "programs")
+
+colours = re.compile("\x1b\\[[0-9;]*m")
+
+def run(source, engine="tree", optimize=False, filename=None, **options):
+    """
+    everything a program prints, errors included (without their colours). it's
+    run like `./run` runs a file, or like the shell runs a line if there's no
+    filename, but never with the on-disk cache.
+    """
+    interpreter = Interpreter(engine, use_cache=False, optimize=optimize, **options)
+    interpreter.is_shell = filename is None
+    interpreter.filename = filename
+    stdout = io.StringIO()
+    with contextlib.redirect_stdout(stdout):
+        interpreter.run(source)
+    return colours.sub("", stdout.getvalue())
+
+def run_file(path, engine="tree", optimize=False, **options):
+    with open(path) as f:
+        return run(f.read(), engine, optimize, path, **options)
+
+def configurations():
+    """
+    every engine, with and without -O.
+    """
+    return [(engine, optimize) for engine in engines for optimize in (False, True)]
+
+def resolve(source):
+    """
+    the parsed and resolved tree of a program.
+    """
+    parser = Parser()
+    parser.setup(source)
+    tree = parser.parse()
+    SemanticAnalyzer().resolve_program(tree)
+    return tree
+
+def nodes(node):
+    """
+    every node of a tree, parents before their children.
+    """
+    yield node
+    for kind in type(node).__mro__:
+        for name in getattr(kind, "__slots__", ()):
+            value = getattr(node, name, None)
+            for child in value if type(value) is list else [value]:
+                if isinstance(child, AbstractSyntaxTree):
+                    yield from nodes(child)
+
+def variables(tree, name):
+    """
+    the nodes that read the variable `name`, in the order they're in the source.
+    """
+    return [node for node in nodes(tree) if type(node) is Variable and node.token.value == name]
@@ -0,0 +1,76 @@
+"""
+numeric arrays. they need numpy, so these are skipped without it.
+"""
+import pytest
+from support import configurations, run
+
+pytest.importorskip("numpy")
+
+@pytest.mark.parametrize("engine, optimize", configurations())
+def test_arithmetic_and_builtins(engine, optimize):
+    source = """let xs = array([1, 2, 3, 4]);
+print xs * 2 + 1;
+print 10 - xs;
+print xs > 2;
+print xs + [10, 20, 30, 40];
+print sum(xs) + mean(xs);
+print min(xs) + max([5, 7]);
+print dot(xs, xs);
+print sqrt(array([4, 9]));
+print abs(-3);
+print range(0, 4) == xs - 1;
+print xs[0] + xs[3];
+print xs.length();
+print xs.to_list();
+let total = 0;
+for x in xs:
+  total = total + x;
+end;
+print total;
+"""
+    assert run(source, engine, optimize) == "[3, 5, 7, 9]\n[9, 8, 7, 6]\n[False, False, True, True]\n[11, 22, 33, 44]\n12.5\n8\n30\n[2.0, 3.0]\n3\n[True, True, True, True]\n5\n4\n[1, 2, 3, 4]\n10\n"
+
+@pytest.mark.parametrize("engine, optimize", configurations())
+def test_storing_a_float_makes_an_array_of_floats(engine, optimize):
+    source = "let ys = array([1, 2, 3]);\nys[1] = 5.5;\nprint ys;\nlet flags = array([true, false]);\nflags[1] = 2;\nprint flags;\nys[0] = true;\nprint ys;"
+    assert run(source, engine, optimize) == "[1.0, 5.5, 3.0]\n[1, 2]\n[1.0, 5.5, 3.0]\n"
+
+@pytest.mark.parametrize("engine, optimize", configurations())
+def test_map(engine, optimize):
+    source = """fn square(x):
+  return x * x;
+end;
+fn name(x):
+  return "n";
+end;
+print map(square, array([1, 2, 3]));
+print map(square, array([0.5]));
+print map(square, [1, 2]);
+print map(name, [1, 2]);
+print map(sqrt, array([1, 4]));
+print map(square, array([]));
+"""
+    assert run(source, engine, optimize) == "[1, 4, 9]\n[0.25]\n[1, 4]\n['n', 'n']\n[1.0, 2.0]\n[]\n"
+
+@pytest.mark.parametrize("engine, optimize", configurations())
+@pytest.mark.parametrize("source, message", [
+    ("let xs = range(0, 3);\nprint xs + range(0, 4);", "Arrays of different lengths (3 and 4) can't be combined."),
+    ('let xs = range(0, 3);\nprint xs + "a";', "Arrays can only be combined with numbers, lists of numbers and other arrays."),
+    ('let xs = range(0, 3);\nprint "a" * xs;', "Arrays can only be combined with numbers, lists of numbers and other arrays."),
+    ('let xs = range(0, 3);\nif (xs < "a"): print 1; fi;', "Arrays can only be combined with numbers, lists of numbers and other arrays."),
+    ("let xs = range(0, 3);\nprint xs == [1, 2];", "Arrays of different lengths (3 and 2) can't be combined."),
+    ("let xs = array([true]);\nprint -xs;", "Arrays of booleans can't be negated."),
+    ("let xs = array([1, 2]);\nprint xs + 100000000000000000000000000;", "Number too large for an array."),
+    ("let xs = array([1, 2]);\nprint 100000000000000000000000000 * xs;", "Number too large for an array."),
+    ("let xs = range(0, 3);\nxs[3] = 1.5;", "Array index out of range."),
+    ('let xs = range(0, 3);\nxs[0] = "a";', "Arrays can only hold numbers."),
+    ('let xs = array([[1, 2], [3]]);', "Arrays can only hold numbers."),
+    ("let xs = range(0, 3);\nprint map(xs, xs);", "map() needs a function that takes one argument."),
+    ("fn f(x):\n  return [x];\nend;\nprint map(f, range(0, 3));", "map() over an array needs a function that gives back numbers."),
+    ("print map(sqrt, 3);", "map() takes a function and a list or an array."),
+])
+def test_errors(engine, optimize, source, message):
+    output = run(source, engine, optimize)
+    assert output == run(source)
+    assert output.startswith("Error at line ")
+    assert output.splitlines()[-1] == message
@@ -0,0 +1,84 @@
+"""
+the `--bench` runner: timing, the summary, and catching regressions against a baseline.
+"""
+import json
+import os
+import subprocess
+import sys
+import pytest
+from language import benchmark
+from language.main import Interpreter
+from support import ROOT
+
+CONFIG = {"version": "test", "engine": "tree", "optimize": False, "memo_size": 1024}
+
+@pytest.fixture
+def workload(tmp_path):
+    path = tmp_path / "small.language"
+    path.write_text("let total = 0;\nfor (let i = 0; i < 100; i++):\n  total = total + i;\nend;\nprint total;\n")
+    return str(path)
+
+def make_interpreter():
+    return Interpreter("tree", False)
+
+def test_percentiles():
+    times = [1.0, 2.0, 3.0, 4.0, 5.0]
+    assert benchmark.percentile(times, 0.5) == 3.0
+    assert benchmark.percentile(times, 0.9) == pytest.approx(4.6)
+    assert benchmark.percentile([7.0], 0.99) == 7.0
+    summary = benchmark.summarize([3.0, 1.0, 2.0])
+    assert (summary["min"], summary["median"], summary["max"], summary["times"]) == (1.0, 2.0, 3.0, [1.0, 2.0, 3.0])
+
+def test_the_suite_is_every_script_in_it():
+    files = benchmark.suite_files()
+    assert files and all(path.endswith(".language") and os.path.exists(path) for path in files)
+    assert benchmark.suite_files(["a.language"]) == ["a.language"]
+
+def test_run_suite(workload, capsys):
+    results = benchmark.run_suite(make_interpreter, CONFIG, [workload], runs=3)
+    assert results["runs"] == 3 and results["engine"] == "tree"
+    assert len(results["workloads"]["small"]["times"]) == 3 # the warm-up isn't counted
+    assert capsys.readouterr().out.startswith("small ")
+
+def test_a_failing_workload_stops_the_run(tmp_path):
+    path = tmp_path / "broken.language"
+    path.write_text("print missing;\n")
+    with pytest.raises(RuntimeError, match="broken.language failed"):
+        benchmark.run_suite(make_interpreter, CONFIG, [str(path)], runs=1)
+
+def result(**medians):
+    return {**CONFIG, "workloads": {name: {"median": median} for name, median in medians.items()}}
+
+def test_compare(capsys):
+    regressions = benchmark.compare(result(a=1.2, b=1.05, c=0.5, d=1.0), result(a=1.0, b=1.0, c=1.0), 0.1)
+    assert regressions == ["a"]
+    output = capsys.readouterr().out
+    assert "+20.0%  regressed (threshold 10%)" in output
+    assert "d                not in the baseline" in output
+
+def test_compare_warns_about_a_different_configuration(capsys):
+    benchmark.compare(result(a=1.0), {**result(a=1.0), "engine": "vm"}, 0.1)
+    assert "a different engine" in capsys.readouterr().out
+
+def test_main_saves_and_fails_on_regressions(workload, tmp_path):
+    saved = tmp_path / "results.json"
+    assert benchmark.main(make_interpreter, CONFIG, [workload], runs=1, save=str(saved)) == 0
+    baseline = json.loads(saved.read_text())
+    assert list(baseline["workloads"]) == ["small"]
+
+    baseline["workloads"]["small"]["median"] /= 100
+    (tmp_path / "fast.json").write_text(json.dumps(baseline))
+    assert benchmark.main(make_interpreter, CONFIG, [workload], runs=1, baseline=str(tmp_path / "fast.json")) == 1
+    baseline["workloads"]["small"]["median"] *= 10000
+    (tmp_path / "slow.json").write_text(json.dumps(baseline))
+    assert benchmark.main(make_interpreter, CONFIG, [workload], runs=1, baseline=str(tmp_path / "slow.json")) == 0
+
+def test_command_line(workload, tmp_path):
+    saved = tmp_path / "results.json"
+    command = [sys.executable, "-m", "language", "--bench", "--runs=1", f"--save={saved}", "--engine=vm", workload]
+    finished = subprocess.run(command, cwd=ROOT, capture_output=True, text=True)
+    assert finished.returncode == 0, finished.stdout
+    assert json.loads(saved.read_text())["engine"] == "vm"
+
+    finished = subprocess.run([sys.executable, "-m", "language", "--bench", "--runs=0", workload], cwd=ROOT, capture_output=True, text=True)
+    assert finished.returncode == 1 and "--runs expects a number of runs" in finished.stdout
@@ -0,0 +1,103 @@
+"""
+the on-disk cache of parsed and compiled programs.
+"""
+import contextlib
+import io
+import os
+import pickle
+import zlib
+import pytest
+from language import cache
+from language.main import Interpreter, _version
+from support import colours, configurations
+
+SOURCE = "fn twice(x):\n  return x * 2;\nend;\nprint twice(21);\n"
+
+def run_cached(path, engine="tree", optimize=False):
+    interpreter = Interpreter(engine, optimize=optimize)
+    interpreter.is_shell = False
+    interpreter.filename = str(path)
+    stdout = io.StringIO()
+    with contextlib.redirect_stdout(stdout):
+        with open(path) as f:
+            interpreter.run(f.read())
+    return colours.sub("", stdout.getvalue())
+
+@pytest.fixture
+def script(tmp_path):
+    path = tmp_path / "script.language"
+    path.write_text(SOURCE)
+    return path
+
+@pytest.mark.parametrize("engine, optimize", configurations())
+def test_a_warm_start_runs_the_cached_program(script, engine, optimize):
+    assert run_cached(script, engine, optimize) == "42\n"
+    kind = ("bytecode" if engine == "vm" else "tree") + ("-O" if optimize else "")
+    assert cache.ProgramCache(_version).load(str(script), SOURCE, kind) is not None
+    assert run_cached(script, engine, optimize) == "42\n"
+
+def test_load_gives_back_what_was_stored(script):
+    programs = cache.ProgramCache(_version)
+    programs.store(str(script), SOURCE, "tree", ["a", 1, 2.5, True])
+    assert programs.load(str(script), SOURCE, "tree") == ["a", 1, 2.5, True]
+
+def test_changes_make_entries_stale(script):
+    programs = cache.ProgramCache(_version)
+    programs.store(str(script), SOURCE, "tree", [1])
+    assert programs.load(str(script), SOURCE + "print 1;\n", "tree") is None
+    assert programs.load(str(script), SOURCE, "tree-O") is None
+    assert cache.ProgramCache(_version + "-next").load(str(script), SOURCE, "tree") is None
+
+def test_editing_the_script_is_picked_up(script):
+    assert run_cached(script) == "42\n"
+    script.write_text(SOURCE.replace("21", "50"))
+    assert run_cached(script) == "100\n"
+
+def test_broken_entries_are_misses(script):
+    programs = cache.ProgramCache(_version)
+    path = programs.path(str(script), "tree")
+    programs.store(str(script), SOURCE, "tree", [1])
+    with open(path, "r+b") as f:
+        f.truncate(len(cache.MAGIC) + cache.KEY_SIZE + 3)
+    assert programs.load(str(script), SOURCE, "tree") is None
+    assert run_cached(script) == "42\n" # and the entry is written again
+
+class Exploit():
+    def __reduce__(self):
+        return (os.mkdir, (self.path,))
+
+def plant(programs, script, kind, value):
+    path = programs.path(str(script), kind)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(cache.MAGIC + programs.key(SOURCE, kind) + zlib.compress(pickle.dumps(value)))
+    return path
+
+def test_only_program_classes_are_unpickled(script, tmp_path):
+    programs = cache.ProgramCache(_version)
+    exploit = Exploit()
+    exploit.path = str(tmp_path / "pwned")
+    plant(programs, script, "tree", [exploit])
+    assert programs.load(str(script), SOURCE, "tree") is None
+    assert not os.path.exists(exploit.path)
+    assert run_cached(script) == "42\n"
+    assert not os.path.exists(exploit.path)
+
+@pytest.mark.skipif(not hasattr(os, "getuid"), reason="no file modes")
+def test_entries_others_can_write_to_are_ignored(script):
+    programs = cache.ProgramCache(_version)
+    path = plant(programs, script, "tree", [1])
+    os.chmod(path, 0o664)
+    assert programs.load(str(script), SOURCE, "tree") is None
+    os.chmod(path, 0o644)
+    assert programs.load(str(script), SOURCE, "tree") == [1]
+
+@pytest.mark.skipif(not hasattr(os, "getuid"), reason="no file modes")
+def test_entries_are_written_for_their_owner_only(script):
+    old = os.umask(0o002)
+    try:
+        assert run_cached(script) == "42\n"
+    finally:
+        os.umask(old)
+    for name in os.listdir(script.parent / "__pycache__"):
+        assert not os.stat(script.parent / "__pycache__" / name).st_mode & 0o022
@@ -0,0 +1,46 @@
+"""
+the closure engine: every node is compiled to a python closure once, with its
+operator picked while compiling, and has to behave like the tree walker.
+"""
+import pytest
+from language.closure_compiler import ClosureFunction
+from language.main import Interpreter
+from support import run
+
+operands = ["1", "2.5", "-3", '"ab"', "true", "false"]
+operators = ["+", "-", "*", "/", "<", "<=", ">", ">=", "==", "!=", "and", "or"]
+
+def pairs(operator):
+    """
+    the programs applying `operator` to every pair of operands it works on.
+    """
+    for left in operands:
+        for right in operands:
+            source = f"print {left} {operator} {right};"
+            try:
+                run(source)
+            except (TypeError, ZeroDivisionError): # "ab" - 1 and 1 / 0 aren't errors of the language yet
+                continue
+            yield source
+
+@pytest.mark.parametrize("operator", operators)
+def test_operators_match_the_tree_walker(operator):
+    for source in pairs(operator):
+        assert run(source, "closure") == run(source), source
+
+@pytest.mark.parametrize("source", ["print -(2 * 3);", "print -2.5;", "print !true;", "print !false;", "print !0;"])
+def test_unary_operators_match_the_tree_walker(source):
+    assert run(source, "closure") == run(source)
+
+def test_function_bodies_are_compiled_once():
+    interpreter = Interpreter("closure", use_cache=False, memo_size=0)
+    interpreter.run("fn make(n):\n  fn get():\n    return n;\n  end;\n  return get;\nend;\nlet a = make(1);\nlet b = make(2);")
+    a = interpreter.global_environment.values["a"]
+    b = interpreter.global_environment.values["b"]
+    assert type(a) is ClosureFunction and type(b) is ClosureFunction
+    assert a.body is b.body # the same compiled body, closing over different frames
+    assert a.closure is not b.closure
+
+def test_state_survives_between_calls():
+    source = "fn counter():\n  let n = 0;\n  fn inc():\n    n = n + 1;\n    return n;\n  end;\n  return inc;\nend;\nlet c = counter();\nc();\nc();\nprint c();"
+    assert run(source, "closure") == "3\n"
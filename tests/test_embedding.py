@@ -0,0 +1,136 @@
+"""
+the embedding api: compiling and running programs from python, on every engine,
+and importing the package without getting in the host's way.
+"""
+import io
+import os
+import subprocess
+import sys
+import pytest
+import language
+from language import embedding
+from language.function_obj import List
+from support import ROOT
+
+engines = ["tree", "vm", "closure"]
+
+@pytest.fixture(autouse=True)
+def fresh(monkeypatch):
+    # builtins registered by one test don't reach the next one's interpreters
+    monkeypatch.setattr(embedding, "interpreters", {})
+    monkeypatch.setattr(embedding, "host_builtins", {})
+
+@pytest.mark.parametrize("engine", engines)
+def test_runs_hand_back_their_globals(engine):
+    program = language.compile("let y = x * 2;\nprint y;\nfn f():\n  return y;\nend;", engine)
+    stdout = io.StringIO()
+    result = program.run(globals={"x": 21}, stdout=stdout)
+    assert stdout.getvalue() == "42\n"
+    assert result["x"] == 21 and result["y"] == 42
+    assert set(result) == {"x", "y", "f"}
+
+@pytest.mark.parametrize("engine", engines)
+def test_runs_don_t_see_each_other(engine):
+    program = language.compile("if (x == 1):\n  leftover = 1;\nfi;\nprint x;", engine)
+    stdout = io.StringIO()
+    assert "leftover" in program.run(globals={"x": 1}, stdout=stdout)
+    assert "leftover" not in program.run(globals={"x": 2}, stdout=stdout)
+    assert stdout.getvalue() == "1\n2\n"
+
+@pytest.mark.parametrize("engine", engines)
+def test_python_values_become_the_language_s(engine):
+    calls = []
+    def record(value):
+        calls.append(value)
+        return value + 1
+    program = language.compile("names.push(\"c\");\nprint names;\nprint record(1);", engine)
+    stdout = io.StringIO()
+    result = program.run(globals={"names": ["a", "b"], "record": record}, stdout=stdout)
+    assert stdout.getvalue() == "['a', 'b', 'c']\n2\n"
+    assert type(result["names"]) is List and calls == [1]
+
+@pytest.mark.parametrize("engine", engines)
+def test_registered_builtins(engine):
+    table = {"a": 1}
+    def lookup(key):
+        if key not in table:
+            raise language.NativeError(f"No entry for '{key}'.")
+        return table[key]
+    language.register("lookup", lookup)
+    program = language.compile('print lookup("a");\nprint lookup("b");', engine)
+    stdout = io.StringIO()
+    with pytest.raises(language.Error) as error:
+        program.run(stdout=stdout)
+    assert stdout.getvalue() == "1\n"
+    assert (error.value.msg, error.value.line) == ("No entry for 'b'.", 2)
+
+@pytest.mark.parametrize("engine", engines)
+def test_errors_are_raised(engine):
+    with pytest.raises(language.Error) as error:
+        language.compile("let = 1;", engine)
+    assert error.value.line == 1
+    program = language.compile("let a = 1;\nprint a + missing;", engine)
+    with pytest.raises(language.Error) as error:
+        program.run(stdout=io.StringIO())
+    assert (error.value.msg, error.value.line, error.value.column) == ("Unkown name 'missing'.", 2, 17)
+
+def test_the_closure_engine_compiles_once(monkeypatch):
+    program = language.compile("fn fib(n):\n  if (n < 2):\n    return n;\n  fi;\n  return fib(n - 1) + fib(n - 2);\nend;\nprint fib(20);", "closure")
+    interpreter = program.interpreter
+    def compile(tree):
+        raise AssertionError("compiled again")
+    monkeypatch.setattr(interpreter.closure_compiler, "compile", compile)
+    for _ in range(2):
+        stdout = io.StringIO()
+        program.run(stdout=stdout)
+        assert stdout.getvalue() == "6765\n"
+        # every run starts with an empty memo
+        [memo] = interpreter.memos.values()
+        assert (memo.hits, memo.misses) == (18, 21)
+
+def test_an_interpreter_of_its_own():
+    interpreter = language.Interpreter("vm")
+    program = language.compile("print 1;", interpreter=interpreter)
+    assert program.interpreter is interpreter is not embedding.interpreters.get("vm")
+    stdout = io.StringIO()
+    program.run(stdout=stdout)
+    assert stdout.getvalue() == "1\n"
+
+def test_unknown_engines():
+    with pytest.raises(ValueError):
+        language.compile("print 1;", "jit")
+
+def python(code, cwd):
+    return subprocess.run([sys.executable, "-c", code], cwd=cwd, capture_output=True, text=True,
+        env={**os.environ, "PYTHONPATH": f"{cwd}{os.pathsep}{ROOT}"})
+
+def test_importing_adds_nothing_outside_the_package(tmp_path):
+    code = """
+import sys
+before = set(sys.modules)
+path = list(sys.path)
+import language
+added = set(sys.modules) - before
+print(sorted(name for name in added if name.split(".")[0] != "language" and name.split(".")[0] not in sys.stdlib_module_names))
+print(sorted(name for name in ("asyncio", "numpy", "pickle", "multiprocessing", "readline", "language.cache", "language.parallel") if name in added))
+print(sys.path == path)
+"""
+    result = python(code, tmp_path)
+    assert result.stdout.splitlines() == ["[]", "[]", "True"], result.stderr
+
+def test_a_host_s_own_modules_are_left_alone(tmp_path):
+    # a host with modules named like the interpreter's used to have them replaced, or used by it
+    for name in ("tasks", "main", "parser", "lexer", "error", "output", "files", "modules", "vm", "cache"):
+        (tmp_path / f"{name}.py").write_text(f"NAME = {name!r}\n")
+    code = """
+import io, sys
+import tasks, main, parser
+import language
+program = language.compile("async fn f(x):\\n  await sleep(0);\\n  return x + 1;\\nend;\\nprint await f(1);")
+stdout = io.StringIO()
+program.run(stdout=stdout)
+print(stdout.getvalue().strip())
+print(tasks.NAME, main.NAME, parser.NAME, sys.modules["vm"].NAME if "vm" in sys.modules else "no vm")
+"""
+    result = python(code, tmp_path)
+    assert result.stdout.splitlines() == ["2", "tasks main parser no vm"], result.stderr
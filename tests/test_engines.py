@@ -0,0 +1,46 @@
+"""
+every engine has to print exactly what the tree walker prints, with and without
+-O, for the example programs: the scripts in tests/programs, the benchmark
+suite and the examples at the top of the repository. the scripts in
+tests/programs also have their output checked against the .out file next to
+them, so all the engines can't be wrong the same way.
+"""
+import functools
+import glob
+import os
+import pytest
+from support import PROGRAMS, ROOT, configurations, run, run_file
+
+programs = sorted(glob.glob(os.path.join(PROGRAMS, "*.language")))
+examples = programs + sorted(glob.glob(os.path.join(ROOT, "benchmarks", "suite", "*.language"))) + [
+    os.path.join(ROOT, "test.language"),
+    os.path.join(ROOT, "fibonacci.language"),
+]
+
+@functools.lru_cache(maxsize=None)
+def output(path, engine, optimize):
+    # fibonacci.language ends with how long it took
+    return run_file(path, engine, optimize).split("Total execution time:")[0]
+
+@pytest.mark.parametrize("engine, optimize", configurations())
+@pytest.mark.parametrize("path", examples, ids=os.path.basename)
+def test_same_output_as_the_tree_walker(path, engine, optimize):
+    assert output(path, engine, optimize) == output(path, "tree", False)
+
+@pytest.mark.parametrize("path", programs, ids=os.path.basename)
+def test_expected_output(path):
+    with open(path.replace(".language", ".out")) as f:
+        assert output(path, "tree", False) == f.read()
+
+@pytest.mark.parametrize("engine, optimize", configurations())
+@pytest.mark.parametrize("source, message", [
+    ("let x = 1;\nfn f(a):\n  return a + missing;\nend;\nprint f(x);", "Unkown name 'missing'."),
+    ("class A:\n  new():\n    self.f = 3;\n  end\nend;\nlet a = A();\nprint a.f();", "Only functions are callable."),
+    ("let f = 3;\nprint f();", "Only functions are callable."),
+    ("fn f(a):\n  return a;\nend;\nprint f(1, 2);", "Wanted 1 argument(s), got 2 instead."),
+    ("class A:\n  m(a):\n    return a;\n  end\nend;\nprint A().m();", "Wanted 1 argument(s), got 0 instead."),
+    ("let x = 1;\nprint x.y;", "Only instances have properties."),
+])
+def test_errors_point_at_the_same_place(engine, optimize, source, message):
+    assert run(source, engine, optimize) == run(source)
+    assert run(source, engine, optimize).splitlines()[-1] == message
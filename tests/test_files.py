@@ -0,0 +1,74 @@
+"""
+streams, mapped files and writers, on every engine.
+"""
+import pytest
+from support import configurations, run
+
+@pytest.fixture
+def data(tmp_path):
+    path = tmp_path / "data.txt"
+    path.write_text("one\ntwo\r\nthree")
+    return path
+
+@pytest.mark.parametrize("engine, optimize", configurations())
+def test_streams(data, engine, optimize):
+    source = f'for line in open_lines("{data}"):\n  print line;\nend;'
+    assert run(source, engine, optimize) == "one\ntwo\nthree\n"
+
+@pytest.mark.parametrize("engine, optimize", configurations())
+@pytest.mark.parametrize("body, line, message", [
+    ("for x in s:\n  print x;\nend;\nfor x in s:\n  print x;\nend;", 5, "Can't loop over a closed stream."),
+    ("s.close();\nfor x in s:\n  print x;\nend;", 3, "Can't loop over a closed stream."),
+    ("for x in s:\n  print x;\n  s.close();\nend;", 2, "The stream was closed while it was looped over."),
+])
+def test_closed_streams(data, engine, optimize, body, line, message):
+    source = f'let s = open_lines("{data}");\n{body}'
+    output = run(source, engine, optimize)
+    assert output == run(source)
+    assert f"Error at line {line}, column 5" in output
+    assert output.splitlines()[-1] == message
+
+@pytest.mark.parametrize("engine, optimize", configurations())
+@pytest.mark.parametrize("builtin", ["mmap_file", "read_bytes"])
+def test_bytes(data, engine, optimize, builtin):
+    source = f"""
+let b = {builtin}("{data}");
+print b.length();
+print b[0];
+let rest = b.slice(4, 100);
+print rest.text();
+print rest.find("three", 0);
+print b.find("missing", 0);
+let total = 0;
+for byte in b.slice(0, 3):
+  total = total + byte;
+end;
+print total;
+"""
+    assert run(source, engine, optimize) == f"14\n{ord('o')}\ntwo\r\nthree\n5\n-1\n{sum(b'one')}\n"
+
+def test_empty_files_can_be_mapped(tmp_path):
+    path = tmp_path / "empty"
+    path.write_bytes(b"")
+    assert run(f'print mmap_file("{path}").length();') == "0\n"
+
+@pytest.mark.parametrize("engine", ["tree", "vm", "closure"])
+def test_writers(tmp_path, engine):
+    path = tmp_path / "out.txt"
+    run(f'let w = open_writer("{path}");\nw.write(1);\nw.write_line(" two");\nw.write_line([3]);\nw.close();', engine)
+    assert path.read_text() == "1 two\n[3]\n"
+
+@pytest.mark.parametrize("engine, optimize", configurations())
+@pytest.mark.parametrize("source, message", [
+    ('let s = open_lines("/does/not/exist");', "Couldn't open '/does/not/exist': No such file or directory."),
+    ("let s = open_lines(1);", "open_lines() takes a path."),
+    ('let b = mmap_file("/dev/null");', "Only regular files can be mapped into memory, '/dev/null' isn't one."),
+    ('let w = open_writer("{tmp}/w");\nw.close();\nw.write(1);', "Can't write to a closed file."),
+    ('let b = read_bytes("{data}");\nb[0] = 1;', "Bytes are read-only."),
+    ('let b = read_bytes("{data}");\nprint b[100];', "Byte index out of range."),
+])
+def test_errors(data, tmp_path, engine, optimize, source, message):
+    source = source.format(data=data, tmp=tmp_path)
+    output = run(source, engine, optimize)
+    assert output == run(source)
+    assert output.splitlines()[-1] == message
@@ -0,0 +1,91 @@
+"""
+for loops: which ones the parser turns into counting loops, and what they do on every engine.
+"""
+import pytest
+from language.syntax_tree import ForEach, ForRange, WhileStatement
+from support import configurations, nodes, run, resolve
+
+def loops(source):
+    return [type(node).__name__ for node in nodes(resolve(source)) if type(node) in (ForRange, ForEach, WhileStatement)]
+
+@pytest.mark.parametrize("header, kind", [
+    ("for (let i = 0; i < 10; i++):", "ForRange"),
+    ("for (let i = 0; i <= n; i = i + 1):", "ForRange"),
+    ("for (let i = 0; i < 10; i = i + 2):", "WhileStatement"),
+    ("for (let i = 10; i > 0; i = i - 1):", "WhileStatement"),
+    ("for (let i = 0; 10 > i; i++):", "WhileStatement"),
+    ("for (let i = 0; i < 10; i = i + 1.0):", "WhileStatement"),
+    ("for i in xs:", "ForEach"),
+])
+def test_loop_kinds(header, kind):
+    assert loops(f"let n = 3;\nlet xs = [];\n{header}\n  print 1;\nend;") == [kind]
+
+def test_assigning_the_counter_in_the_body_keeps_the_while_loop():
+    assert loops("for (let i = 0; i < 10; i++):\n  i = i + 2;\nend;") == ["WhileStatement"]
+    assert loops("for (let i = 0; i < 10; i++):\n  fn f():\n    i = 5;\n  end;\nend;") == ["WhileStatement"]
+
+@pytest.mark.parametrize("engine, optimize", configurations())
+def test_counting(engine, optimize):
+    source = """let n = 3;
+let seen = [];
+for (let i = 0; i <= n; i++):
+  seen.push(i);
+  n = 2;
+end;
+print seen;
+let total = 0;
+for (let i = 0.5; i < 3; i++):
+  total = total + i;
+end;
+print total;
+for (let i = 5; i < 2; i++):
+  print "never";
+end;
+let fns = [];
+for (let i = 0; i < 3; i++):
+  fn get():
+    return i;
+  end;
+  fns.push(get);
+end;
+print fns[0]() + fns[2]();
+let i = "outer";
+for (let i = 0; i < 2; i++):
+  let j = i * 10;
+end;
+print i;
+"""
+    assert run(source, engine, optimize) == run(source)
+    assert run(source, engine, optimize).splitlines()[:3] == ["[0, 1, 2]", "4.5", run(source).splitlines()[2]]
+    assert run(source, engine, optimize).splitlines()[-1] == "outer"
+
+@pytest.mark.parametrize("engine, optimize", configurations())
+def test_for_each(engine, optimize):
+    source = """let xs = [1, 2];
+for x in xs:
+  if (x < 3):
+    xs.push(x + 2);
+  fi;
+end;
+print xs;
+let letters = "";
+for c in "abc":
+  letters = c + letters;
+end;
+print letters;
+for x in []:
+  print "never";
+end;
+let x = "outer";
+for x in [1]:
+  let y = x;
+end;
+print x;
+"""
+    assert run(source, engine, optimize) == "[1, 2, 3, 4]\ncba\nouter\n"
+
+@pytest.mark.parametrize("engine, optimize", configurations())
+def test_looping_over_something_else(engine, optimize):
+    output = run("let n = 5;\nfor x in n:\n  print x;\nend;", engine, optimize)
+    assert output == run("let n = 5;\nfor x in n:\n  print x;\nend;")
+    assert output.splitlines()[-1] == "Only lists, arrays and strings can be looped over."
@@ -0,0 +1,59 @@
+"""
+inline caches for reading and setting properties, and calling methods without binding them.
+"""
+from language import bytecode
+from language.compiler import Compiler
+from language.function_obj import BoundMethod, Class, Instance, NativeMethod, PropertyCache
+from support import resolve, run
+
+class Declaration():
+    name = "Thing"
+
+def thing_class(methods=None):
+    return Class(Declaration(), methods or {})
+
+def test_property_cache_follows_the_shape():
+    clss = thing_class({"m": "method"})
+    a, b = Instance(clss), Instance(clss)
+    for instance in (a, b):
+        instance.set("x", 1)
+        instance.set("y", 2)
+    assert a.shape is b.shape
+
+    cache = PropertyCache("y")
+    cache.lookup(a)
+    assert (cache.shape, cache.index, cache.method) == (a.shape, 1, None)
+    cache = PropertyCache("m")
+    cache.lookup(a)
+    assert (cache.shape, cache.method, cache.index) == (a.shape, "method", None)
+
+    c = Instance(clss)
+    c.set("y", 2)
+    c.set("x", 1)
+    assert c.shape is not a.shape # same fields, another order
+    cache = PropertyCache("missing")
+    cache.lookup(c)
+    assert (cache.shape, cache.method, cache.index) == (None, None, None) # nothing to cache
+
+def test_methods_are_bound_only_when_read_as_values():
+    clss = thing_class({"m": NativeMethod("m", lambda instance: instance)})
+    instance = Instance(clss)
+    method = instance.get("m")
+    assert type(method) is BoundMethod and method.call(None, []) is instance
+
+def test_the_vm_calls_methods_without_binding():
+    code = Compiler().compile(resolve("class A:\n  f(x):\n    return x;\n  end\nend;\nlet a = A();\nprint a.f(1);\nlet g = a.f;"))
+    ops = code.ops[::2]
+    assert bytecode.LOAD_METHOD in ops and bytecode.CALL_METHOD in ops
+    assert ops.count(bytecode.GET_PROP) == 1 # `a.f` as a value still binds
+
+def test_a_field_holding_a_function_is_called_without_self():
+    source = "fn id(x):\n  return x;\nend;\nclass A:\n  new():\n    self.f = id;\n  end\nend;\nprint A().f(7);"
+    for engine in ("tree", "vm", "closure"):
+        assert run(source, engine) == "7\n"
+
+def test_a_missing_method_is_an_error_at_the_call():
+    source = "class A:\n  new():\n    self.x = 1;\n  end\nend;\nlet a = A();\nfor (let i = 0; i < 3; i++):\n  a.x;\nend;\na.nope();"
+    outputs = {engine: run(source, engine) for engine in ("tree", "vm", "closure")}
+    assert outputs["vm"] == outputs["closure"] == outputs["tree"]
+    assert "Error at line 10" in outputs["tree"]
@@ -0,0 +1,69 @@
+"""
+the scanner: token types, values and positions. names, keywords and strings
+are positioned at their last character, everything else at its first, the
+same as before the lexer was rewritten.
+"""
+import pytest
+from language.error import Error
+from language.lexer import Lexer, TokenType
+
+def tokens(content):
+    lexer = Lexer()
+    lexer.content = content
+    return [(token.type, token.value, token.line, token.column) for token in lexer.tokenize()]
+
+def test_positions():
+    assert tokens("let x = 12.5;\nprint 3;") == [
+        (TokenType.DECL, "let", 1, 3),
+        (TokenType.NAME, "x", 1, 5),
+        (TokenType.ASSIGN, "=", 1, 7),
+        (TokenType.NUM, 12.5, 1, 9),
+        (TokenType.SEPR, ";", 1, 13),
+        (TokenType.PRINT, "print", 2, 5),
+        (TokenType.NUM, 3, 2, 7),
+        (TokenType.SEPR, ";", 2, 8),
+    ]
+
+def test_two_character_operators():
+    assert [token[0] for token in tokens("== != >= <= ++ -- = ! > <")] == [
+        TokenType.EQUAL, TokenType.NOT_EQUAL, TokenType.GREATER_EQUAL, TokenType.LESS_EQUAL,
+        TokenType.INCREMENT, TokenType.DECREMENT, TokenType.ASSIGN, TokenType.NOT, TokenType.GREATER, TokenType.LESS,
+    ]
+
+def test_strings_spanning_lines_move_the_line_on():
+    assert tokens('print "a\nbc";\nx') == [
+        (TokenType.PRINT, "print", 1, 5),
+        (TokenType.STRING, "a\nbc", 2, 3),
+        (TokenType.SEPR, ";", 2, 4),
+        (TokenType.NAME, "x", 3, 1),
+    ]
+
+def test_comments_and_line_breaks():
+    # \r\n is one line break, like str.splitlines() sees it
+    assert tokens("// a comment\r\n\r\n  true // another\nfalse") == [
+        (TokenType.BOOL, True, 3, 6),
+        (TokenType.BOOL, False, 4, 5),
+    ]
+
+def test_keywords_annotations_and_names():
+    assert tokens("@memoize fn fns") == [
+        (TokenType.ANNOTATION, "memoize", 1, 1),
+        (TokenType.FUNCOPEN, "fn", 1, 11),
+        (TokenType.NAME, "fns", 1, 15),
+    ]
+
+@pytest.mark.parametrize("content, message, column", [
+    ('let s = "abc;', "Unterminated string.", 9),
+    ("let s = 1 # 2;", "Unrecognized character '#'.", 11),
+])
+def test_errors(content, message, column):
+    with pytest.raises(Error) as error:
+        tokens(content)
+    assert (error.value.msg, error.value.line, error.value.column) == (message, 1, column)
+
+def test_large_input():
+    # the scanner is a single pass, so a script of a couple of megabytes is no problem
+    line = "let total = total + add(i, 2.5) * 3; // comment\n"
+    result = tokens(line * 40000)
+    assert len(result) == 40000 * 14
+    assert result[-1] == (TokenType.SEPR, ";", 40000, 36)
@@ -0,0 +1,38 @@
+"""
+lists: what goes wrong with them, and that every engine says so the same way.
+"""
+import pytest
+from language.function_obj import List, list_class
+from support import configurations, run
+
+@pytest.mark.parametrize("engine, optimize", configurations())
+@pytest.mark.parametrize("source, message", [
+    ("let xs = [1, 2];\nprint xs[2];", "List index out of range."),
+    ("let xs = [1, 2];\nxs[5] = 1;", "List index out of range."),
+    ('let xs = [1, 2];\nprint xs["a"];', "List indices must be integers."),
+    ("let xs = [1, 2];\nxs[0.5] = 1;", "List indices must be integers."),
+    ("let n = 1;\nprint n[0];", "Only lists, arrays and bytes can be indexed."),
+    ("let xs = [];\nxs.pop();", "Can't pop from an empty list."),
+    ('let xs = [1, "a"];\nxs.sort();', "Only lists of numbers or of strings can be sorted."),
+    ('let xs = [1];\nprint xs.slice(0, "a");', "List slice bounds must be integers."),
+])
+def test_errors(engine, optimize, source, message):
+    output = run(source, engine, optimize)
+    assert output == run(source)
+    assert output.startswith("Error at line 2, ")
+    assert output.splitlines()[-1] == message
+
+def test_lists_share_their_class():
+    a, b = List([]), List([1])
+    assert a.clss is b.clss is list_class
+    assert a.get("push").function is b.get("push").function
+
+def test_lists_are_values_not_copies():
+    for engine in ("tree", "vm", "closure"):
+        source = "fn add(xs):\n  xs.push(1);\nend;\nlet xs = [];\nadd(xs);\nadd(xs);\nprint xs;"
+        assert run(source, engine) == "[1, 1]\n"
+
+def test_push_is_amortized_constant():
+    source = "let xs = [];\nfor (let i = 0; i < 50000; i++):\n  xs.push(i);\nend;\nprint xs.length();\nprint xs[49999];"
+    for engine in ("tree", "vm", "closure"):
+        assert run(source, engine) == "50000\n49999\n"
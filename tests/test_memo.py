@@ -0,0 +1,110 @@
+"""
+memoizing the calls of pure functions: which functions count as pure, and the memo itself.
+"""
+import contextlib
+import io
+import pytest
+from language.function_obj import Memo
+from language.main import Interpreter
+from language.syntax_tree import DeclareFunc
+from support import configurations, nodes, resolve, run
+
+FIB = "fn fib(n):\n  if (n < 2):\n    return n;\n  fi;\n  return fib(n - 1) + fib(n - 2);\nend;\nprint fib(30);"
+
+def memoized(source):
+    """
+    the names of the functions the purity analysis lets through.
+    """
+    from language.purity import PurityAnalyzer
+    tree = resolve(source)
+    PurityAnalyzer().analyze(tree)
+    return [node.name.token.value for node in nodes(tree) if type(node) is DeclareFunc and node.memoized]
+
+def memos(source, engine="tree", optimize=False, memo_size=1024):
+    interpreter = Interpreter(engine, use_cache=False, optimize=optimize, memo_size=memo_size)
+    interpreter.is_shell = False
+    with contextlib.redirect_stdout(io.StringIO()):
+        interpreter.run(source)
+    return {memo.name: memo for memo in interpreter.memos.values()}
+
+def test_pure_functions():
+    assert memoized(FIB) == ["fib"]
+    assert memoized("fn square(x):\n  let y = x * x;\n  return y;\nend;\nfn twice(x):\n  return square(x) + square(x);\nend;") == ["square", "twice"]
+
+@pytest.mark.parametrize("body", [
+    "print x;\n  return x;",
+    "total = total + x;\n  return total;",
+    "return total + x;",
+    "return [x];",
+    "return x.y;",
+    "x.y = 1;\n  return x;",
+    "fn inner():\n    return x;\n  end;\n  return inner;",
+    "return x(1);",
+    "let g = x;\n  return g(1);",
+])
+def test_impure_functions(body):
+    assert memoized(f"let total = 0;\ntotal = 1;\nfn f(x):\n  {body}\nend;") == []
+
+@pytest.mark.parametrize("engine, optimize", configurations())
+def test_functions_passed_in_are_called_every_time(engine, optimize):
+    source = "let n = 0;\nfn count(x):\n  print \"counting\";\n  n = n + x;\n  return n;\nend;\nfn apply(f, x):\n  return f(x);\nend;\nprint apply(count, 1);\nprint apply(count, 1);"
+    assert run(source, engine, optimize) == "counting\n1\ncounting\n2\n"
+
+def test_calling_an_impure_function_is_impure():
+    source = "fn noisy(x):\n  print x;\n  return x;\nend;\nfn quiet(x):\n  return noisy(x);\nend;"
+    assert memoized(source) == []
+
+def test_mutual_recursion_is_pure():
+    source = "fn even(n):\n  if (n == 0):\n    return true;\n  fi;\n  return odd(n - 1);\nend;\nfn odd(n):\n  if (n == 0):\n    return false;\n  fi;\n  return even(n - 1);\nend;"
+    assert memoized(source) == ["even", "odd"]
+
+def test_annotations_win():
+    assert memoized("@no_memoize\nfn f(x):\n  return x;\nend;") == []
+    assert memoized("let seen = [];\n@memoize\nfn f(x):\n  seen.push(x);\n  return x;\nend;") == ["f"]
+
+def test_lru_eviction():
+    memo = Memo("f", 2)
+    calls = []
+    def invoke(interpreter, args):
+        calls.append(args[0])
+        return args[0] * 2
+    for x in [1, 2, 1, 3, 2, 1]:
+        assert memo.call(invoke, None, [x]) == x * 2
+    # 2 is the least recently used when 3 comes in, then 1 is when 2 comes back
+    assert calls == [1, 2, 3, 2, 1]
+    assert (memo.hits, memo.misses) == (1, 5)
+    assert list(memo.results) == [(2, int), (1, int)]
+
+def test_keys_tell_equal_values_of_different_types_apart():
+    memo = Memo("f", 10)
+    results = [memo.call(lambda interpreter, args: repr(args[0]), None, [x]) for x in (1, 1.0, True)]
+    assert results == ["1", "1.0", "True"]
+
+def test_unhashable_arguments_skip_the_memo():
+    memo = Memo("f", 10)
+    assert memo.call(lambda interpreter, args: len(args[0]), None, [[1, 2]]) == 2
+    assert (memo.hits, memo.misses, len(memo.results)) == (0, 0, 0)
+
+@pytest.mark.parametrize("engine, optimize", configurations())
+def test_fib_is_memoized(engine, optimize):
+    memo = memos(FIB, engine, optimize)["fib"]
+    assert (memo.misses, memo.hits) == (31, 28)
+
+@pytest.mark.parametrize("engine, optimize", configurations())
+def test_impure_calls_run_every_time(engine, optimize):
+    source = "fn noisy(x):\n  print x;\n  return x;\nend;\nnoisy(1);\nnoisy(1);"
+    assert run(source, engine, optimize, filename="t.language") == "1\n1\n"
+    assert memos(source, engine, optimize) == {}
+
+@pytest.mark.parametrize("engine", ["tree", "vm", "closure"])
+def test_memo_size_zero_turns_it_off(engine):
+    source = FIB.replace("fib(30)", "fib(15)")
+    assert memos(source, engine, memo_size=0) == {}
+    assert run(source, engine, filename="t.language", memo_size=0) == "610\n"
+
+def test_memo_stats(capsys):
+    interpreter = Interpreter(use_cache=False)
+    interpreter.is_shell = False
+    interpreter.run(FIB)
+    interpreter.memo_stats()
+    assert capsys.readouterr().err == "\x1b[33mmemo: fib: 28 hit(s), 31 miss(es) (47.5% hits), 31 result(s) kept\x1b[0m\n"
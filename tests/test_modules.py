@@ -0,0 +1,134 @@
+"""
+imports: every module has globals of its own, runs once, and its errors are
+reported in its own file, on every engine.
+"""
+import os
+import pytest
+from language.main import Interpreter
+from support import configurations, run_file
+
+@pytest.fixture
+def files(tmp_path):
+    def write(**sources):
+        for name, source in sources.items():
+            path = tmp_path / name.replace("__", "/").replace("_language", ".language")
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(source)
+        return tmp_path
+    return write
+
+def main(directory, engine="tree", optimize=False):
+    return run_file(str(directory / "main.language"), engine, optimize)
+
+@pytest.mark.parametrize("engine, optimize", configurations())
+def test_modules_keep_their_own_globals(files, engine, optimize):
+    directory = files(
+        counter_language="let x = 1;\nlet count = 0;\nfn getx():\n  return x;\nend;\nfn bump():\n  count = count + 1;\n  return count;\nend;\n",
+        main_language='import "counter.language";\nx = 2;\nlet count = 100;\nprint getx();\nprint bump();\nprint bump();\nprint count;\nprint x;\n',
+    )
+    assert main(directory, engine, optimize) == "1\n1\n2\n100\n2\n"
+
+@pytest.mark.parametrize("engine, optimize", configurations())
+def test_a_module_runs_once(files, engine, optimize):
+    directory = files(
+        shared_language='print "running shared";\nlet value = 42;\n',
+        a_language='import "shared.language";\nfn a():\n  return value;\nend;\n',
+        main_language='import "shared.language";\nimport "a.language";\nimport "shared.language";\nprint a();\nprint value;\n',
+    )
+    assert main(directory, engine, optimize) == "running shared\n42\n42\n"
+
+@pytest.mark.parametrize("engine", ["tree", "vm", "closure"])
+def test_paths_are_relative_to_the_importing_file(files, engine):
+    directory = files(
+        lib__inner_language='let name = "inner";\n',
+        lib__outer_language='import "inner.language";\nfn describe():\n  return "outer of " + name;\nend;\n',
+        main_language='import "lib/outer.language";\nprint describe();\n',
+    )
+    assert main(directory, engine) == "outer of inner\n"
+
+@pytest.mark.parametrize("engine, optimize", configurations())
+def test_errors_are_reported_in_the_module_s_file(files, engine, optimize):
+    directory = files(
+        helpers_language="fn bad(x):\n  return x + missing;\nend;\nfn apply(f, x):\n  return f(x);\nend;\n",
+        main_language='import "helpers.language";\nprint 1;\nprint bad(1);\n',
+    )
+    output = main(directory, engine, optimize)
+    assert output.startswith(f"1\nError in {directory / 'helpers.language'} at line 2, column 20")
+    assert "return x + missing;" in output
+
+@pytest.mark.parametrize("engine, optimize", configurations())
+def test_errors_in_the_program_s_functions_stay_in_the_program(files, engine, optimize):
+    # called back from a module's function, the error is still the program's
+    directory = files(
+        helpers_language="fn apply(f, x):\n  return f(x);\nend;\n",
+        main_language='import "helpers.language";\nfn g(x):\n  return x + missing;\nend;\nprint apply(g, 1);\n',
+    )
+    output = main(directory, engine, optimize)
+    assert output.startswith("Error at line 3, column 20")
+    assert "return x + missing;" in output
+
+@pytest.mark.parametrize("engine, optimize", configurations())
+def test_errors_while_a_module_runs(files, engine, optimize):
+    directory = files(
+        broken_language="let a = 1;\nprint a + missing;\n",
+        main_language='print 0;\nimport "broken.language";\n',
+    )
+    assert main(directory, engine, optimize).startswith(f"0\nError in {directory / 'broken.language'} at line 2, column 17")
+
+@pytest.mark.parametrize("engine", ["tree", "vm", "closure"])
+def test_circular_imports(files, engine):
+    directory = files(
+        a_language='import "b.language";\n',
+        b_language='import "a.language";\n',
+        main_language='import "a.language";\n',
+    )
+    output = main(directory, engine)
+    assert output.splitlines()[-1] == "Circular import: a.language -> b.language -> a.language."
+    assert output.startswith(f"Error in {directory / 'b.language'} at line 1")
+
+@pytest.mark.parametrize("engine", ["tree", "vm", "closure"])
+def test_missing_modules(files, engine):
+    directory = files(main_language='import "nowhere.language";\n')
+    assert main(directory, engine).splitlines()[-1] == "Couldn't import 'nowhere.language': No such file or directory."
+
+@pytest.mark.parametrize("engine", ["tree", "vm", "closure"])
+def test_a_changed_module_runs_again(files, engine, capsys):
+    directory = files(
+        version_language='print "loading";\nlet version = 1;\n',
+        main_language='import "version.language";\nprint version;\n',
+    )
+    interpreter = Interpreter(engine, use_cache=False)
+    interpreter.is_shell = False
+    interpreter.filename = str(directory / "main.language")
+    source = (directory / "main.language").read_text()
+    interpreter.run(source)
+    interpreter.run(source)
+    module = directory / "version.language"
+    module.write_text('print "loading";\nlet version = 2;\n')
+    stat = module.stat()
+    os.utime(module, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    interpreter.run(source)
+    assert capsys.readouterr().out == "loading\n1\n1\nloading\n2\n"
+
+@pytest.mark.parametrize("engine", ["tree", "vm", "closure"])
+def test_modules_are_cached_compiled(files, engine, capsys):
+    directory = files(
+        lib__shapes_language="fn area(r):\n  return r * r * 3;\nend;\n",
+        main_language='import "lib/shapes.language";\nprint area(2);\n',
+    )
+    source = (directory / "main.language").read_text()
+    loaded = []
+    for _ in range(2): # the second run loads the module from the cache, in a new interpreter
+        interpreter = Interpreter(engine)
+        interpreter.is_shell = False
+        interpreter.filename = str(directory / "main.language")
+        def load(filename, *args, load=interpreter.cache.load):
+            program = load(filename, *args)
+            loaded.append((os.path.basename(filename), program is not None))
+            return program
+        interpreter.cache.load = load
+        interpreter.run(source)
+    assert capsys.readouterr().out == "12\n12\n"
+    assert loaded[-2:] == [("main.language", True), ("shapes.language", True)]
+    cached = os.listdir(directory / "lib" / "__pycache__")
+    assert len(cached) == 1 and cached[0].startswith("shapes.language.")
@@ -0,0 +1,76 @@
+"""
+what -O changes in a program, and that it never changes what the program does.
+"""
+import pytest
+from language.optimizer import Optimizer
+from language.syntax_tree import IfStatement, Literal, Variable, WhileStatement
+from support import nodes, resolve, run
+
+def optimize(source, propagate_globals=True):
+    tree = resolve(source)
+    changes = Optimizer().optimize(tree, propagate_globals=propagate_globals)
+    return tree, [(token.line, token.column, message) if token is not None else message for token, message in changes]
+
+def test_folding():
+    tree, changes = optimize("print 2 * 3 + 4;")
+    assert changes == [(1, 7, "folded a constant expression into 6"), (1, 7, "folded a constant expression into 10")]
+    assert [node.token.value for node in nodes(tree) if type(node) is Literal] == [10]
+
+def test_folding_strings_and_unary():
+    _, changes = optimize('print "a" + "b";\nprint -(1 + 1);\nprint !true;')
+    assert [change[2] for change in changes] == [
+        "folded a constant expression into 'ab'",
+        "folded a constant expression into 2",
+        "folded a constant expression into -2",
+        "folded a constant expression into False",
+    ]
+
+def test_errors_are_left_for_runtime():
+    _, changes = optimize('print 1 / 0;\nprint "a" - 1;')
+    assert changes == []
+
+def test_constants_are_propagated():
+    tree, changes = optimize("let n = 4;\nfn f():\n  let m = 2;\n  return n * m;\nend;\nprint f();")
+    assert (4, 10, "replaced 'n' with its constant value 4") in changes
+    assert (4, 14, "replaced 'm' with its constant value 2") in changes
+    assert (4, 10, "folded a constant expression into 8") in changes
+
+def test_variables_written_again_are_not_propagated():
+    _, changes = optimize("let n = 4;\nn = 5;\nprint n;\nlet i = 0;\ni++;\nprint i;")
+    assert changes == []
+
+def test_globals_stay_put_when_the_program_isnt_whole():
+    _, changes = optimize("let n = 4;\nprint n;", propagate_globals=False)
+    assert changes == []
+    _, changes = optimize("fn f():\n  let m = 2;\n  return m;\nend;", propagate_globals=False)
+    assert changes == [(3, 10, "replaced 'm' with its constant value 2")]
+
+def test_dead_branches():
+    tree, changes = optimize("if (1 < 2):\n  print 1;\nfi else\n  print 2;\nfi;\nif (false):\n  print 3;\nfi;\nwhile (false):\n  print 4;\nend;")
+    assert [change[2] for change in changes if "folded" not in change[2]] == [
+        "condition is always true, removed the else branch",
+        "condition is always false, removed the if statement",
+        "condition is always false, removed the loop",
+    ]
+    assert not [node for node in nodes(tree) if type(node) in (IfStatement, WhileStatement)]
+
+def test_short_circuits():
+    _, changes = optimize("fn f(x):\n  return true or x;\nend;\nfn g(x):\n  return false or x;\nend;")
+    assert [change[2] for change in changes] == ["'or' always short-circuits, removed the right side", "'or' never short-circuits, removed the left side"]
+
+def test_unreachable_statements():
+    _, changes = optimize("fn f():\n  return 1;\n  print 2;\n  print 3;\nend;")
+    assert changes == [(3, 9, "removed 2 unreachable statement(s) after return")]
+
+def test_variables_keep_their_slots():
+    tree, _ = optimize("fn f(a):\n  if (true):\n    let b = a + 1;\n    return b;\n  fi;\nend;")
+    assert [(node.depth, node.slot) for node in nodes(tree) if type(node) is Variable and node.token.value in "ab"] == [(0, 1), (0, 2)]
+
+@pytest.mark.parametrize("engine", ["tree", "vm", "closure"])
+def test_report(engine, capsys):
+    run("let x = 1 + 2;\nprint x;", engine, True, filename="t.language")
+    assert capsys.readouterr().err.splitlines()[-3:] == [
+        "\x1b[33moptimizer: 1:9 folded a constant expression into 3\x1b[0m",
+        "\x1b[33moptimizer: 2:7 replaced 'x' with its constant value 3\x1b[0m",
+        "\x1b[33moptimizer: 2 change(s)\x1b[0m",
+    ]
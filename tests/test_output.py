@@ -0,0 +1,104 @@
+"""
+the buffer `print` writes to: when what's printed comes out, and that it comes
+out in order with everything else.
+"""
+import io
+import os
+import subprocess
+import sys
+import pytest
+from language.main import Interpreter
+from language.output import Output
+from support import ROOT, configurations
+
+class Stream(io.StringIO):
+    """
+    remembers every write separately.
+    """
+    def __init__(self):
+        super().__init__()
+        self.writes = []
+
+    def write(self, text):
+        self.writes.append(text)
+        return super().write(text)
+
+def test_lines_are_held_until_the_buffer_fills_up():
+    stream = Stream()
+    output = Output(10, stream)
+    output.print("12345")
+    output.print(6)
+    assert stream.writes == []
+    output.print("x")
+    assert stream.writes == ["12345\n6\nx\n"]
+    output.line()
+    output.flush()
+    assert stream.writes == ["12345\n6\nx\n", "\n"]
+
+def test_a_size_of_0_writes_every_line():
+    stream = Stream()
+    output = Output(0, stream)
+    output.print("a")
+    output.print("b")
+    assert stream.writes == ["a\n", "b\n"]
+
+def test_without_a_stream_it_writes_to_stdout_as_it_is_then(capsys):
+    output = Output()
+    output.print("hello")
+    output.flush()
+    assert capsys.readouterr().out == "hello\n"
+
+def run(source, engine="tree", optimize=False):
+    stream = Stream()
+    interpreter = Interpreter(engine, use_cache=False, optimize=optimize)
+    interpreter.output.stream = stream
+    interpreter.run(source)
+    return stream.writes
+
+@pytest.mark.parametrize("engine, optimize", configurations())
+def test_flush(engine, optimize):
+    assert run("print 1;\nprint 2;\nflush();\nprint 3;", engine, optimize) == ["1\n2\n", "3\n"]
+
+@pytest.mark.parametrize("engine, optimize", configurations())
+def test_the_output_comes_out_when_the_program_fails(engine, optimize):
+    interpreter = Interpreter(engine, use_cache=False, optimize=optimize)
+    interpreter.output.stream = stream = Stream()
+    stdout = io.StringIO()
+    sys.stdout, saved = stdout, sys.stdout
+    try:
+        interpreter.run("print 1;\nprint missing;")
+    finally:
+        sys.stdout = saved
+    assert stream.getvalue() == "1\n"
+    assert "Unkown name 'missing'." in stdout.getvalue()
+
+@pytest.fixture
+def script(tmp_path):
+    path = tmp_path / "script.language"
+    def write(source):
+        path.write_text(source)
+        return str(path)
+    return write
+
+def command(*args):
+    return subprocess.run([sys.executable, "-m", "language", "--no-cache", *args], cwd=ROOT, stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT, text=True, env={**os.environ, "PYTHONPATH": ROOT})
+
+def test_errors_come_after_what_was_printed(script):
+    path = script("print 1;\nprint 2;\nprint missing;\n")
+    assert command(path).stdout.startswith(f"1\n2\n\x1b[31mError at line 3")
+
+def test_stderr_comes_out_in_order(script):
+    # the profiler's report goes to stderr, after everything the program printed
+    path = script("fn f():\n  return 1;\nend;\nprint f();\nprint 2;\n")
+    result = command("--profile", path).stdout
+    assert result.startswith("1\n2\n")
+    assert "f" in result[4:]
+
+@pytest.mark.parametrize("args", [[], ["--unbuffered"], ["--buffer-size=1"], ["--buffer-size=0"]])
+def test_every_setting_prints_the_same(script, args):
+    path = script("for (let i = 0; i < 1000; i = i + 1):\n  print i;\nend;\n")
+    assert command(*args, path).stdout == "".join(f"{i}\n" for i in range(1000))
+
+def test_a_bad_buffer_size(script):
+    assert "--buffer-size expects a number of characters, got 'lots'" in command("--buffer-size=lots", script("print 1;")).stdout
@@ -0,0 +1,109 @@
+"""
+parallel_map: the results come back in order on every engine, whatever the
+workers were sent, errors are reported where they happened, and it only forks
+when that's safe.
+"""
+import contextlib
+import io
+import threading
+import pytest
+from language import parallel
+from language.main import Interpreter
+from support import colours, configurations
+
+pytestmark = pytest.mark.skipif(not parallel.Pool(None, 2).can_fork(), reason="needs fork")
+
+def run(source, engine="tree", optimize=False, filename=None, workers=2):
+    # like support.run, but the workers are stopped afterwards
+    interpreter = Interpreter(engine, use_cache=False, optimize=optimize, workers=workers)
+    interpreter.is_shell = filename is None
+    interpreter.filename = filename
+    stdout = io.StringIO()
+    try:
+        with contextlib.redirect_stdout(stdout):
+            interpreter.run(source)
+    finally:
+        if interpreter.pool is not None:
+            interpreter.pool.stop()
+    return colours.sub("", stdout.getvalue())
+
+@pytest.fixture
+def no_workers(monkeypatch):
+    def start(self):
+        raise AssertionError("a worker was started")
+    monkeypatch.setattr(parallel.Pool, "start", start)
+
+@pytest.mark.parametrize("engine, optimize", configurations())
+def test_results_come_back_in_order(engine, optimize):
+    source = "fn square(x):\n  return x * x;\nend;\nlet xs = [];\nfor (let i = 0; i < 50; i = i + 1):\n  xs.push(i);\nend;\nprint parallel_map(square, xs);"
+    assert run(source, engine, optimize) == str([i * i for i in range(50)]) + "\n"
+
+@pytest.mark.parametrize("engine, optimize", configurations())
+def test_functions_take_their_globals_and_closures_along(engine, optimize):
+    source = """
+let offset = 100;
+fn adder(n):
+  fn add(x):
+    return x + n + offset;
+  end;
+  return add;
+end;
+class Box:
+  new(value):
+    self.value = value;
+  end
+end;
+fn unbox(box):
+  return box.value * 2;
+end;
+fn size(xs):
+  return xs.length();
+end;
+print parallel_map(adder(10), [1, 2, 3, 4]);
+print parallel_map(unbox, [Box(1), Box(2), Box(3)]);
+print parallel_map(size, [[1], [1, 2], [], [1, 2, 3]]);
+"""
+    assert run(source, engine, optimize) == "[111, 112, 113, 114]\n[2, 4, 6]\n[1, 2, 0, 3]\n"
+
+@pytest.mark.parametrize("engine", ["tree", "vm", "closure"])
+def test_workers_get_copies(engine):
+    source = "fn change(xs):\n  xs.push(0);\n  return xs.length();\nend;\nlet a = [1];\nlet b = [1, 2];\nprint parallel_map(change, [a, b]);\nprint a;\nprint b;"
+    assert run(source, engine) == "[2, 3]\n[1]\n[1, 2]\n"
+
+@pytest.mark.parametrize("engine, optimize", configurations())
+def test_errors_are_the_earliest_item_s(engine, optimize):
+    source = "fn f(x):\n  if (x > 5):\n    return x + missing;\n  fi;\n  return x;\nend;\nlet xs = [];\nfor (let i = 0; i < 40; i = i + 1):\n  xs.push(i);\nend;\nprint parallel_map(f, xs);"
+    output = run(source, engine, optimize)
+    assert output == run(source, engine, optimize, workers=1)
+    assert output.startswith("Error at line 3, column 22")
+    assert output.splitlines()[-1] == "Unkown name 'missing'."
+
+@pytest.mark.parametrize("engine", ["tree", "vm", "closure"])
+def test_errors_in_a_module_s_function_name_its_file(tmp_path, engine):
+    (tmp_path / "helpers.language").write_text("fn bad(x):\n  return x + missing;\nend;\n")
+    main = tmp_path / "main.language"
+    main.write_text('import "helpers.language";\nprint 1;\nprint parallel_map(bad, [1, 2, 3]);\n')
+    output = run(main.read_text(), engine, filename=str(main))
+    assert output.startswith(f"1\nError in {tmp_path / 'helpers.language'} at line 2, column 20")
+    assert "return x + missing;" in output
+
+def test_one_worker_maps_in_the_interpreter(no_workers):
+    assert run("fn double(x):\n  return x * 2;\nend;\nprint parallel_map(double, [1, 2, 3]);", workers=1) == "[2, 4, 6]\n"
+
+def test_only_the_main_thread_forks():
+    pool = parallel.Pool(None, 2)
+    assert pool.can_fork()
+    answers = []
+    thread = threading.Thread(target=lambda: answers.append(pool.can_fork()))
+    thread.start()
+    thread.join()
+    assert answers == [False]
+
+@pytest.mark.parametrize("engine", ["tree", "vm", "closure"])
+def test_async_functions_map_one_item_after_another(no_workers, engine):
+    source = "fn double(x):\n  return x * 2;\nend;\nasync fn work(xs):\n  await sleep(0);\n  return parallel_map(double, xs);\nend;\nprint await work([1, 2, 3]);"
+    assert run(source, engine) == "[2, 4, 6]\n"
+
+def test_bad_arguments():
+    assert run("print parallel_map(1, [1, 2]);").splitlines()[-1] == "parallel_map() needs a function that takes one argument."
+    assert run("fn f(x):\n  return x;\nend;\nprint parallel_map(f, 1);").splitlines()[-1] == "parallel_map() takes a function and a list."
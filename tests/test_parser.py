@@ -0,0 +1,43 @@
+"""
+the parser pulls tokens from the lexer as it needs them, with a one token
+lookahead, instead of lexing the whole script first.
+"""
+import types
+import pytest
+from language.error import Error
+from language.lexer import Lexer
+from language.parser import Parser
+from support import run
+
+def test_the_lexer_is_a_generator():
+    lexer = Lexer()
+    lexer.content = "print 1;"
+    assert isinstance(lexer.tokenize(), types.GeneratorType)
+
+def test_tokens_are_lexed_on_demand():
+    parser = Parser()
+    parser.setup("let = 1;\n#")
+    # the syntax error on the first line comes out before the lexer ever gets to the second
+    with pytest.raises(Error) as error:
+        parser.parse()
+    assert error.value.line == 1
+    assert error.value.msg == "Expected a name when declaring a variable."
+
+def test_lexer_errors_come_out_where_the_parser_is():
+    parser = Parser()
+    parser.setup("print 1;\nprint #;")
+    with pytest.raises(Error) as error:
+        parser.parse()
+    assert (error.value.line, error.value.column) == (2, 7)
+
+def test_lookahead():
+    # telling an assignment from an expression, and a call from a name, takes peeking at the next token
+    source = "let x = 1;\nx = x + 1;\nx++;\nfn f(a):\n  return a;\nend;\nprint f(x);\nprint x;\nlet xs = [1, 2];\nxs[0] = 5;\nprint xs;"
+    assert run(source) == "3\n3\n[5, 2]\n"
+
+def test_missing_separator_at_the_end():
+    with pytest.raises(Error) as error:
+        parser = Parser()
+        parser.setup("print 1")
+        parser.parse()
+    assert error.value.msg == "Expected statement separator (\";\")."
@@ -0,0 +1,101 @@
+"""
+`--profile`: call counts and times per function, on every engine.
+"""
+import contextlib
+import io
+import json
+import subprocess
+import sys
+import pytest
+from language.main import Interpreter
+from language.profiler import Entry, Profiler
+from support import ROOT, configurations
+
+SOURCE = """fn leaf(x):
+  return x + 1;
+end;
+fn walk(n):
+  if (n == 0):
+    return 0;
+  fi;
+  return leaf(n) + walk(n - 1);
+end;
+class Box:
+  new(v):
+    self.v = v;
+  end
+  get():
+    return self.v;
+  end
+end;
+let total = 0;
+for (let i = 0; i < 5; i++):
+  total = total + walk(3) + Box(i).get();
+end;
+print total;
+"""
+
+def profile(source, engine="tree", optimize=False):
+    interpreter = Interpreter(engine, use_cache=False, optimize=optimize, memo_size=0, profile=True)
+    interpreter.is_shell = False
+    interpreter.filename = "t.language"
+    stdout = io.StringIO()
+    with contextlib.redirect_stdout(stdout):
+        interpreter.run(source)
+    return stdout.getvalue(), {entry.name: entry for entry in interpreter.profiler.sorted_entries()}
+
+@pytest.mark.parametrize("engine, optimize", configurations())
+def test_call_counts(engine, optimize):
+    output, entries = profile(SOURCE, engine, optimize)
+    assert output == "55\n"
+    counts = {name: entry.calls for name, entry in entries.items()}
+    assert counts == {"walk": 20, "leaf": 15, "Box.new": 5, "Box.get": 5}
+    assert entries["walk"].location == "t.language:4:7"
+
+@pytest.mark.parametrize("engine", ["tree", "vm", "closure"])
+def test_functions_from_modules_are_located_in_their_file(tmp_path, engine):
+    helpers = tmp_path / "helpers.language"
+    helpers.write_text("let unused = 0;\nfn double(x):\n  return x * 2;\nend;\n")
+    main = tmp_path / "main.language"
+    main.write_text('import "helpers.language";\nprint double(2);\n')
+    interpreter = Interpreter(engine, use_cache=False, memo_size=0, profile=True)
+    interpreter.is_shell = False
+    interpreter.filename = str(main)
+    stdout = io.StringIO()
+    with contextlib.redirect_stdout(stdout):
+        interpreter.run(main.read_text())
+    assert stdout.getvalue() == "4\n"
+    [entry] = [entry for entry in interpreter.profiler.sorted_entries() if entry.name == "double"]
+    assert entry.location == f"{helpers}:2:9"
+
+def test_recursion_is_timed_once():
+    _, entries = profile(SOURCE)
+    walk = entries["walk"]
+    assert walk.active == 0
+    assert 0 < walk.own <= walk.total
+    # leaf's time is in walk's total, but not in walk's own
+    assert walk.own + entries["leaf"].own <= walk.total * 1.01
+
+def test_builtins_are_profiled():
+    _, entries = profile("let xs = array([1, 4, 9]);\nprint sqrt(xs);\nprint sqrt(xs);")
+    assert entries["sqrt"].calls == 2 and entries["sqrt"].location == "<builtin>"
+
+def test_measure_keeps_time_spent_in_children_out_of_own():
+    profiler = Profiler()
+    outer, inner = Entry("outer", ""), Entry("inner", "")
+    profiler.measure(outer, lambda: profiler.measure(inner, lambda: sum(range(100000))))
+    assert (outer.calls, inner.calls) == (1, 1)
+    assert outer.own < outer.total and inner.own == pytest.approx(inner.total)
+
+def test_report_and_json(tmp_path):
+    script = tmp_path / "t.language"
+    script.write_text(SOURCE)
+    saved = tmp_path / "profile.json"
+    finished = subprocess.run([sys.executable, "-m", "language", "--no-cache", f"--profile-json={saved}", str(script)], cwd=ROOT, capture_output=True, text=True)
+    assert finished.stdout == "55\n"
+    header = finished.stderr.splitlines()[0].split()
+    assert header[:3] == ["function", "calls", "total"]
+    rows = json.loads(saved.read_text())
+    assert sorted(row["name"] for row in rows) == ["Box.get", "Box.new", "leaf", "walk"]
+    assert set(rows[0]) == {"name", "location", "calls", "total", "self"}
+    assert [row["self"] for row in rows] == sorted((row["self"] for row in rows), reverse=True)
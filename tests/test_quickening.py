@@ -0,0 +1,97 @@
+"""
+the tree walker's self-specializing operators.
+"""
+import operator
+import pytest
+from language import quickening
+from language.lexer import Token, TokenType
+from language.quickening import BACKOFF, WARMUP
+from language.syntax_tree import BinaryOperator, Literal, UnaryOperator
+from support import configurations, run
+
+def binary(op):
+    return BinaryOperator(op, None, None)
+
+def evaluate(node, left, right, times):
+    return [quickening.binary(node, left, right) for _ in range(times)]
+
+def test_specializes_after_warming_up():
+    node = binary(TokenType.PLUS)
+    assert evaluate(node, 1, 2, WARMUP - 1) == [3] * (WARMUP - 1)
+    assert node.left_type is None
+    assert quickening.binary(node, 1, 2) == 3
+    assert (node.left_type, node.right_type, node.quick) == (int, int, operator.add)
+
+def test_other_types_deoptimize():
+    node = binary(TokenType.PLUS)
+    evaluate(node, 1, 2, WARMUP)
+    assert quickening.binary(node, "a", "b") == "ab"
+    assert (node.left_type, node.right_type, node.counter) == (None, None, BACKOFF)
+    evaluate(node, "a", "b", BACKOFF)
+    assert (node.left_type, node.right_type) == (str, str)
+
+def test_nothing_to_specialize_backs_off():
+    node = binary(TokenType.MINUS)
+    node.counter = 1
+    with pytest.raises(TypeError):
+        quickening.binary(node, "a", 1)
+    assert node.left_type is None and node.counter == BACKOFF
+
+@pytest.mark.parametrize("op, left, quick", [
+    (TokenType.EQUAL, int, operator.eq),
+    (TokenType.NOT_EQUAL, str, operator.ne),
+    (TokenType.EQUAL, type(None), None),
+    (TokenType.LESS, float, operator.lt),
+    (TokenType.MULTIPLY, str, None),
+])
+def test_specializations(op, left, quick):
+    assert quickening.specialize_binary(op, left, int) is quick
+
+def test_equality_keeps_none_right():
+    node = binary(TokenType.EQUAL)
+    assert evaluate(node, None, None, WARMUP) == [True] * WARMUP
+    assert node.quick is None # None on the left can't use a plain ==
+    assert quickening.binary(node, None, 1) is False
+
+def test_unary():
+    node = UnaryOperator(Token(TokenType.MINUS, "-", 1, 1), Literal(Token(TokenType.NUM, 1, 1, 2)))
+    for _ in range(WARMUP):
+        assert quickening.unary(node, 2) == -2
+    assert (node.child_type, node.quick) == (int, operator.neg)
+    assert quickening.unary(node, 2.5) == -2.5
+    assert node.child_type is None and node.counter == BACKOFF
+
+    node = UnaryOperator(Token(TokenType.NOT, "!", 1, 1), None)
+    for _ in range(WARMUP):
+        assert quickening.unary(node, None) is True
+    assert node.child_type is None # only bools get a plain `not`
+
+@pytest.mark.parametrize("engine, optimize", configurations())
+def test_operators_see_new_types_after_specializing(engine, optimize):
+    source = """fn add(a, b):
+  return a + b;
+end;
+fn same(a, b):
+  return a == b;
+end;
+fn nothing():
+  let x = 1;
+end;
+let n = 0;
+for (let i = 0; i < 100; i++):
+  n = add(n, 1);
+end;
+print n;
+print add("a", "b");
+print add(0.5, 1);
+let hits = 0;
+for (let i = 0; i < 100; i++):
+  if (same(i, 50)): hits++; fi;
+end;
+print hits;
+print same(nothing(), nothing());
+print same("x", "x");
+print -n;
+print -0.5;
+"""
+    assert run(source, engine, optimize, filename="t.language", memo_size=0) == "100\nab\n1.5\n1\nTrue\nTrue\n-100\n-0.5\n"
@@ -0,0 +1,45 @@
+"""
+the resolver gives every local a (depth, slot) pair and every frame its size.
+"""
+from language.syntax_tree import DeclareFunc
+from support import nodes, resolve, run, variables
+
+def test_globals_are_looked_up_by_name():
+    tree = resolve("let x = 1;\nfn f():\n  return x;\nend;")
+    [x] = variables(tree, "x")
+    assert (x.depth, x.slot) == (None, None)
+
+def test_locals_and_arguments_get_slots():
+    tree = resolve("fn f(a, b):\n  let c = a;\n  return b + c;\nend;")
+    [a] = variables(tree, "a")
+    [b] = variables(tree, "b")
+    [c] = variables(tree, "c")
+    # slot 0 is the parent frame, the arguments come first
+    assert (a.depth, a.slot) == (0, 1)
+    assert (b.depth, b.slot) == (0, 2)
+    assert (c.depth, c.slot) == (0, 3)
+    [f] = [node for node in nodes(tree) if type(node) is DeclareFunc]
+    assert f.size == 4
+
+def test_closures_walk_up_to_the_frame_they_captured():
+    tree = resolve("fn outer(a):\n  fn middle():\n    fn inner():\n      return a;\n    end;\n    return inner;\n  end;\n  return middle;\nend;")
+    [a] = variables(tree, "a")
+    assert (a.depth, a.slot) == (2, 1)
+
+def test_shadowing_in_a_block():
+    tree = resolve("fn f():\n  let x = 1;\n  if (true):\n    let x = 2;\n    print x;\n  fi;\n  return x;\nend;")
+    inner, outer = variables(tree, "x")
+    # the block can't be captured, so it's flattened into the function's frame with a slot of its own
+    assert inner.depth == outer.depth == 0
+    assert inner.slot != outer.slot
+
+def test_slots_of_a_finished_block_are_reused():
+    tree = resolve("fn f():\n  if (true):\n    let a = 1;\n    print a;\n  fi;\n  if (true):\n    let b = 2;\n    print b;\n  fi;\nend;")
+    [a] = variables(tree, "a")
+    [b] = variables(tree, "b")
+    assert a.slot == b.slot
+
+def test_every_engine_reads_the_right_slot():
+    source = "fn f(a):\n  let b = a * 2;\n  fn g(c):\n    let d = c + b;\n    return a + d;\n  end;\n  return g;\nend;\nprint f(1)(10);"
+    for engine in ("tree", "vm", "closure"):
+        assert run(source, engine) == "13\n"
@@ -0,0 +1,94 @@
+"""
+instance fields laid out by shapes shared between instances.
+"""
+import pytest
+from language.function_obj import Class, Instance, StoreCache
+from support import configurations, run
+
+class Declaration():
+    name = "Thing"
+
+def thing_class():
+    return Class(Declaration(), {})
+
+def test_shapes_are_shared_by_the_fields_order():
+    clss = thing_class()
+    instances = [Instance(clss) for _ in range(3)]
+    for instance in instances:
+        instance.set("a", 1)
+        instance.set("b", 2)
+    assert len({id(instance.shape) for instance in instances}) == 1
+    assert clss.shape.transitions["a"].transitions["b"] is instances[0].shape
+    assert instances[0].shape.slots == {"a": 0, "b": 1}
+    assert instances[0].values == [1, 2]
+
+def test_setting_a_field_again_keeps_the_shape():
+    instance = Instance(thing_class())
+    instance.set("a", 1)
+    shape = instance.shape
+    instance.set("a", 2)
+    assert instance.shape is shape and instance.values == [2]
+    assert instance.field("a") == 2 and instance.field("b") is None
+
+def test_every_class_has_its_own_shapes():
+    a, b = Instance(thing_class()), Instance(thing_class())
+    a.set("x", 1)
+    b.set("x", 1)
+    assert a.shape is not b.shape and a.shape.slots == b.shape.slots
+
+def test_instances_have_no_dict():
+    instance = Instance(thing_class())
+    instance.set("x", 1)
+    assert not hasattr(instance, "__dict__")
+
+def test_store_cache_remembers_the_transition():
+    clss = thing_class()
+    a, b = Instance(clss), Instance(clss)
+    cache = StoreCache("x")
+    cache.store(a, 1)
+    assert (cache.shape, cache.index, cache.next) == (clss.shape, 0, a.shape)
+    cache.store(b, 2)
+    assert b.shape is a.shape and b.values == [2]
+    cache.store(a, 3)
+    assert (cache.shape, cache.next, a.values) == (a.shape, None, [3])
+
+def test_shapes_are_shared_by_the_fields_order():
+    clss = thing_class()
+    instances = [Instance(clss) for _ in range(3)]
+    for instance in instances:
+        instance.set("a", 1)
+        instance.set("b", 2)
+    assert len({id(instance.shape) for instance in instances}) == 1
+    assert clss.shape.transitions["a"].transitions["b"] is instances[0].shape
+
+
+@pytest.mark.parametrize("engine, optimize", configurations())
+def test_one_site_many_shapes(engine, optimize):
+    source = """class A:
+  new(first):
+    if (first):
+      self.x = 1;
+      self.y = 2;
+    fi else
+      self.y = 20;
+      self.x = 10;
+    fi;
+  end
+end;
+class B:
+  new():
+    self.x = 100;
+  end
+end;
+let things = [A(true), A(false), B(), A(true), B()];
+let total = 0;
+for (let i = 0; i < 20; i++):
+  for thing in things:
+    total = total + thing.x;
+    thing.z = i;
+  end;
+end;
+print total;
+print things[1].z + things[2].z;
+"""
+    assert run(source, engine, optimize) == "4240\n38\n"
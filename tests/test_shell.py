@@ -0,0 +1,66 @@
+"""
+running one line after another in the same interpreter, like the shell and an
+embedding do: only the globals carry over, so memory stays flat however many
+lines are run.
+"""
+import contextlib
+import gc
+import io
+import tracemalloc
+import pytest
+from language.main import Interpreter
+from support import colours, variables
+
+def shell(engine="tree", optimize=False):
+    interpreter = Interpreter(engine, use_cache=False, optimize=optimize)
+    interpreter.is_shell = True
+    return interpreter
+
+def run(interpreter, *lines):
+    stdout = io.StringIO()
+    with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(io.StringIO()):
+        for line in lines:
+            interpreter.run(line)
+    return colours.sub("", stdout.getvalue())
+
+@pytest.mark.parametrize("engine", ["tree", "vm", "closure"])
+def test_globals_carry_over(engine):
+    interpreter = shell(engine)
+    output = run(interpreter, "let x = 2;", "fn double(n):\n  return n * 2;\nend;", "print double(x);", "x = 5;", "print double(x);")
+    assert output == "4\n10\n"
+
+def test_resolution_lives_on_the_nodes():
+    interpreter = shell()
+    assert not hasattr(interpreter, "depths")
+    run(interpreter, "fn f(a):\n  let b = a;\n  return b;\nend;")
+    declaration = interpreter.global_environment.values["f"].expr
+    [b] = variables(declaration, "b")
+    assert b.depth == 0 and type(b.slot) is int
+
+def test_per_run_tables_are_let_go():
+    interpreter = shell(optimize=True)
+    run(interpreter, "fn f(n):\n  return n + 1;\nend;\nlet c = 3;\nprint f(c);")
+    run(interpreter, "print 1;")
+    assert interpreter.memos == {}
+    assert interpreter.optimizer.frames == [] and interpreter.optimizer.writes == {} and interpreter.optimizer.constants == {}
+    assert interpreter.purity.functions == {} and interpreter.purity.dependencies == {}
+    # functions made before keep their memo
+    assert run(interpreter, "print f(c);") == "4\n"
+
+@pytest.mark.parametrize("engine, optimize", [("tree", False), ("vm", False), ("closure", False), ("tree", True)])
+def test_memory_stays_flat(engine, optimize):
+    interpreter = shell(engine, optimize)
+    def lines(start, count):
+        return [f"fn f(n):\n  return n + {i};\nend;\nlet x = f({i});\nprint x;" for i in range(start, start + count)]
+    run(interpreter, *lines(0, 200)) # warmed up: quickening, caches, interned names
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        run(interpreter, *lines(200, 1000))
+        gc.collect()
+        after = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    # keeping each line's tree alive took about 150 bytes a line
+    assert after - before < 30_000
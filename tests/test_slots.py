@@ -0,0 +1,51 @@
+"""
+tokens, tree nodes and runtime objects are slotted, so none of them carries a
+__dict__ around.
+"""
+import glob
+import os
+import pytest
+from language import function_obj, syntax_tree
+from language.lexer import Lexer, Token, TokenType, token_names
+from support import PROGRAMS, nodes, resolve
+
+def classes(module, base):
+    return [value for value in vars(module).values() if isinstance(value, type) and issubclass(value, base)]
+
+@pytest.mark.parametrize("kind", classes(syntax_tree, syntax_tree.AbstractSyntaxTree), ids=lambda kind: kind.__name__)
+def test_tree_nodes_have_slots(kind):
+    assert all("__slots__" in vars(base) for base in kind.__mro__[:-1])
+
+@pytest.mark.parametrize("kind", [
+    Token,
+    function_obj.Memo,
+    function_obj.Function,
+    function_obj.BuiltinFunction,
+    function_obj.BoundMethod,
+    function_obj.Class,
+    function_obj.Instance,
+    function_obj.List,
+    function_obj.Shape,
+    function_obj.PropertyCache,
+    function_obj.StoreCache,
+], ids=lambda kind: kind.__name__)
+def test_runtime_objects_have_slots(kind):
+    assert all("__slots__" in vars(base) for base in kind.__mro__[:-1])
+
+@pytest.mark.parametrize("path", sorted(glob.glob(os.path.join(PROGRAMS, "*.language"))), ids=os.path.basename)
+def test_nothing_in_a_tree_has_a_dict(path):
+    with open(path) as f:
+        source = f.read()
+    if "error_" in path:
+        return
+    for node in nodes(resolve(source)):
+        assert not hasattr(node, "__dict__"), node
+
+def test_token_types_are_ints():
+    lexer = Lexer()
+    lexer.content = 'let x = "a" + 1.5; print x;'
+    tokens = list(lexer.tokenize())
+    assert all(type(token.type) is int for token in tokens)
+    assert not any(hasattr(token, "__dict__") for token in tokens)
+    assert token_names[TokenType.PLUS] == "PLUS"
+    assert repr(tokens[0]) == "Token(DECL, let @ 1:3)"
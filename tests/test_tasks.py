@@ -0,0 +1,133 @@
+"""
+async functions and tasks: what they give back, the order they run in, and
+where their errors are reported, on every engine.
+"""
+import os
+import socket
+import subprocess
+import sys
+import threading
+import pytest
+from support import ROOT, configurations, run
+
+@pytest.mark.parametrize("engine, optimize", configurations())
+def test_tasks_take_turns(engine, optimize):
+    source = """
+async fn count(name, times):
+  for (let i = 0; i < times; i = i + 1):
+    print name * 10 + i;
+    await sleep(0);
+  end;
+  return name;
+end;
+let first = count(1, 3);
+let second = count(2, 2);
+print "started";
+print await second;
+print await first;
+"""
+    # sleep(0) only gives the other task its turn, so the order doesn't hang on timers
+    assert run(source, engine, optimize) == "started\n10\n20\n11\n21\n12\n2\n1\n"
+
+@pytest.mark.parametrize("engine, optimize", configurations())
+def test_async_methods_and_nested_awaits(engine, optimize):
+    source = """
+class Account:
+  new(balance):
+    self.balance = balance;
+  end
+  async deposit(amount):
+    await sleep(0);
+    self.balance = self.balance + amount;
+    return self.balance;
+  end
+end;
+async fn twice(account):
+  await account.deposit(1);
+  return await account.deposit(2);
+end;
+let account = Account(10);
+print await twice(account);
+print account.balance;
+"""
+    assert run(source, engine, optimize) == "13\n13\n"
+
+@pytest.mark.parametrize("engine, optimize", configurations())
+def test_tasks_nobody_awaited_still_finish(engine, optimize):
+    source = 'async fn later():\n  await sleep(0.01);\n  print "done";\nend;\nlater();\nprint "end of the program";'
+    assert run(source, engine, optimize) == "end of the program\ndone\n"
+
+@pytest.mark.parametrize("engine, optimize", configurations())
+def test_an_awaited_task_s_error_points_into_it(engine, optimize):
+    source = "async fn fail():\n  await sleep(0);\n  return 1 + missing;\nend;\nprint 1;\nprint await fail();"
+    output = run(source, engine, optimize)
+    assert output == run(source)
+    assert output.startswith("1\nError at line 3, column 20")
+    assert output.splitlines()[-1] == "Unkown name 'missing'."
+
+@pytest.mark.parametrize("engine, optimize", configurations())
+def test_an_unawaited_task_s_error_is_reported_at_the_end(engine, optimize):
+    source = 'async fn fail():\n  await sleep(0);\n  return 1 + missing;\nend;\nfail();\nprint "still running";'
+    output = run(source, engine, optimize)
+    assert output.startswith("still running\nError at line 3, column 20")
+
+@pytest.mark.parametrize("engine, optimize", configurations())
+@pytest.mark.parametrize("source, position, message", [
+    ("let x = 1;\nprint await x;", "line 2, column 11", "Only tasks can be awaited."),
+    ("fn f():\n  await sleep(0);\nend;", "line 2, column 7", "Cannot use 'await' outside of an async function."),
+    ('print await sleep("a");', "line 1, column 17", "sleep() takes a number of seconds."),
+    ('print await read_file("/does/not/exist");', "line 1, column 11", "Couldn't read '/does/not/exist': No such file or directory."),
+])
+def test_errors(engine, optimize, source, position, message):
+    output = run(source, engine, optimize)
+    assert output == run(source)
+    assert output.startswith(f"Error at {position}")
+    assert output.splitlines()[-1] == message
+
+@pytest.mark.parametrize("engine", ["tree", "vm", "closure"])
+def test_read_file(tmp_path, engine):
+    path = tmp_path / "data.txt"
+    path.write_text("hello")
+    assert run(f'let text = await read_file("{path}");\nprint text;', engine) == "hello\n"
+
+@pytest.mark.parametrize("engine", ["tree", "vm", "closure"])
+def test_connections(tmp_path, engine):
+    address = str(tmp_path / "echo.sock")
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(address)
+    server.listen(1)
+    def echo():
+        connection, _ = server.accept()
+        with connection:
+            connection.sendall(connection.recv(100).upper())
+    thread = threading.Thread(target=echo, daemon=True)
+    thread.start()
+    source = f"""
+async fn ask(text):
+  let c = await connect("{address}");
+  await c.send(text);
+  let reply = await c.receive();
+  await c.close();
+  return reply;
+end;
+print await ask("ping");
+"""
+    try:
+        assert run(source, engine) == "PING\n"
+    finally:
+        thread.join(5)
+        server.close()
+
+def test_programs_without_tasks_don_t_load_asyncio(tmp_path):
+    script = tmp_path / "plain.language"
+    script.write_text("print 1 + 1;\n")
+    check = f"""
+import sys
+from language.main import main
+main(["--no-cache", {str(script)!r}])
+print("asyncio" in sys.modules)
+"""
+    result = subprocess.run([sys.executable, "-c", check], cwd=ROOT, capture_output=True, text=True,
+        env={**os.environ, "PYTHONPATH": ROOT})
+    assert result.stdout.splitlines()[0] == "2"
+    assert result.stdout.splitlines()[-1] == "False"
@@ -0,0 +1,71 @@
+"""
+what the vm does besides printing what the tree walker prints.
+"""
+import contextlib
+import io
+from language import vm
+from language.main import Interpreter
+from support import run
+
+def test_runaway_recursion_is_an_error():
+    output = run("fn r(n):\n  return r(n + 1);\nend;\nr(0);", "vm")
+    assert "Error at line 2, column 10" in output
+    assert output.splitlines()[-1] == f"Too many nested calls (more than {vm.MAX_CALL_DEPTH})."
+
+def test_runaway_method_recursion_is_an_error():
+    source = "class A:\n  r(n):\n    return self.r(n + 1);\n  end\nend;\nA().r(0);"
+    output = run(source, "vm")
+    assert output.splitlines()[-1] == f"Too many nested calls (more than {vm.MAX_CALL_DEPTH})."
+
+def test_deep_recursion_below_the_limit():
+    source = "fn down(n):\n  if (n == 0):\n    return 0;\n  fi;\n  return down(n - 1) + 1;\nend;\nprint down(5000);"
+    assert run(source, "vm") == "5000\n"
+
+def test_frames_with_more_slots_than_fit_in_16_bits():
+    # slots past 0xffff don't fit the fused instructions, which fall back to plain ones
+    count = 0x10000 + 10
+    names = [f"v{i}" for i in range(count)]
+    last = names[-1]
+    source = "fn outer():\n" + "".join(f"  let {name} = {i};\n" for i, name in enumerate(names)) + f"""
+  fn inner():
+    {last} = {last} + 1;
+    return {last};
+  end;
+  print inner();
+  print {last} + 1;
+  if ({last} > 5):
+    print {last} * 2;
+  fi;
+  for (let i = 0; i < 2; i = i + 1):
+    print i;
+  end;
+  for x in [7]:
+    print x;
+  end;
+end;
+outer();
+"""
+    expected = f"{count}\n{count + 1}\n{count * 2}\n0\n1\n7\n"
+    assert run(source) == expected
+    assert run(source, "vm") == expected
+
+def test_memoized_recursion_stays_off_the_python_stack():
+    source = "fn down(n):\n  if (n == 0):\n    return 0;\n  fi;\n  return down(n - 1) + 1;\nend;\nprint down(5000);\nprint down(5000);\nprint down(4000);"
+    interpreter = Interpreter("vm", use_cache=False)
+    interpreter.is_shell = False
+    stdout = io.StringIO()
+    with contextlib.redirect_stdout(stdout):
+        interpreter.run(source)
+    assert stdout.getvalue() == "5000\n5000\n4000\n"
+    [memo] = interpreter.memos.values()
+    # the first call fills in the memo on its way back, the other two find their results in it
+    assert (memo.misses, memo.hits, len(memo.results)) == (5001, 2, 1024)
+
+def test_runaway_memoized_recursion_is_an_error():
+    output = run("fn r(n):\n  return r(n + 1);\nend;\nr(0);", "vm")
+    assert output.splitlines()[-1] == f"Too many nested calls (more than {vm.MAX_CALL_DEPTH})."
+
+def test_runaway_profiled_recursion_is_an_error(capsys):
+    output = run("fn r(n):\n  return r(n + 1);\nend;\nr(0);", "vm", profile=True)
+    assert "Error at line 2, column 10" in output
+    assert output.splitlines()[-1] == "Too many nested calls."